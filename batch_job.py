@@ -0,0 +1,199 @@
+"""
+后台批量任务模块
+批量操作在后台线程中执行，菜单保持可用，可随时查看进度、暂停、继续或取消
+"""
+
+import sys
+import time
+import threading
+from typing import List, Dict, Optional
+from prefetch import ThreadOutputBuffer
+
+
+OPERATION_TEXTS = {'hide': '隐藏', 'show': '显示', 'delete': '删除'}
+
+STATE_TEXTS = {
+    'running': '运行中',
+    'paused': '已暂停',
+    'cancelling': '正在取消（等待当前笔记处理完成）',
+    'finished': '已完成',
+    'cancelled': '已取消',
+    'failed': '执行失败'
+}
+
+
+class BatchControl:
+    """批量操作的暂停、继续、取消控制和进度记录，供PermissionManager在两条笔记之间检查"""
+    
+    def __init__(self):
+        """初始化控制器（运行状态）"""
+        self._running = threading.Event()
+        self._running.set()
+        self._cancel = threading.Event()
+        self.processed = 0
+        self.total = 0
+        self.success = 0
+        self.failed = 0
+    
+    @property
+    def paused(self) -> bool:
+        """是否已暂停"""
+        return not self._running.is_set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancel.is_set()
+    
+    def pause(self) -> None:
+        """当前笔记处理完后暂停"""
+        if not self.cancelled:
+            self._running.clear()
+    
+    def resume(self) -> None:
+        """继续执行"""
+        self._running.set()
+    
+    def cancel(self) -> None:
+        """当前笔记处理完后停止，暂停中的任务立即停止"""
+        self._cancel.set()
+        self._running.set()
+    
+    def checkpoint(self) -> bool:
+        """
+        在开始处理下一条笔记前调用，暂停时阻塞直到继续或取消
+        
+        Returns:
+            是否继续执行（已取消时为False）
+        """
+        self._running.wait()
+        return not self._cancel.is_set()
+    
+    def report(self, processed: int, total: int, results: Dict) -> None:
+        """
+        记录进度
+        
+        Args:
+            processed: 已处理的笔记数
+            total: 笔记总数
+            results: 当前的批量操作结果
+        """
+        self.processed = processed
+        self.total = total
+        self.success = results['success']
+        self.failed = results['failed']
+
+
+class BatchJob:
+    """在后台线程中执行的一次批量操作"""
+    
+    def __init__(self, hider, notes: List[Dict], operation: str, verify: bool = False):
+        """
+        初始化后台任务
+        
+        Args:
+            hider: 主程序实例
+            notes: 要操作的笔记
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            verify: 批量结束后是否统一核对实际状态
+        """
+        self.hider = hider
+        self.notes = notes
+        self.operation = operation
+        self.verify = verify
+        self.control = BatchControl()
+        self.control.total = len(notes)
+        self.results = None  # 批量操作结果，未能执行时为None
+        self.error = None  # 后台线程中的异常
+        self.started_at = None
+        self.finished_at = None
+        self._thread = threading.Thread(target=self._work, name=f"batch-{operation}", daemon=True)
+        self._output = None
+    
+    def start(self) -> None:
+        """启动后台线程，线程的输出暂存起来，不打乱菜单"""
+        self.started_at = time.monotonic()
+        self._output = ThreadOutputBuffer(sys.stdout, self._thread)
+        sys.stdout = self._output
+        self._thread.start()
+    
+    @property
+    def done(self) -> bool:
+        """任务是否已结束"""
+        return self.started_at is not None and not self._thread.is_alive()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待任务结束
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            任务是否已结束
+        """
+        self._thread.join(timeout)
+        return self.done
+    
+    @property
+    def state(self) -> str:
+        """任务状态，取值见STATE_TEXTS"""
+        if self.done:
+            if self.results is None:
+                return 'failed'
+            return 'cancelled' if self.results.get('cancelled') else 'finished'
+        if self.control.cancelled:
+            return 'cancelling'
+        return 'paused' if self.control.paused else 'running'
+    
+    def status_text(self) -> str:
+        """
+        一行进度描述
+        
+        Returns:
+            状态文本
+        """
+        control = self.control
+        end = self.finished_at or time.monotonic()
+        elapsed = int(end - self.started_at) if self.started_at else 0
+        return (f"后台{OPERATION_TEXTS[self.operation]}任务 {STATE_TEXTS[self.state]}: "
+                f"{control.processed}/{control.total} 条（成功 {control.success}，失败 {control.failed}），"
+                f"用时 {elapsed // 60}分{elapsed % 60:02d}秒")
+    
+    def output_tail(self, lines: int = 5) -> List[str]:
+        """
+        后台线程最近的输出
+        
+        Args:
+            lines: 行数
+            
+        Returns:
+            输出行
+        """
+        return self._output.tail(lines) if self._output else []
+    
+    def release_output(self) -> List[str]:
+        """
+        恢复sys.stdout，返回后台线程输出的最后几行
+        
+        Returns:
+            输出的最后几行
+        """
+        if self._output is None:
+            return []
+        tail = self._output.tail(10)
+        if sys.stdout is self._output:
+            sys.stdout = self._output.stream
+        self._output = None
+        return tail
+    
+    def _work(self) -> None:
+        """后台线程：执行批量操作"""
+        try:
+            self.results = self.hider._run_operation_batch(
+                self.notes, self.operation, self.verify, control=self.control
+            )
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.monotonic()
@@ -0,0 +1,137 @@
+"""
+日期解析性能测试脚本
+对比旧版逐个正则+dateutil解析与预编译合并正则+缓存解析的吞吐量
+"""
+
+import re
+import sys
+import os
+import time
+import random
+from datetime import datetime, timedelta
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dateutil.parser import parse as date_parse
+from date_parser import DateParser
+
+
+LEGACY_PATTERNS = [
+    r'发布于\s*(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})',
+    r'(\d{4})-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})',
+    r'(\d{4})/(\d{1,2})/(\d{1,2})\s*(\d{1,2}):(\d{2})',
+]
+
+
+def legacy_parse(date_str):
+    """旧版解析逻辑：逐个未编译正则匹配，失败后交给dateutil"""
+    if not date_str:
+        return None
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, date_str)
+        if match:
+            try:
+                year, month, day, hour, minute = map(int, match.groups())
+                return datetime(year, month, day, hour, minute)
+            except ValueError:
+                continue
+    try:
+        return date_parse(date_str)
+    except Exception:
+        return None
+
+
+RELATIVE_SAMPLES = ["刚刚", "{n}分钟前", "{n}小时前", "{n}天前", "昨天 {h:02d}:{m:02d}", "前天 {h:02d}:{m:02d}",
+                    "{mo:02d}-{d:02d}", "{mo:02d}-{d:02d} {h:02d}:{m:02d}"]
+
+
+def generate_corpus(count: int, seed: int = 42, relative_ratio: float = 0.0) -> list:
+    """
+    生成混合格式的日期字符串
+    
+    Args:
+        count: 字符串数量
+        seed: 随机种子
+        relative_ratio: 相对日期和短日期所占比例
+        
+    Returns:
+        日期字符串列表
+    """
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1)
+    formats = [
+        "发布于 %Y年%m月%d日 %H:%M",
+        "%Y-%m-%d %H:%M",
+        "%Y/%m/%d %H:%M",
+    ]
+    corpus = []
+    for _ in range(count):
+        if rng.random() < relative_ratio:
+            corpus.append(rng.choice(RELATIVE_SAMPLES).format(
+                n=rng.randint(1, 23), h=rng.randint(0, 23), m=rng.randint(0, 59),
+                mo=rng.randint(1, 12), d=rng.randint(1, 28)
+            ))
+            continue
+        moment = start + timedelta(minutes=rng.randrange(60 * 24 * 365 * 9))
+        corpus.append(moment.strftime(rng.choice(formats)))
+    return corpus
+
+
+def measure(label: str, parse, corpus: list) -> float:
+    """
+    测量解析整个语料的吞吐量
+    
+    Args:
+        label: 输出标签
+        parse: 解析函数
+        corpus: 日期字符串列表
+        
+    Returns:
+        每秒解析的字符串数量
+    """
+    started = time.perf_counter()
+    for date_str in corpus:
+        parse(date_str)
+    elapsed = time.perf_counter() - started
+    throughput = len(corpus) / elapsed if elapsed > 0 else float('inf')
+    print(f"{label:<24} {elapsed:8.3f}s  {throughput:12,.0f} 条/秒")
+    return throughput
+
+
+def run_corpus(title: str, corpus: list) -> None:
+    """
+    在一组日期字符串上对比各解析方式
+    
+    Args:
+        title: 输出标题
+        corpus: 日期字符串列表
+    """
+    print(f"=== {title}（{len(corpus)} 条）===")
+    
+    legacy = measure("旧版解析", legacy_parse, corpus)
+    
+    uncached = DateParser(cache_size=0)
+    fast = measure("合并正则（无缓存）", uncached.parse_date, corpus)
+    
+    parser = DateParser()
+    measure("合并正则（首次，写缓存）", parser.parse_date, corpus)
+    cached = measure("合并正则（缓存命中）", parser.parse_date, corpus)
+    
+    print(f"无缓存提速 {fast / legacy:.1f} 倍，缓存命中提速 {cached / legacy:.1f} 倍")
+    print(f"缓存统计: {parser.cache_info()}")
+
+    unparsed = sum(1 for date_str in corpus if parser.parse_date(date_str) is None)
+    print(f"无法解析: {unparsed} 条")
+
+
+def main():
+    """运行性能测试"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    run_corpus("日期解析性能测试：完整日期", generate_corpus(count))
+    print()
+    run_corpus("日期解析性能测试：含20%相对日期和短日期", generate_corpus(count, relative_ratio=0.2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+笔记存储性能测试脚本
+对比逐条解析日期的DateParser筛选与列式NoteStore筛选的耗时
+"""
+
+import sys
+import os
+import time
+import random
+import pickle
+import tracemalloc
+from datetime import datetime
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from date_parser import DateParser
+from note_store import NoteStore
+from note_record import NoteRecord
+from bench_date_parser import generate_corpus
+
+
+def generate_notes(count: int, seed: int = 42) -> list:
+    """
+    生成模拟的笔记列表（不带时间戳，模拟旧版提取结果）
+    
+    Args:
+        count: 笔记数量
+        seed: 随机种子
+        
+    Returns:
+        笔记列表
+    """
+    rng = random.Random(seed)
+    titles = [f"旅行日记 第{i}篇" for i in range(count // 4 or 1)]
+    return [
+        {
+            'note_id': f"note_index_{i}",
+            'title': rng.choice(titles),
+            'date': date,
+            'visibility': rng.choice(('public', 'private', 'unknown')),
+            'element_index': i
+        }
+        for i, date in enumerate(generate_corpus(count, seed))
+    ]
+
+
+def measure_memory(label: str, build) -> float:
+    """
+    测量构建一组对象占用的内存
+    
+    Args:
+        label: 输出标签
+        build: 构建函数
+        
+    Returns:
+        占用内存（MB）
+    """
+    tracemalloc.start()
+    objects = build()
+    used = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    print(f"{label:<28} {used:8.1f}MB ({len(objects)} 条)")
+    return used
+
+
+def timed(label: str, func):
+    """执行函数并输出耗时"""
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def main():
+    """运行性能测试"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    notes = generate_notes(count)
+    print(f"=== 笔记筛选性能测试（{count} 条）===")
+    
+    # 不缓存的解析器代表每次筛选都重新解析日期的旧行为
+    parser = DateParser(cache_size=0)
+    years = timed("DateParser 获取年份", lambda: parser.get_available_years(notes))
+    timed("DateParser 逐年筛选", lambda: [parser.filter_by_year(notes, y) for y in years])
+    start, end = datetime(2019, 1, 1), datetime(2021, 12, 31, 23, 59)
+    expected = timed("DateParser 日期范围", lambda: parser.filter_by_date_range(notes, start, end))
+    
+    store = timed("NoteStore 建立（解析一次）", lambda: NoteStore(notes, parser))
+    timed("NoteStore 获取年份", store.get_available_years)
+    timed("NoteStore 逐年筛选", lambda: [store.filter_by_year(y) for y in years])
+    actual = timed("NoteStore 日期范围（建立索引）", lambda: store.filter_by_date_range(start, end))
+    timed("NoteStore 日期范围（使用索引）", lambda: store.filter_by_date_range(start, end))
+    timed("NoteStore 早于2017-03-01", lambda: store.filter_by_date_range(None, datetime(2017, 3, 1), False))
+    timed("NoteStore 年份+可见性+标题", lambda: store.select(
+        store.year_mask(2020), store.visibility_mask('public'), store.title_mask("第1")
+    ))
+    
+    # 旧版字典还持有WebElement，这里用占位对象模拟其最小开销
+    class FakeElement:
+        def __init__(self, index):
+            self._parent = None
+            self._id = f"f.{index:032x}.d.{index:032x}.e.{index}"
+    
+    sample = notes[:50000]
+    dict_mb = measure_memory("笔记字典（含元素引用）", lambda: [
+        dict(note, timestamp=store.timestamps[i], has_permission_button=True, element=FakeElement(i))
+        for i, note in enumerate(sample)
+    ])
+    record_mb = measure_memory("NoteRecord", lambda: [
+        NoteRecord.from_dict(dict(note, timestamp=store.timestamps[i], has_permission_button=True))
+        for i, note in enumerate(sample)
+    ])
+    print(f"内存减少到 1/{dict_mb / record_mb:.1f}")
+    records = [NoteRecord.from_dict(note) for note in sample]
+    print(f"序列化往返一致: {pickle.loads(pickle.dumps(records)) == records}")
+    
+    keyword = "第12"
+    scanned = timed("逐条扫描标题", lambda: [n['note_id'] for n in notes if keyword in n['title']])
+    indexed = timed("标题索引查找", lambda: store.search_titles([keyword]))
+    timed("标题索引多关键词（或）", lambda: store.search_titles(["第12", "第34"], match_all=False))
+    
+    print(f"结果一致: {len(expected) == len(actual) and scanned == indexed}")
+
+
+if __name__ == "__main__":
+    main()
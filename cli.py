@@ -0,0 +1,424 @@
+"""
+命令行模块
+无需交互即可完成 提取 -> 筛选 -> 执行，适合定时任务和脚本调用，例如：
+    python main.py --op hide --year 2021 --yes --rate 1/s --journal hide_2021.jsonl
+    python main.py --job cleanup.json --yes
+    python main.py --retention policy.yaml --yes
+"""
+
+import re
+import sys
+import json
+import argparse
+from typing import List, Dict, Optional
+from note_query import compile_query, QUERY_HELP
+from note_store import NoteStore
+from note_pager import NotePager
+from snapshot import SnapshotWriter, export_results, RESULT_FIELDS
+
+
+# 退出码
+EXIT_OK = 0  # 全部成功，或仅预览、没有需要处理的笔记
+EXIT_PARTIAL = 1  # 部分笔记处理失败
+EXIT_USAGE = 2  # 参数或查询条件错误（与argparse一致）
+EXIT_NO_NOTES = 3  # 浏览器启动、登录或提取笔记失败
+EXIT_FAILED = 4  # 批量操作未能执行或全部失败
+EXIT_INTERRUPTED = 130  # 被Ctrl+C中断
+
+RATE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*/\s*([a-z一-鿿]+)\s*$', re.IGNORECASE)
+
+RATE_UNITS = {
+    's': 1, 'sec': 1, 'second': 1, '秒': 1,
+    'm': 60, 'min': 60, 'minute': 60, '分钟': 60,
+    'h': 3600, 'hour': 3600, '小时': 3600
+}
+
+YEAR_PATTERN = re.compile(r'^\s*(\d{4})\s*(?:-\s*(\d{4})\s*)?$')
+
+OPERATION_TEXTS = {'hide': '隐藏', 'show': '显示', 'delete': '删除'}
+
+
+def parse_rate(text: str) -> float:
+    """
+    把“1/s”“30/min”等操作速率转换为操作间隔
+    
+    Args:
+        text: 速率文本
+        
+    Returns:
+        操作间隔（秒）
+        
+    Raises:
+        argparse.ArgumentTypeError: 格式无效
+    """
+    match = RATE_PATTERN.match(text)
+    if not match or match.group(2).lower() not in RATE_UNITS or float(match.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"无效的速率: {text}（示例: 1/s、30/min）")
+    return RATE_UNITS[match.group(2).lower()] / float(match.group(1))
+
+
+def year_condition(text: str) -> str:
+    """
+    把“2021”或“2019-2020”转换为查询条件
+    
+    Args:
+        text: 年份或年份范围
+        
+    Returns:
+        查询条件文本
+        
+    Raises:
+        argparse.ArgumentTypeError: 格式无效
+    """
+    match = YEAR_PATTERN.match(text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"无效的年份: {text}（示例: 2021 或 2019-2020）")
+    first, last = match.group(1), match.group(2)
+    if not last:
+        return f"year={first}"
+    if int(last) < int(first):
+        raise argparse.ArgumentTypeError(f"无效的年份范围: {text}")
+    return f"(year>={first} and year<={last})"
+
+
+def build_query_text(years: Optional[List[str]] = None, start: Optional[str] = None,
+                     end: Optional[str] = None, query: Optional[str] = None) -> Optional[str]:
+    """
+    把年份、日期范围和查询语句合并为一条查询，各部分之间为“且”的关系
+    
+    Args:
+        years: 年份条件列表（已经过year_condition转换），多个年份之间为“或”
+        start: 开始日期（含）
+        end: 结束日期（不含）
+        query: 额外的查询语句
+        
+    Returns:
+        合并后的查询语句，没有任何条件时返回None
+    """
+    parts = []
+    if years:
+        parts.append(years[0] if len(years) == 1 else f"({' or '.join(years)})")
+    if start:
+        parts.append(f'date>="{start}"')
+    if end:
+        parts.append(f'date<"{end}"')
+    if query:
+        parts.append(f"({query})")
+    return " and ".join(parts) if parts else None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    创建命令行参数解析器
+    
+    Returns:
+        参数解析器
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="小红书笔记批量管理工具（非交互模式）。不带参数运行时进入交互菜单。",
+        epilog=f"{QUERY_HELP}\n\n"
+               "退出码: 0 成功/仅预览  1 部分失败  2 参数错误  3 提取笔记失败  4 操作失败  130 被中断",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    task = parser.add_mutually_exclusive_group()
+    task.add_argument('--op', choices=sorted(OPERATION_TEXTS), help="要执行的操作")
+    task.add_argument('--job', metavar='PATH',
+                      help="作业文件（JSON或YAML），包含多个操作步骤，共用一次提取")
+    task.add_argument('--retention', metavar='PATH',
+                      help="保留策略文件（JSON或YAML），按间隔持续同步并应用规则")
+    selection = parser.add_argument_group("笔记筛选（多个条件同时满足）")
+    selection.add_argument('--year', action='append', type=year_condition, metavar='YEAR',
+                           help="发布年份，如 2021 或 2019-2020，可重复指定")
+    selection.add_argument('--from', dest='start', metavar='DATE', help="开始日期（含），如 2021-01-01")
+    selection.add_argument('--to', dest='end', metavar='DATE', help="结束日期（不含），如 2022-01-01")
+    selection.add_argument('--query', help="查询语句，语法见下方说明")
+    selection.add_argument('--changed', action='store_true', help="只处理上一次同步以来新增或变化的笔记")
+    selection.add_argument('--all', action='store_true', help="不加筛选条件，处理全部笔记")
+    execution = parser.add_argument_group("执行")
+    execution.add_argument('--yes', '-y', action='store_true',
+                           help="确认执行；不指定时只预览将要处理的笔记")
+    execution.add_argument('--rate', type=parse_rate, metavar='RATE',
+                           help="固定操作速率，如 1/s、30/min；不指定时自动调整节奏")
+    execution.add_argument('--verify', action='store_true', help="操作结束后统一核对笔记的实际状态")
+    execution.add_argument('--headless', action='store_true', help="启动新浏览器时使用无头模式")
+    execution.add_argument('--prefetch', action='store_true',
+                           help="不带 --op/--job/--retention 时进入交互菜单，并在后台预先启动浏览器和提取笔记")
+    execution.add_argument('--once', action='store_true', help="保留策略只执行一轮（适合由cron调度）")
+    execution.add_argument('--interval', metavar='INTERVAL',
+                           help="保留策略的同步间隔，如 30min、6h，覆盖策略文件中的设置")
+    output = parser.add_argument_group("输出")
+    output.add_argument('--journal', metavar='PATH',
+                        help="逐条写入处理结果，.jsonl或.csv，可加.gz压缩")
+    output.add_argument('--json', action='store_true', help="最后一行输出JSON格式的结果摘要")
+    return parser
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    以非交互方式运行一次批量操作
+    
+    Args:
+        argv: 命令行参数，默认为sys.argv[1:]
+        
+    Returns:
+        退出码
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    summary = {'operation': args.op, 'dry_run': not args.yes, 'query': None,
+               'selected': 0, 'success': 0, 'failed': 0, 'journal': None}
+    
+    # main导入本模块，延迟导入避免循环依赖
+    from main import XiaohongshuHider
+    if not (args.op or args.job or args.retention):
+        if not args.prefetch:
+            parser.error("需要指定 --op、--job 或 --retention 之一（或用 --prefetch 进入交互菜单）")
+        XiaohongshuHider(headless=args.headless, prefetch=True).run()
+        return EXIT_OK
+    
+    steps = options = policy = None
+    query = None
+    if args.job or args.retention:
+        if args.year or args.start or args.end or args.query or args.changed or args.all:
+            parser.error("使用 --job 或 --retention 时筛选条件写在文件中")
+    if args.retention:
+        # 延迟导入，retention依赖本模块中的解析函数
+        from retention import RetentionPolicy, parse_interval
+        try:
+            policy = RetentionPolicy.load(args.retention)
+            if args.interval:
+                policy.interval = parse_interval(args.interval)
+        except (OSError, ValueError) as e:
+            parser.error(f"保留策略无效: {e}")
+        summary['policy'] = policy.name or args.retention
+    elif args.job:
+        # job_file导入本模块中的解析函数，延迟导入避免循环依赖
+        from job_file import load_job, parse_job
+        try:
+            steps, options = parse_job(load_job(args.job))
+        except (OSError, ValueError) as e:
+            parser.error(f"作业文件无效: {e}")
+        summary['job'] = options['name'] or args.job
+    else:
+        query_text = build_query_text(args.year, args.start, args.end, args.query)
+        if not query_text and not args.changed and not args.all:
+            parser.error("请至少指定一个筛选条件（--year、--from、--to、--query、--changed），或使用 --all")
+        if query_text:
+            try:
+                query = compile_query(query_text)
+            except ValueError as e:
+                parser.error(f"查询条件无效: {e}")
+            summary['query'] = query_text
+    
+    hider = XiaohongshuHider(headless=args.headless, interactive=False)
+    try:
+        if policy is not None:
+            code = _run_retention(hider, args, policy, summary)
+        elif steps is not None:
+            code = _run_job(hider, args, steps, options, summary)
+        else:
+            code = _run(hider, args, query, summary)
+    except KeyboardInterrupt:
+        hider.ui.print_warning("被用户中断")
+        code = EXIT_INTERRUPTED
+    finally:
+        hider._cleanup()
+    
+    summary['exit_code'] = code
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+    return code
+
+
+def _print_notes(notes: List, heading: str) -> None:
+    """
+    一次输出全部笔记，无人值守运行时无法翻页，预览必须列出每一条
+    
+    Args:
+        notes: 笔记列表
+        heading: 标题
+    """
+    sys.stdout.write(NotePager(notes, max(1, len(notes))).render(heading))
+
+
+def _run(hider, args: argparse.Namespace, query, summary: Dict) -> int:
+    """
+    提取、筛选并执行操作
+    
+    Args:
+        hider: 主程序实例
+        args: 命令行参数
+        query: 编译后的查询，没有时为None
+        summary: 结果摘要，执行过程中填写
+        
+    Returns:
+        退出码
+    """
+    ui = hider.ui
+    notes = hider._extract_notes()
+    if not notes:
+        ui.print_error("没有提取到笔记")
+        return EXIT_NO_NOTES
+    
+    store = hider.note_store
+    if args.changed:
+        if hider.last_diff is None:
+            ui.print_warning("没有可对比的上一次快照，本次只保存快照，下次运行时处理变化的笔记")
+            return EXIT_OK
+        changed_notes = hider.last_diff.changed_notes()
+        store = NoteStore(changed_notes, hider.date_parser)
+        selected = changed_notes
+    else:
+        selected = notes
+    if query:
+        selected = query.select(store)
+    
+    summary['selected'] = len(selected)
+    operation_text = OPERATION_TEXTS[args.op]
+    if not selected:
+        ui.print_info("没有满足条件的笔记")
+        return EXIT_OK
+    
+    _print_notes(selected, f"待{operation_text}的笔记")
+    if not args.yes:
+        ui.print_info(f"预览模式：共 {len(selected)} 条笔记待{operation_text}，加上 --yes 执行")
+        return EXIT_OK
+    
+    delay = args.rate if args.rate else 2.0
+    results = hider._execute_operation(selected, args.op, args.verify, delay=delay, adaptive=args.rate is None)
+    if results is None:
+        return EXIT_FAILED
+    summary['success'] = results['success']
+    summary['failed'] = results['failed']
+    
+    if args.journal:
+        try:
+            export_results(results, args.journal)
+            summary['journal'] = args.journal
+            ui.print_info(f"处理结果已写入: {args.journal}")
+        except OSError as e:
+            ui.print_error(f"写入处理结果失败: {e}")
+    
+    if results['failed'] == 0:
+        return EXIT_OK
+    return EXIT_PARTIAL if results['success'] else EXIT_FAILED
+
+
+def _run_job(hider, args: argparse.Namespace, steps: List, options: Dict, summary: Dict) -> int:
+    """
+    提取一次笔记，按作业文件生成合并计划并依次执行各批次
+    
+    Args:
+        hider: 主程序实例
+        args: 命令行参数
+        steps: 作业步骤
+        options: 作业选项
+        summary: 结果摘要，执行过程中填写
+        
+    Returns:
+        退出码
+    """
+    from job_file import plan_job
+    ui = hider.ui
+    notes = hider._extract_notes()
+    if not notes:
+        ui.print_error("没有提取到笔记")
+        return EXIT_NO_NOTES
+    
+    changed_notes = hider.last_diff.changed_notes() if hider.last_diff is not None else None
+    try:
+        plan = plan_job(steps, hider.note_store, changed_notes)
+    except ValueError as e:
+        ui.print_error(str(e))
+        return EXIT_USAGE
+    
+    summary['steps'] = [
+        {'name': step.name, 'operation': step.operation, 'matched': matched, 'assigned': assigned}
+        for step, matched, assigned in plan.step_counts
+    ]
+    summary['selected'] = plan.total
+    print(f"\n作业计划（共 {len(notes)} 条笔记，提取一次）:")
+    for step, matched, assigned in plan.step_counts:
+        print(f"  {step.name}: {step.describe()} -> 满足条件 {matched} 条，分配 {assigned} 条")
+    if plan.conflicts:
+        ui.print_warning(f"{plan.conflicts} 条笔记被多个步骤选中，只由第一个步骤处理")
+    for operation, batch in plan.batches:
+        _print_notes(batch, f"待{OPERATION_TEXTS[operation]}的笔记")
+    if not plan.batches:
+        ui.print_info("没有满足条件的笔记")
+        return EXIT_OK
+    if not args.yes:
+        ui.print_info(f"预览模式：共 {plan.total} 条笔记，分 {len(plan.batches)} 批执行，加上 --yes 执行")
+        return EXIT_OK
+    
+    delay = args.rate or options['delay']
+    verify = args.verify or options['verify']
+    writer = None
+    if args.journal:
+        try:
+            writer = SnapshotWriter(args.journal, ('step', 'operation') + RESULT_FIELDS)
+        except OSError as e:
+            ui.print_error(f"无法创建结果文件: {e}")
+    
+    executed = 0
+    try:
+        for operation, batch in plan.batches:
+            results = hider._execute_operation(batch, operation, verify, delay=delay or 2.0, adaptive=delay is None)
+            if results is None:
+                break
+            executed += 1
+            summary['success'] += results['success']
+            summary['failed'] += results['failed']
+            if writer:
+                for detail in results.get('details', []):
+                    writer.write(dict(detail, step=plan.step_of.get(detail['note_id']), operation=operation))
+    finally:
+        if writer:
+            writer.close()
+            summary['journal'] = args.journal
+            ui.print_info(f"处理结果已写入: {args.journal}")
+    
+    if executed < len(plan.batches):
+        ui.print_error(f"第 {executed + 1} 批未能执行，后续批次已跳过")
+        return EXIT_PARTIAL if summary['success'] else EXIT_FAILED
+    if summary['failed'] == 0:
+        return EXIT_OK
+    return EXIT_PARTIAL if summary['success'] else EXIT_FAILED
+
+
+def _run_retention(hider, args: argparse.Namespace, policy, summary: Dict) -> int:
+    """
+    按保留策略循环同步并处理笔记，Ctrl+C视为正常停止
+    
+    Args:
+        hider: 主程序实例
+        args: 命令行参数
+        policy: 保留策略
+        summary: 结果摘要，执行过程中填写
+        
+    Returns:
+        退出码
+    """
+    from retention import RetentionDaemon, DEFAULT_JOURNAL
+    if args.rate:
+        policy.delay = args.rate
+    policy.verify = policy.verify or args.verify
+    daemon = RetentionDaemon(hider, policy, execute=args.yes, journal_path=args.journal or DEFAULT_JOURNAL)
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        hider.ui.print_info("保留策略已停止")
+        if args.once:
+            raise
+    
+    summary['cycles'] = daemon.totals['cycles']
+    summary['selected'] = daemon.totals['candidates']
+    summary['success'] = daemon.totals['success']
+    summary['failed'] = daemon.totals['failed']
+    summary['journal'] = daemon.journal_path if args.yes else None
+    if daemon.last_cycle and daemon.last_cycle.get('error'):
+        return EXIT_NO_NOTES
+    if summary['failed'] == 0:
+        return EXIT_OK
+    return EXIT_PARTIAL if summary['success'] else EXIT_FAILED
@@ -4,7 +4,8 @@
 """
 
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, List
 from dateutil.parser import parse as date_parse
 
@@ -12,38 +13,177 @@ from dateutil.parser import parse as date_parse
 class DateParser:
     """日期解析器"""
     
-    def __init__(self):
-        self.date_patterns = [
-            # 发布于 2024年06月20日 23:46
-            r'发布于\s*(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})',
-            # 2024-06-20 23:46
-            r'(\d{4})-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})',
-            # 2024/06/20 23:46
-            r'(\d{4})/(\d{1,2})/(\d{1,2})\s*(\d{1,2}):(\d{2})',
-        ]
+    # 小红书常见日期格式，合并为一个预编译正则，单次扫描即可匹配：
+    #   发布于 2024年06月20日 23:46
+    #   2024-06-20 23:46
+    #   2024/06/20 23:46
+    DATE_PATTERN = re.compile(
+        r'(\d{4})(?:年(\d{1,2})月(\d{1,2})日|([-/])(\d{1,2})\4(\d{1,2}))\s*(\d{1,2}):(\d{2})'
+    )
     
-    def parse_date(self, date_str: str) -> Optional[datetime]:
+    # 近期笔记的相对日期和省略年份的短日期，需要结合参考时间解析：
+    #   刚刚 / 3小时前 / 昨天 12:30 / 06-20 / 06-20 23:46
+    RELATIVE_PATTERN = re.compile(
+        r'\s*(?:发布于|编辑于)?\s*(?:'
+        r'(?P<now>刚刚)'
+        r'|(?P<amount>\d+)\s*(?P<unit>秒|分钟|小时|天|周)前'
+        r'|(?P<day>今天|昨天|前天)(?:\s*(?P<day_hour>\d{1,2}):(?P<day_minute>\d{2}))?'
+        r'|(?P<month>\d{1,2})-(?P<mday>\d{1,2})(?:\s+(?P<hour>\d{1,2}):(?P<minute>\d{2}))?'
+        r')\s*$'
+    )
+    RELATIVE_UNITS = {
+        '秒': timedelta(seconds=1),
+        '分钟': timedelta(minutes=1),
+        '小时': timedelta(hours=1),
+        '天': timedelta(days=1),
+        '周': timedelta(weeks=1)
+    }
+    DAY_OFFSETS = {'今天': 0, '昨天': 1, '前天': 2}
+    
+    def __init__(self, cache_size: int = 65536):
+        """
+        初始化日期解析器
+        
+        Args:
+            cache_size: 解析结果缓存的最大条目数，0表示不缓存
+        """
+        # 同一条笔记的日期会在筛选、统计中反复解析，按原始字符串缓存结果
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_uncached)
+    
+    def parse_date(self, date_str: str, reference_time: Optional[datetime] = None) -> Optional[datetime]:
         """
         解析日期字符串
         
         Args:
             date_str: 日期字符串
+            reference_time: 解析相对日期和短日期的参考时间，默认为当前时间
             
         Returns:
             datetime对象或None
         """
         if not date_str:
             return None
+        
+        # 相对日期的结果取决于参考时间，不进入缓存，也不交给dateutil
+        match = self.RELATIVE_PATTERN.match(date_str)
+        if match:
+            return self._resolve_relative(match, reference_time or datetime.now())
+        return self._parse_cached(date_str)
+    
+    @classmethod
+    def is_relative(cls, date_str: str) -> bool:
+        """
+        日期是否为相对日期或省略年份的短日期（解析结果取决于参考时间）
+        
+        Args:
+            date_str: 日期字符串
+            
+        Returns:
+            是否需要参考时间才能解析
+        """
+        return bool(date_str) and cls.RELATIVE_PATTERN.match(date_str) is not None
+    
+    def parse_timestamp(self, date_str: str, reference_time: Optional[datetime] = None) -> Optional[float]:
+        """
+        解析日期字符串为epoch时间戳
+        
+        Args:
+            date_str: 日期字符串
+            reference_time: 解析相对日期和短日期的参考时间，默认为当前时间
+            
+        Returns:
+            epoch秒或None
+        """
+        date_obj = self.parse_date(date_str, reference_time)
+        if not date_obj:
+            return None
+        try:
+            return date_obj.timestamp()
+        except (OverflowError, OSError, ValueError):
+            return None
+    
+    def note_datetime(self, note: dict) -> Optional[datetime]:
+        """
+        获取笔记的发布时间，优先使用提取时写入的时间戳
+        
+        Args:
+            note: 笔记数据字典
             
-        # 尝试各种日期模式
-        for pattern in self.date_patterns:
-            match = re.search(pattern, date_str)
-            if match:
-                try:
-                    year, month, day, hour, minute = map(int, match.groups())
-                    return datetime(year, month, day, hour, minute)
-                except ValueError:
-                    continue
+        Returns:
+            datetime对象或None
+        """
+        timestamp = note.get('timestamp')
+        if timestamp is not None:
+            return datetime.fromtimestamp(timestamp)
+        return self.parse_date(note.get('date', ''))
+            
+    def cache_info(self):
+        """
+        获取解析缓存的命中统计
+        
+        Returns:
+            functools.lru_cache的统计信息
+        """
+        return self._parse_cached.cache_info()
+    
+    def _resolve_relative(self, match, reference_time: datetime) -> Optional[datetime]:
+        """
+        根据参考时间计算相对日期
+        
+        Args:
+            match: RELATIVE_PATTERN的匹配结果
+            reference_time: 参考时间（通常为提取笔记的时间）
+            
+        Returns:
+            datetime对象或None
+        """
+        reference_time = reference_time.replace(microsecond=0)
+        groups = match.groupdict()
+        try:
+            if groups['now']:
+                return reference_time
+            if groups['amount']:
+                return reference_time - int(groups['amount']) * self.RELATIVE_UNITS[groups['unit']]
+            if groups['day']:
+                day = reference_time - timedelta(days=self.DAY_OFFSETS[groups['day']])
+                return day.replace(hour=int(groups['day_hour'] or 0), minute=int(groups['day_minute'] or 0), second=0)
+            
+            # 省略年份的日期属于参考时间之前最近的一个该月日
+            month, day = int(groups['month']), int(groups['mday'])
+            hour, minute = int(groups['hour'] or 0), int(groups['minute'] or 0)
+            year = reference_time.year
+            if (month, day, hour, minute) > (reference_time.month, reference_time.day,
+                                             reference_time.hour, reference_time.minute):
+                year -= 1
+        except ValueError:
+            return None
+        
+        # 02-29在平年无效，向前找最近的闰年（最多相隔8年），其他无效日期返回None
+        for candidate in range(year, year - 9, -1):
+            try:
+                return datetime(candidate, month, day, hour, minute)
+            except ValueError:
+                continue
+        return None
+    
+    def _parse_uncached(self, date_str: str) -> Optional[datetime]:
+        """
+        解析日期字符串（不经过缓存）
+        
+        Args:
+            date_str: 日期字符串
+            
+        Returns:
+            datetime对象或None
+        """
+        # 快速路径：小红书已知格式
+        match = self.DATE_PATTERN.search(date_str)
+        if match:
+            year, cn_month, cn_day, _, month, day, hour, minute = match.groups()
+            try:
+                return datetime(int(year), int(cn_month or month), int(cn_day or day), int(hour), int(minute))
+            except ValueError:
+                pass
         
         # 尝试使用dateutil解析
         try:
@@ -64,7 +204,7 @@ class DateParser:
         """
         filtered_notes = []
         for note in notes:
-            date_obj = self.parse_date(note.get('date', ''))
+            date_obj = self.note_datetime(note)
             if date_obj and date_obj.year == target_year:
                 filtered_notes.append(note)
         return filtered_notes
@@ -83,7 +223,7 @@ class DateParser:
         """
         filtered_notes = []
         for note in notes:
-            date_obj = self.parse_date(note.get('date', ''))
+            date_obj = self.note_datetime(note)
             if date_obj and start_date <= date_obj <= end_date:
                 filtered_notes.append(note)
         return filtered_notes
@@ -100,7 +240,7 @@ class DateParser:
         """
         years = set()
         for note in notes:
-            date_obj = self.parse_date(note.get('date', ''))
+            date_obj = self.note_datetime(note)
             if date_obj:
                 years.add(date_obj.year)
         return sorted(list(years))
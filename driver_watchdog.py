@@ -0,0 +1,252 @@
+"""
+浏览器看门狗模块
+检测卡死的标签页或浏览器并恢复，长时间运行时监控内存并定期重新加载页面
+"""
+
+import socket
+from typing import Dict, Optional
+from urllib3.exceptions import TimeoutError as Urllib3TimeoutError, ProtocolError
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+class DriverWatchdog:
+    """浏览器卡死检测与恢复"""
+    
+    def __init__(self, scraper, max_recoveries: int = 5, sample_interval: int = 50,
+                 heap_growth: float = 2.0, node_growth: float = 1.5, min_heap_mb: float = 256):
+        """
+        初始化看门狗
+        
+        Args:
+            scraper: XiaohongshuScraper实例，负责浏览器的创建和页面加载
+            max_recoveries: 单个会话内允许的最大恢复次数，避免无限重启
+            sample_interval: 批量操作中每处理多少条笔记采样一次内存
+            heap_growth: JS堆相对基线增长到多少倍时重新加载页面
+            node_growth: DOM节点数相对基线增长到多少倍时重新加载页面
+            min_heap_mb: JS堆低于该值（MB）时不因堆增长而重新加载
+        """
+        self.scraper = scraper
+        self.max_recoveries = max_recoveries
+        self.recoveries = 0
+        self.sample_interval = max(1, sample_interval)
+        self.heap_growth = heap_growth
+        self.node_growth = node_growth
+        self.min_heap_mb = min_heap_mb
+        self.soft_reloads = 0
+        self._baseline = None  # 页面加载后（或首次批量操作开始时）采样的内存指标
+        self._cdp_enabled = False
+    
+    @property
+    def driver(self):
+        """当前使用的WebDriver实例（重启后会变化）"""
+        return self.scraper.driver
+    
+    @staticmethod
+    def is_hang_error(error: Exception) -> bool:
+        """
+        判断异常是否由浏览器无响应（命令超时）引起
+        
+        Args:
+            error: 捕获到的异常
+            
+        Returns:
+            是否为超时类错误
+        """
+        if isinstance(error, (Urllib3TimeoutError, socket.timeout, TimeoutException)):
+            return True
+        return "timed out" in str(error).lower()
+    
+    def check(self) -> str:
+        """
+        检查浏览器状态，每个命令都受会话命令超时约束
+        
+        Returns:
+            'ok'、'tab_hung'（页面脚本无响应但浏览器可用）或 'browser_hung'
+        """
+        if not self.driver:
+            return 'browser_hung'
+        try:
+            self.driver.execute_script("return document.readyState")
+            return 'ok'
+        except (WebDriverException, Urllib3TimeoutError, ProtocolError, socket.timeout, OSError) as e:
+            print(f"页面脚本无响应: {e}")
+        
+        try:
+            self.driver.window_handles
+            return 'tab_hung'
+        except (WebDriverException, Urllib3TimeoutError, ProtocolError, socket.timeout, OSError) as e:
+            print(f"浏览器无响应: {e}")
+            return 'browser_hung'
+    
+    def is_responsive(self) -> bool:
+        """
+        浏览器和当前页面是否正常响应
+        
+        Returns:
+            是否正常
+        """
+        return self.check() == 'ok'
+    
+    def recover(self, min_notes: int = 0) -> bool:
+        """
+        恢复卡死的浏览器：页面卡死时在新标签页重新加载，浏览器卡死时重启会话
+        
+        Args:
+            min_notes: 恢复后页面上至少需要加载的笔记数量
+            
+        Returns:
+            是否恢复成功
+        """
+        state = self.check()
+        if state == 'ok':
+            return True
+        
+        if self.recoveries >= self.max_recoveries:
+            print(f"❌ 已恢复 {self.recoveries} 次，不再尝试恢复")
+            return False
+        self.recoveries += 1
+        
+        if state == 'tab_hung':
+            print("⚠ 当前页面无响应，尝试在新标签页重新加载...")
+            if self._reload_in_new_tab(min_notes):
+                return True
+        
+        print("⚠ 浏览器无响应，尝试重启浏览器会话...")
+        return self._restart_session(min_notes)
+    
+    def _reload_in_new_tab(self, min_notes: int) -> bool:
+        """在新标签页打开笔记管理页，并尝试关闭卡死的旧标签页"""
+        try:
+            hung_handle = self.driver.current_window_handle
+            self.driver.switch_to.new_window('tab')
+            fresh_handle = self.driver.current_window_handle
+            try:
+                self.driver.switch_to.window(hung_handle)
+                self.driver.close()
+            except Exception as e:
+                print(f"关闭卡死的标签页失败: {e}")
+            self.driver.switch_to.window(fresh_handle)
+            self._baseline = None
+            if not (self.scraper.reload_note_list(min_notes) and self.is_responsive()):
+                return False
+            self.reset_baseline()
+            return True
+        except Exception as e:
+            print(f"重新加载页面失败: {e}")
+            return False
+    
+    def _restart_session(self, min_notes: int) -> bool:
+        """关闭当前会话并重新启动浏览器"""
+        try:
+            self.scraper.close()
+        except Exception as e:
+            print(f"关闭卡死的浏览器失败: {e}")
+        self.scraper.driver = None
+        self._baseline = None
+        self._cdp_enabled = False
+        
+        try:
+            self.scraper.setup_driver()
+            if not self.scraper.login_if_needed():
+                return False
+            if not (self.scraper.reload_note_list(min_notes, navigate=False) and self.is_responsive()):
+                return False
+            self.reset_baseline()
+            return True
+        except Exception as e:
+            print(f"重启浏览器会话失败: {e}")
+            return False
+    
+    def sample_memory(self) -> Optional[Dict[str, float]]:
+        """
+        采样浏览器内存和DOM规模，优先使用CDP Performance.getMetrics
+        
+        Returns:
+            包含js_heap_mb和nodes的字典，采样失败时为None
+        """
+        try:
+            if not self._cdp_enabled:
+                self.driver.execute_cdp_cmd('Performance.enable', {})
+                self._cdp_enabled = True
+            metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})
+            values = {item['name']: item['value'] for item in metrics.get('metrics', [])}
+            return {
+                'js_heap_mb': values.get('JSHeapUsedSize', 0) / 1024 / 1024,
+                'nodes': values.get('Nodes', 0)
+            }
+        except Exception:
+            self._cdp_enabled = False
+        
+        # 不支持CDP时退回到页面脚本采样
+        try:
+            sample = self.driver.execute_script(
+                "return {heap: (performance.memory ? performance.memory.usedJSHeapSize : 0),"
+                " nodes: document.getElementsByTagName('*').length};"
+            )
+            return {'js_heap_mb': sample['heap'] / 1024 / 1024, 'nodes': sample['nodes']}
+        except Exception as e:
+            print(f"采样浏览器内存失败: {e}")
+            return None
+    
+    def reset_baseline(self) -> None:
+        """以当前页面的内存作为基线，在页面加载或恢复后调用"""
+        self._baseline = self.sample_memory()
+    
+    def ensure_baseline(self) -> None:
+        """批量操作开始时采样基线；已有页面加载后的基线时保留，以便发现跨批次的增长"""
+        if self._baseline is None:
+            self.reset_baseline()
+    
+    def memory_pressure(self) -> Optional[str]:
+        """
+        采样内存并与页面加载后的基线比较
+        
+        Returns:
+            超过阈值时返回原因描述，否则为None
+        """
+        sample = self.sample_memory()
+        if not sample:
+            return None
+        if self._baseline is None:
+            self._baseline = sample
+            return None
+        
+        baseline = self._baseline
+        if sample['js_heap_mb'] >= self.min_heap_mb and sample['js_heap_mb'] >= baseline['js_heap_mb'] * self.heap_growth:
+            return f"JS堆 {baseline['js_heap_mb']:.0f}MB -> {sample['js_heap_mb']:.0f}MB"
+        if baseline['nodes'] and sample['nodes'] >= baseline['nodes'] * self.node_growth:
+            return f"DOM节点 {baseline['nodes']:.0f} -> {sample['nodes']:.0f}"
+        return None
+    
+    def soft_reload(self, min_notes: int = 0) -> bool:
+        """
+        重新加载笔记管理页释放浏览器内存，并加载到足够的笔记
+        
+        Args:
+            min_notes: 重新加载后页面上至少需要的笔记数量
+            
+        Returns:
+            是否重新加载成功
+        """
+        self.soft_reloads += 1
+        reloaded = self.scraper.reload_note_list(min_notes)
+        # 重新加载后以新页面的内存作为基线
+        if reloaded:
+            self.reset_baseline()
+        else:
+            self._baseline = None
+        return reloaded
+    
+    def status(self) -> Optional[str]:
+        """
+        恢复情况摘要
+        
+        Returns:
+            有恢复或重新加载记录时返回描述文本，否则为None
+        """
+        parts = []
+        if self.recoveries:
+            parts.append(f"浏览器卡死恢复 {self.recoveries} 次")
+        if self.soft_reloads:
+            parts.append(f"内存回收重新加载 {self.soft_reloads} 次")
+        return "，".join(parts) if parts else None
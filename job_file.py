@@ -0,0 +1,227 @@
+"""
+作业文件模块
+在一个文件（JSON或YAML）中声明多个操作步骤，共用一次提取的笔记生成合并的执行计划，例如：
+    {"rate": "1/s", "steps": [
+        {"op": "hide", "year": "2019-2020"},
+        {"op": "delete", "year": ["2017", "2018"]},
+        {"op": "show", "query": "year=2024 and visibility=private"}]}
+"""
+
+import json
+import argparse
+from typing import List, Dict, Optional, Tuple
+from note_store import NoteStore
+from note_query import NoteQuery, compile_query
+from cli import OPERATION_TEXTS, year_condition, build_query_text, parse_rate
+
+
+# 合并后批次的执行顺序：删除会使后续笔记重新编号，放在最后
+BATCH_ORDER = ('hide', 'show', 'delete')
+
+STEP_KEYS = {'name', 'op', 'year', 'from', 'to', 'query', 'changed', 'all'}
+
+JOB_KEYS = {'name', 'rate', 'verify', 'steps'}
+
+
+class JobStep:
+    """作业中的一个操作步骤"""
+    
+    def __init__(self, name: str, operation: str, query: Optional[NoteQuery] = None, changed: bool = False):
+        """
+        初始化步骤
+        
+        Args:
+            name: 步骤名称
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            query: 筛选条件，None表示不筛选
+            changed: 是否只在上次同步以来变化的笔记中选择
+        """
+        self.name = name
+        self.operation = operation
+        self.query = query
+        self.changed = changed
+    
+    def describe(self) -> str:
+        """步骤的简短描述"""
+        scope = "变化的笔记中" if self.changed else ""
+        condition = self.query.text if self.query else "全部笔记"
+        return f"{OPERATION_TEXTS[self.operation]} {scope}{condition}"
+
+
+class JobPlan:
+    """作业的合并执行计划"""
+    
+    def __init__(self):
+        """初始化空计划"""
+        self.step_counts = []  # (步骤, 满足条件的笔记数, 实际分配的笔记数)
+        self.batches = []  # (操作类型, 笔记列表)，按执行顺序排列
+        self.step_of = {}  # note_id -> 分配到的步骤名称
+        self.conflicts = 0  # 同时被多个步骤选中、只由第一个步骤处理的笔记数
+    
+    @property
+    def total(self) -> int:
+        """计划处理的笔记总数"""
+        return sum(len(notes) for _, notes in self.batches)
+
+
+def load_job(path: str) -> Dict:
+    """
+    读取作业文件，.yaml/.yml按YAML解析（需要PyYAML），其余按JSON解析
+    
+    Args:
+        path: 作业文件路径
+        
+    Returns:
+        作业内容
+        
+    Raises:
+        OSError: 无法读取文件
+        ValueError: 文件格式错误
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("读取YAML作业文件需要安装PyYAML: pip install pyyaml")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"YAML格式错误: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON格式错误: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("作业文件的顶层必须是对象")
+    return data
+
+
+def parse_job(data: Dict) -> Tuple[List[JobStep], Dict]:
+    """
+    校验作业内容并编译每个步骤的筛选条件
+    
+    Args:
+        data: 作业内容
+        
+    Returns:
+        (步骤列表, 作业选项)，选项包含name、delay（None表示自动调整节奏）和verify
+        
+    Raises:
+        ValueError: 作业内容无效
+    """
+    unknown = set(data) - JOB_KEYS
+    if unknown:
+        raise ValueError(f"未知的作业字段: {', '.join(sorted(unknown))}")
+    raw_steps = data.get('steps')
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise ValueError("作业文件需要非空的steps列表")
+    
+    options = {'name': str(data.get('name', '')), 'delay': None, 'verify': bool(data.get('verify', False))}
+    if data.get('rate') is not None:
+        options['delay'] = _convert(parse_rate, str(data['rate']))
+    
+    steps = [_parse_step(raw, number) for number, raw in enumerate(raw_steps, 1)]
+    return steps, options
+
+
+def _parse_step(raw: Dict, number: int) -> JobStep:
+    """
+    解析单个步骤
+    
+    Args:
+        raw: 步骤内容
+        number: 步骤序号（从1开始）
+        
+    Returns:
+        步骤
+        
+    Raises:
+        ValueError: 步骤内容无效
+    """
+    if not isinstance(raw, dict):
+        raise ValueError(f"第 {number} 步必须是对象")
+    unknown = set(raw) - STEP_KEYS
+    if unknown:
+        raise ValueError(f"第 {number} 步包含未知字段: {', '.join(sorted(unknown))}")
+    operation = raw.get('op')
+    if operation not in OPERATION_TEXTS:
+        raise ValueError(f"第 {number} 步的op必须是 {' / '.join(BATCH_ORDER)} 之一")
+    
+    years = raw.get('year')
+    if years is not None and not isinstance(years, list):
+        years = [years]
+    years = [_convert(year_condition, str(year)) for year in years] if years else None
+    query_text = build_query_text(years, raw.get('from'), raw.get('to'), raw.get('query'))
+    changed = bool(raw.get('changed', False))
+    if not query_text and not changed and not raw.get('all'):
+        raise ValueError(f"第 {number} 步没有筛选条件，处理全部笔记时请显式指定 \"all\": true")
+    
+    query = None
+    if query_text:
+        try:
+            query = compile_query(query_text)
+        except ValueError as e:
+            raise ValueError(f"第 {number} 步的筛选条件无效: {e}")
+    return JobStep(str(raw.get('name') or f"第{number}步"), operation, query, changed)
+
+
+def _convert(converter, text: str):
+    """调用命令行参数的转换函数，把argparse的错误转换为ValueError"""
+    try:
+        return converter(text)
+    except argparse.ArgumentTypeError as e:
+        raise ValueError(str(e))
+
+
+def plan_job(steps: List[JobStep], store: NoteStore, changed_notes: Optional[List] = None) -> JobPlan:
+    """
+    在同一次提取的笔记上执行所有步骤的筛选，生成合并的执行计划
+    
+    每条笔记只分配给第一个选中它的步骤，避免同一条笔记先隐藏再显示。
+    同一操作类型的步骤合并为一个批次，删除批次放在最后，保证前面的批次
+    执行时笔记编号不变。
+    
+    Args:
+        steps: 步骤列表
+        store: 笔记存储
+        changed_notes: 上次同步以来变化的笔记，没有可对比的快照时为None
+        
+    Returns:
+        执行计划
+        
+    Raises:
+        ValueError: 有步骤要求处理变化的笔记，但没有可对比的快照
+    """
+    plan = JobPlan()
+    changed_store = None
+    grouped = {operation: [] for operation in BATCH_ORDER}
+    
+    for step in steps:
+        if step.changed:
+            if changed_notes is None:
+                raise ValueError(f"{step.name} 只处理变化的笔记，但没有可对比的上一次快照")
+            if changed_store is None:
+                changed_store = NoteStore(changed_notes, store.date_parser)
+            source = changed_store
+        else:
+            source = store
+        matched = step.query.select(source) if step.query else list(source.notes)
+        
+        assigned = 0
+        for note in matched:
+            if note['note_id'] in plan.step_of:
+                plan.conflicts += 1
+                continue
+            plan.step_of[note['note_id']] = step.name
+            grouped[step.operation].append(note)
+            assigned += 1
+        plan.step_counts.append((step, len(matched), assigned))
+    
+    for operation in BATCH_ORDER:
+        if grouped[operation]:
+            notes = sorted(grouped[operation], key=lambda note: note.get('element_index', 0))
+            plan.batches.append((operation, notes))
+    return plan
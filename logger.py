@@ -100,7 +100,9 @@ class Logger:
             operation: 操作类型
             results: 操作结果
         """
-        self.info(f"操作完成: {operation}, 结果: {results}")
+        # 逐条明细单独记录，这里只记录汇总数据
+        summary = {key: value for key, value in results.items() if not isinstance(value, (list, dict))}
+        self.info(f"操作完成: {operation}, 结果: {summary}")
     
     def log_note_operation(self, note_id: str, title: str, success: bool, error_msg: Optional[str] = None) -> None:
         """
@@ -0,0 +1,136 @@
+"""
+批量操作预取模块
+在当前笔记的操作间隔内提前定位后续笔记，减少批量操作中的空闲等待
+"""
+
+import time
+from typing import List, Dict, Optional, Tuple
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+
+class NoteLookahead:
+    """批量操作的前瞻预取器"""
+    
+    def __init__(self, manager, notes: List[Dict], control_selectors: List[str], depth: int = 3):
+        """
+        初始化预取器
+        
+        Args:
+            manager: PermissionManager实例
+            notes: 本次批量操作的笔记列表
+            control_selectors: 操作按钮的CSS选择器列表，用于预检
+            depth: 预取的后续笔记数量，0表示不预取
+        """
+        self.manager = manager
+        self.notes = notes
+        self.control_selector = ", ".join(control_selectors)
+        self.depth = max(0, depth)
+        self._resolved = {}  # 笔记位置 -> 预取的元素
+        self._missing_controls = set()  # 预检时没有操作按钮的笔记位置
+        self._scrolled_position = None  # 已预先滚动到可见区域的笔记位置
+        self.hits = 0
+        self.misses = 0
+    
+    def take(self, position: int) -> Tuple[Optional[object], bool]:
+        """
+        取出指定位置的笔记元素，预取元素失效时回退到重新查找
+        
+        Args:
+            position: 笔记在批量列表中的位置
+            
+        Returns:
+            (笔记元素或None, 是否已预先滚动)
+        """
+        element = self._resolved.pop(position, None)
+        if element is not None and self._is_alive(element):
+            self.hits += 1
+            return element, self._scrolled_position == position
+        
+        self.misses += 1
+        note_id = self.notes[position]['note_id']
+        return self.manager._refresh_note_element(note_id), False
+    
+    def reset(self) -> None:
+        """丢弃所有预取结果（页面重新加载或浏览器重启后调用）"""
+        self._resolved.clear()
+        self._missing_controls.clear()
+        self._scrolled_position = None
+    
+    def has_controls(self, position: int) -> bool:
+        """
+        预检结果：指定位置的笔记是否有可用的操作按钮
+        
+        Args:
+            position: 笔记在批量列表中的位置
+            
+        Returns:
+            未预检或预检通过时返回True
+        """
+        return position not in self._missing_controls
+    
+    def prefetch(self, start: int, budget: float) -> None:
+        """
+        在操作间隔内预取后续笔记，剩余时间继续等待，保证总间隔不变
+        
+        Args:
+            start: 下一条待处理笔记的位置
+            budget: 本次操作间隔（秒）
+        """
+        deadline = time.monotonic() + budget
+        
+        if self.depth > 0:
+            try:
+                self._resolve_window(start)
+                self._prescroll(start)
+            except WebDriverException as e:
+                # 预取失败不影响正常流程，处理时会重新查找元素
+                print(f"预取后续笔记失败: {e}")
+        
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def _resolve_window(self, start: int) -> None:
+        """定位预取窗口内尚未解析的笔记，并一次性校验操作按钮"""
+        end = min(start + self.depth, len(self.notes))
+        positions = [p for p in range(start, end) if p not in self._resolved]
+        if not positions:
+            return
+        
+        found = self.manager._resolve_note_elements([self.notes[p]['note_id'] for p in positions])
+        resolved = []
+        for position in positions:
+            element = found.get(self.notes[position]['note_id'])
+            if element is not None:
+                self._resolved[position] = element
+                resolved.append(position)
+        
+        if not resolved:
+            return
+        
+        # 一次脚本调用校验所有预取笔记的操作按钮是否存在
+        flags = self.manager.driver.execute_script(
+            "var selector = arguments[1];"
+            "return arguments[0].map(function(el) { return el.querySelector(selector) !== null; });",
+            [self._resolved[p] for p in resolved], self.control_selector
+        )
+        for position, has_control in zip(resolved, flags or []):
+            if not has_control:
+                self._missing_controls.add(position)
+                self._resolved.pop(position, None)
+    
+    def _prescroll(self, position: int) -> None:
+        """把下一条笔记预先滚动到可见区域"""
+        element = self._resolved.get(position)
+        if element is None:
+            return
+        self.manager.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        self._scrolled_position = position
+    
+    def _is_alive(self, element) -> bool:
+        """检查预取的元素是否仍然有效"""
+        try:
+            element.is_enabled()
+            return True
+        except (StaleElementReferenceException, WebDriverException):
+            return False
@@ -16,14 +16,22 @@ __description__ = "一个小红书笔记批量管理工具"
 
 import sys
 import os
-from typing import List, Dict, Optional
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 
 # 添加当前目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scraper import XiaohongshuScraper
 from permission import PermissionManager
+from driver_watchdog import DriverWatchdog
+from prefetch import NotePrefetcher
+from batch_job import BatchJob
 from date_parser import DateParser
+from note_store import NoteStore
+from snapshot import SnapshotWriter, load_notes, export_notes, export_results, snapshot_path, latest_snapshot
+from snapshot_diff import diff_snapshot_files, SnapshotDiff
 from ui import UserInterface
 from logger import setup_logger, get_logger
 from colorama import Fore
@@ -32,14 +40,31 @@ from colorama import Fore
 class XiaohongshuHider:
     """小红书笔记隐藏器主类"""
     
-    def __init__(self):
-        """初始化主程序"""
+    def __init__(self, headless: bool = False, interactive: bool = True, prefetch: bool = False):
+        """
+        初始化主程序
+        
+        Args:
+            headless: 启动新浏览器时是否使用无头模式
+            interactive: 是否允许等待用户输入，命令行无人值守运行时为False
+            prefetch: 启动菜单时是否在后台预先启动浏览器并提取笔记
+        """
+        self.headless = headless
+        self.interactive = interactive
+        self.prefetch = prefetch
+        self.prefetcher = None  # 后台预取器，结果被使用或取消后清除
+        self.batch_job = None  # 后台批量任务，结束后由主线程收集结果
         self.ui = UserInterface()
         self.logger = setup_logger()
         self.scraper = None
         self.permission_manager = None
         self.date_parser = DateParser()
         self.notes_cache = None  # 缓存笔记数据，避免重复提取
+        self.note_store = None  # 缓存笔记的列式存储，用于快速筛选
+        self.last_diff = None  # 最近一次提取与上一次快照的差异
+        self.catalog_source = None  # 缓存笔记的来源：'live'（浏览器提取）或'snapshot'（本地快照）
+        self.catalog_synced_at = None  # 缓存笔记的同步时间
+        self.watchdog = None  # 浏览器看门狗，随浏览器会话创建
         
     def run(self) -> None:
         """运行主程序"""
@@ -47,7 +72,17 @@ class XiaohongshuHider:
             self.ui.print_header()
             self.logger.info("程序启动")
             
+            if self.prefetch:
+                self.prefetcher = NotePrefetcher(self)
+                self.prefetcher.start()
+                self.ui.print_info("已在后台启动浏览器并提取笔记，可以先选择操作模式")
+            
             while True:
+                # 后台任务结束后先显示结果并更新缓存，未结束时显示进度
+                self._collect_batch_job()
+                if self._batch_job_active():
+                    self.ui.print_info(self.batch_job.status_text())
+                
                 mode = self.ui.get_operation_mode()
                 
                 if mode == 'exit':
@@ -69,6 +104,18 @@ class XiaohongshuHider:
                     self._year_filter_mode('delete')
                 elif mode == 'manual_delete':
                     self._manual_select_mode('delete')
+                elif mode in ('range_hide', 'range_show', 'range_delete'):
+                    self._date_range_mode(mode.split('_', 1)[1])
+                elif mode == 'query':
+                    self._query_mode()
+                elif mode == 'import':
+                    self._import_snapshot_mode()
+                elif mode == 'export':
+                    self._export_snapshot_mode()
+                elif mode == 'changed':
+                    self._changed_notes_mode()
+                elif mode == 'jobs':
+                    self._batch_job_mode()
                 
                 if mode != 'exit':
                     self.ui.wait_for_enter()
@@ -84,25 +131,67 @@ class XiaohongshuHider:
             self._cleanup()
     
     def _view_notes_mode(self) -> None:
-        """仅查看笔记模式"""
-        notes = self._extract_notes()
-        if notes:
-            self.ui.display_notes_summary(notes, "所有笔记")
-            
-            # 显示年份统计
-            available_years = self.date_parser.get_available_years(notes)
-            if available_years:
-                print(f"\n{Fore.CYAN}年份统计:")
-                for year in available_years:
-                    year_notes = self.date_parser.filter_by_year(notes, year)
-                    print(f"{Fore.WHITE}  {year}年: {len(year_notes)} 条")
-        else:
+        """仅查看笔记模式，优先使用缓存或本地快照，不启动浏览器"""
+        started = time.perf_counter()
+        notes = self._load_catalog()
+        if notes is None:
+            self.ui.print_info("没有本地笔记快照，将从浏览器提取")
+            notes = self._extract_notes()
+        if not notes:
             self.ui.print_error("没有找到笔记")
+            return
+            
+        self.ui.display_catalog_status(self.catalog_source, self.catalog_synced_at, len(notes))
+        self.ui.display_notes_summary(notes, "所有笔记")
+        
+        # 显示年份统计（单次扫描）
+        self.ui.display_year_statistics(
+            self.note_store.year_histogram('visibility'),
+            self.note_store.undated_count()
+        )
+        self.ui.print_info(f"载入和统计用时 {time.perf_counter() - started:.2f} 秒")
+        
+        # 在本地数据上反复查询
+        show_help = True
+        while True:
+            query = self.ui.input_query(show_help)
+            if not query:
+                break
+            show_help = False
+            results = query.select(self.note_store)
+            self.ui.display_notes_summary(results, f"查询结果: {query.text}")
+        
+        if self.catalog_source == 'snapshot' and self.ui.get_user_confirmation("是否立即从浏览器刷新笔记数据？", False):
+            self._refresh_notes_mode()
+    
+    def _load_catalog(self) -> Optional[List[Dict]]:
+        """
+        获取可离线查看的笔记：已缓存的笔记，否则加载最近的本地快照
+        
+        Returns:
+            笔记列表，没有缓存也没有快照时返回None
+        """
+        if self.notes_cache is not None:
+            return self.notes_cache
+        
+        path = latest_snapshot("notes")
+        if not path:
+            return None
+        try:
+            notes = load_notes(path)
+        except (OSError, ValueError, TypeError) as e:
+            self.ui.print_warning(f"读取本地快照失败: {e}")
+            return None
+        self._cache_notes(notes, 'snapshot', datetime.fromtimestamp(os.path.getmtime(path)))
+        return notes
     
     def _refresh_notes_mode(self) -> None:
         """刷新笔记模式，清除缓存并重新提取"""
+        if self._refuse_during_batch_job("刷新笔记"):
+            return
+        
         self.ui.print_info("正在清除笔记缓存...")
-        self.notes_cache = None  # 清除缓存
+        self._cache_notes(None)  # 清除缓存
         
         # 重新提取笔记
         notes = self._extract_notes()
@@ -110,13 +199,11 @@ class XiaohongshuHider:
             self.ui.print_success(f"刷新完成，共提取 {len(notes)} 条笔记")
             self.ui.display_notes_summary(notes, "刷新后的笔记")
             
-            # 显示年份统计
-            available_years = self.date_parser.get_available_years(notes)
-            if available_years:
-                print(f"\n{Fore.CYAN}年份统计:")
-                for year in available_years:
-                    year_notes = self.date_parser.filter_by_year(notes, year)
-                    print(f"{Fore.WHITE}  {year}年: {len(year_notes)} 条")
+            # 显示年份统计（单次扫描）
+            self.ui.display_year_statistics(
+                self.note_store.year_histogram('visibility'),
+                self.note_store.undated_count()
+            )
         else:
             self.ui.print_error("刷新后没有找到笔记")
     
@@ -182,19 +269,19 @@ class XiaohongshuHider:
             self.ui.print_error("没有找到笔记")
             return
         
-        # 获取可用年份
-        available_years = self.date_parser.get_available_years(notes)
-        if not available_years:
+        # 获取可用年份及每年的笔记数量
+        year_counts = self.note_store.year_histogram()
+        if not year_counts:
             self.ui.print_error("没有找到有效的日期信息")
             return
         
         # 选择年份
-        selected_year = self.ui.select_year(available_years)
+        selected_year = self.ui.select_year(list(year_counts), year_counts)
         if not selected_year:
             return
         
         # 筛选指定年份的笔记
-        filtered_notes = self.date_parser.filter_by_year(notes, selected_year)
+        filtered_notes = self.note_store.filter_by_year(selected_year)
         if not filtered_notes:
             self.ui.print_info(f"{selected_year}年没有笔记")
             return
@@ -205,7 +292,69 @@ class XiaohongshuHider:
         
         # 确认操作
         if self.ui.confirm_batch_operation(filtered_notes, operation):
-            self._execute_operation(filtered_notes, operation)
+            verify = self.ui.get_user_confirmation("操作结束后是否统一核对笔记的实际状态？", False)
+            self._start_operation(filtered_notes, operation, verify)
+    
+    def _date_range_mode(self, operation: str = 'hide') -> None:
+        """
+        按日期范围筛选模式
+        
+        Args:
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+        """
+        notes = self._extract_notes()
+        if not notes:
+            self.ui.print_error("没有找到笔记")
+            return
+        
+        date_range = self.ui.select_date_range()
+        if not date_range:
+            return
+        start_date, end_date = date_range
+        
+        # 使用有序时间戳索引查找范围内的笔记
+        filtered_notes = self.note_store.filter_by_date_range(start_date, end_date, include_end=False)
+        range_text = self.ui.format_date_range(start_date, end_date)
+        if not filtered_notes:
+            self.ui.print_info(f"{range_text}没有笔记")
+            return
+        
+        undated = self.note_store.undated_count()
+        if undated:
+            self.ui.print_warning(f"有 {undated} 条笔记日期未知，不在筛选范围内")
+        self.ui.print_info(f"找到{range_text}的笔记 {len(filtered_notes)} 条")
+        
+        # 确认操作
+        if self.ui.confirm_batch_operation(filtered_notes, operation):
+            verify = self.ui.get_user_confirmation("操作结束后是否统一核对笔记的实际状态？", False)
+            self._start_operation(filtered_notes, operation, verify)
+    
+    def _query_mode(self) -> None:
+        """按查询条件选择笔记，再选择要执行的操作"""
+        notes = self._extract_notes()
+        if not notes:
+            self.ui.print_error("没有找到笔记")
+            return
+        
+        query = self.ui.input_query()
+        if not query:
+            return
+        
+        selected_notes = query.select(self.note_store)
+        if not selected_notes:
+            self.ui.print_info(f"没有满足条件的笔记: {query.text}")
+            return
+        self.ui.print_info(f"满足条件 '{query.text}' 的笔记 {len(selected_notes)} 条")
+        self.ui.display_notes_summary(selected_notes, "查询结果")
+        
+        operation = self.ui.select_operation()
+        if not operation:
+            return
+        
+        # 确认操作
+        if self.ui.confirm_batch_operation(selected_notes, operation):
+            verify = self.ui.get_user_confirmation("操作结束后是否统一核对笔记的实际状态？", False)
+            self._start_operation(selected_notes, operation, verify)
     
     def _manual_select_mode(self, operation: str = 'hide') -> None:
         """
@@ -230,7 +379,8 @@ class XiaohongshuHider:
         
         # 确认操作
         if self.ui.confirm_batch_operation(selected_notes, operation):
-            self._execute_operation(selected_notes, operation)
+            verify = self.ui.get_user_confirmation("操作结束后是否统一核对笔记的实际状态？", False)
+            self._start_operation(selected_notes, operation, verify)
     
     def _extract_notes(self) -> List[Dict]:
         """
@@ -239,11 +389,23 @@ class XiaohongshuHider:
         Returns:
             笔记列表
         """
+        if self._batch_job_active():
+            self.ui.print_warning("后台任务正在使用浏览器，请在“后台任务”中等待完成或取消后再试")
+            return []
+        
         try:
-            # 检查是否有缓存的笔记数据
-            if self.notes_cache is not None:
+            # 检查是否有缓存的笔记数据（本地快照可能已过时，操作前需要重新提取）
+            if self.notes_cache is not None and self.catalog_source == 'live':
                 self.ui.print_info(f"使用缓存的笔记数据，共 {len(self.notes_cache)} 条笔记")
                 return self.notes_cache
+            if self.notes_cache is not None:
+                self.ui.print_info("当前笔记来自本地快照，将从浏览器重新提取最新数据")
+            
+            # 使用后台预取的结果，预取失败时继续按原流程提取（可复用预取已打开的浏览器）
+            if self.prefetcher is not None:
+                notes = self._take_prefetched_notes()
+                if notes is not None:
+                    return notes
             
             # 检查是否已有Chrome会话
             if self.scraper and self.scraper.driver:
@@ -254,12 +416,14 @@ class XiaohongshuHider:
                     
                     # 重新提取笔记（因为页面状态可能已经改变）
                     self.logger.log_extraction_start()
-                    notes = self.scraper.extract_notes_with_auto_scroll()
+                    notes, diff = self._harvest_notes(self.scraper)
                     self.logger.log_extraction_end(len(notes))
+                    if notes:
+                        self._install_diff(diff)
                     
                     if notes:
                         self.ui.print_success(f"成功提取 {len(notes)} 条笔记")
-                        self.notes_cache = notes  # 缓存笔记数据
+                        self._cache_notes(notes, 'live', self.scraper.extraction_time)  # 缓存笔记数据
                     else:
                         self.ui.print_error("没有提取到笔记")
                     
@@ -273,19 +437,21 @@ class XiaohongshuHider:
             self.ui.print_info("正在启动浏览器...")
             
             # 创建爬虫实例（不使用with语句，避免自动关闭）
-            scraper = XiaohongshuScraper(headless=False)
+            scraper = XiaohongshuScraper(headless=self.headless, interactive=self.interactive)
             scraper.setup_driver()
             self.scraper = scraper
             self.logger.log_extraction_start()
             
             # 提取笔记（使用自动滚动功能）
-            notes = scraper.extract_notes_with_auto_scroll()
+            notes, diff = self._harvest_notes(scraper)
             
             self.logger.log_extraction_end(len(notes))
+            if notes:
+                self._install_diff(diff)
             
             if notes:
                 self.ui.print_success(f"成功提取 {len(notes)} 条笔记")
-                self.notes_cache = notes  # 缓存笔记数据
+                self._cache_notes(notes, 'live', self.scraper.extraction_time)  # 缓存笔记数据
             else:
                 self.ui.print_error("没有提取到笔记")
             
@@ -296,66 +462,479 @@ class XiaohongshuHider:
             self.logger.error(f"提取笔记失败: {e}")
             return []
     
-    def _execute_operation(self, notes: List[Dict], operation: str = 'hide') -> None:
+    def _take_prefetched_notes(self) -> Optional[List[Dict]]:
+        """
+        等待并使用后台预取的结果，等待时按Ctrl+C取消预取
+        
+        Returns:
+            预取到的笔记；被用户取消时返回空列表；预取失败时返回None
+        """
+        prefetcher = self.prefetcher
+        self.prefetcher = None
+        cancelled = False
+        if not prefetcher.done:
+            self.ui.print_info("正在等待后台预取完成（按Ctrl+C取消）...")
+            try:
+                prefetcher.wait()
+            except KeyboardInterrupt:
+                self.ui.print_warning("正在取消后台预取...")
+                prefetcher.cancel()
+                cancelled = True
+        
+        # 显示预取线程暂存的输出（提取过程、快照对比等）
+        output = prefetcher.release_output()
+        if output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        
+        scraper = prefetcher.scraper
+        if scraper and scraper.driver:
+            scraper.cancel_event = None
+            scraper.interactive = self.interactive
+            self.scraper = scraper
+        if cancelled:
+            self.ui.print_info("已取消后台预取")
+            return []
+        if prefetcher.error:
+            self.ui.print_warning(f"后台预取失败: {prefetcher.error}")
+        if not prefetcher.notes:
+            return None
+        
+        notes = prefetcher.notes
+        self.logger.log_extraction_end(len(notes))
+        self._install_diff(prefetcher.diff)
+        self.ui.print_success(f"成功提取 {len(notes)} 条笔记（后台预取）")
+        self._cache_notes(notes, 'live', scraper.extraction_time)
+        return notes
+    
+    def _harvest_notes(self, scraper: XiaohongshuScraper) -> Tuple[List[Dict], Optional[SnapshotDiff]]:
+        """
+        滚动提取笔记，同时把每条笔记写入快照文件，并与上一次快照对比
+        
+        不修改程序状态，可在预取线程中调用；差异由主线程通过_install_diff记录。
+        
+        Args:
+            scraper: 爬虫实例
+            
+        Returns:
+            (笔记列表, 与上一次快照的差异)，没有上一次快照或对比失败时差异为None
+        """
+        previous_snapshot = latest_snapshot("notes")
+        writer = None
+        try:
+            writer = SnapshotWriter(snapshot_path("notes"))
+        except OSError as e:
+            self.ui.print_warning(f"无法创建笔记快照，本次不保存: {e}")
+        
+        try:
+            notes = scraper.extract_notes_with_auto_scroll(on_note=writer.write if writer else None)
+        except Exception:
+            if writer:
+                writer.abort()
+            raise
+        
+        if writer:
+            if notes:
+                writer.close()
+                self.ui.print_info(f"笔记快照已保存到: {writer.path}")
+            else:
+                writer.abort()
+        
+        diff = None
+        if notes and previous_snapshot:
+            diff = self._compare_with_snapshot(previous_snapshot, notes)
+        return notes, diff
+    
+    def _compare_with_snapshot(self, previous_snapshot: str, notes: List[Dict]) -> Optional[SnapshotDiff]:
+        """
+        对比本次提取结果与上一次快照
+        
+        Args:
+            previous_snapshot: 上一次快照路径
+            notes: 本次提取的笔记
+            
+        Returns:
+            差异，对比失败时为None
+        """
+        try:
+            return diff_snapshot_files(previous_snapshot, new_notes=notes)
+        except (OSError, ValueError, TypeError) as e:
+            self.ui.print_warning(f"对比上一次快照失败: {e}")
+            return None
+    
+    def _install_diff(self, diff: Optional[SnapshotDiff]) -> None:
+        """
+        在主线程中记录并显示本次提取与上一次快照的差异
+        
+        Args:
+            diff: 差异，None表示没有可对比的快照
+        """
+        self.last_diff = diff
+        if diff is not None:
+            self.ui.display_snapshot_diff(diff)
+    
+    def _save_results(self, results: Dict) -> None:
+        """
+        把批量操作的逐条结果保存到快照目录
+        
+        Args:
+            results: 批量操作结果
+        """
+        if not results.get('details'):
+            return
+        try:
+            path = snapshot_path("results")
+            export_results(results, path)
+            self.ui.print_info(f"操作结果已保存到: {path}")
+        except OSError as e:
+            self.ui.print_warning(f"保存操作结果失败: {e}")
+    
+    def _changed_notes_mode(self) -> None:
+        """只对上次同步以来变化的笔记应用查询条件和操作"""
+        notes = self._extract_notes()
+        if not notes:
+            self.ui.print_error("没有找到笔记")
+            return
+        if self.last_diff is None:
+            self.ui.print_info("没有可对比的上一次快照，请在再次同步后使用")
+            return
+        
+        changed_notes = self.last_diff.changed_notes()
+        self.ui.display_snapshot_diff(self.last_diff)
+        if not changed_notes:
+            self.ui.print_info("上次同步以来没有新增或变化的笔记")
+            return
+        
+        # 查询条件只在变化的笔记上执行，工作量与变化量成正比
+        changed_store = NoteStore(changed_notes, self.date_parser)
+        query = self.ui.input_query()
+        selected_notes = query.select(changed_store) if query else changed_notes
+        if not selected_notes:
+            self.ui.print_info("变化的笔记中没有满足条件的笔记")
+            return
+        self.ui.display_notes_summary(selected_notes, "变化的笔记中待处理的笔记")
+        
+        operation = self.ui.select_operation()
+        if not operation:
+            return
+        
+        if self.ui.confirm_batch_operation(selected_notes, operation):
+            verify = self.ui.get_user_confirmation("操作结束后是否统一核对笔记的实际状态？", False)
+            self._start_operation(selected_notes, operation, verify)
+    
+    def _apply_results_to_cache(self, results: Dict, operation: str) -> None:
+        """
+        把批量操作结果写回笔记缓存，后续操作无需重新提取
+        
+        Args:
+            results: 批量操作结果
+            operation: 操作类型
+        """
+        if self.note_store is None:
+            return
+        
+        changes = self.note_store.apply_batch_results(results, operation)
+        if not changes['updated'] and not changes['removed']:
+            return
+        self.notes_cache = self.note_store.notes
+        # 差异中的笔记已是操作前的状态，下次同步后重新对比
+        self.last_diff = None
+        if changes['removed']:
+            self.ui.print_info(f"已从笔记缓存中移除 {changes['removed']} 条已删除的笔记，并重新编号")
+        else:
+            self.ui.print_info(f"已更新笔记缓存中 {changes['updated']} 条笔记的可见性")
+        
+        # 保存更新后的笔记快照，下次同步对比时不会把本次操作误报为变化
+        try:
+            export_notes(self.notes_cache, snapshot_path("notes"))
+        except OSError as e:
+            self.ui.print_warning(f"保存更新后的笔记快照失败: {e}")
+    
+    def _import_snapshot_mode(self) -> None:
+        """导入笔记快照作为笔记缓存，无需启动浏览器"""
+        if self._refuse_during_batch_job("导入快照"):
+            return
+        
+        path = self.ui.input_path("请输入快照文件路径", latest_snapshot("notes"))
+        if not path:
+            return
+        
+        try:
+            notes = load_notes(path)
+        except (OSError, ValueError, TypeError) as e:
+            self.ui.print_error(f"读取快照失败: {e}")
+            return
+        if not notes:
+            self.ui.print_error("快照中没有笔记")
+            return
+        
+        self._cache_notes(notes, 'snapshot', datetime.fromtimestamp(os.path.getmtime(path)))
+        self.ui.print_success(f"已从快照导入 {len(notes)} 条笔记")
+        self.ui.print_info("快照中的笔记可用于查看和筛选，执行操作时会自动从浏览器重新提取")
+        self.ui.display_year_statistics(
+            self.note_store.year_histogram('visibility'),
+            self.note_store.undated_count()
+        )
+    
+    def _export_snapshot_mode(self) -> None:
+        """把缓存的笔记导出为JSONL或CSV文件"""
+        if not self.notes_cache:
+            self.ui.print_error("没有缓存的笔记，请先提取或导入笔记")
+            return
+        
+        path = self.ui.input_path("请输入导出文件路径（.jsonl/.csv，可加.gz）", snapshot_path("notes", extension=".csv"))
+        if not path:
+            return
+        try:
+            count = export_notes(self.notes_cache, path)
+            self.ui.print_success(f"已导出 {count} 条笔记到: {path}")
+        except OSError as e:
+            self.ui.print_error(f"导出失败: {e}")
+    
+    def _cache_notes(self, notes: Optional[List[Dict]], source: str = 'live',
+                     synced_at: Optional[datetime] = None) -> None:
+        """
+        缓存笔记数据并建立列式存储
+        
+        Args:
+            notes: 笔记列表，None表示清除缓存
+            source: 笔记来源，'live'表示浏览器提取，'snapshot'表示本地快照
+            synced_at: 笔记的同步时间，默认为当前时间
+        """
+        self.notes_cache = notes
+        self.note_store = NoteStore(notes, self.date_parser) if notes is not None else None
+        self.catalog_source = source if notes is not None else None
+        self.catalog_synced_at = (synced_at or datetime.now()) if notes is not None else None
+    
+    def _execute_operation(self, notes: List[Dict], operation: str = 'hide', verify: bool = False,
+                           delay: float = 2.0, adaptive: bool = True) -> Optional[Dict]:
+        """
+        执行操作（隐藏、显示或删除），完成后显示结果并更新缓存
+        
+        Args:
+            notes: 要操作的笔记列表
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            verify: 批量结束后是否统一核对实际状态
+            delay: 操作间隔时间（秒）
+            adaptive: 是否根据平台提示自动调整操作间隔
+            
+        Returns:
+            批量操作结果，未能执行时返回None
         """
-        执行操作（隐藏、显示或删除）
+        results = self._run_operation_batch(notes, operation, verify, delay, adaptive)
+        if results is not None:
+            self._finish_operation(results, operation)
+        return results
+    
+    def _run_operation_batch(self, notes: List[Dict], operation: str = 'hide', verify: bool = False,
+                             delay: float = 2.0, adaptive: bool = True, control=None) -> Optional[Dict]:
+        """
+        执行批量操作并记录日志，不显示结果也不修改缓存，可在后台线程中调用
         
         Args:
             notes: 要操作的笔记列表
             operation: 操作类型 ('hide', 'show', 或 'delete')
+            verify: 批量结束后是否统一核对实际状态
+            delay: 操作间隔时间（秒）
+            adaptive: 是否根据平台提示自动调整操作间隔
+            control: 批量控制器，用于暂停、继续和取消
+            
+        Returns:
+            批量操作结果，未能执行时返回None
         """
         if not self.scraper or not self.scraper.driver:
             self.ui.print_error("浏览器连接已断开，请重新提取笔记")
-            return
+            return None
+        
+        if operation == 'hide':
+            operation_text = "隐藏"
+            operation_name = "批量隐藏笔记"
+        elif operation == 'show':
+            operation_text = "显示"
+            operation_name = "批量显示笔记"
+        elif operation == 'delete':
+            operation_text = "删除"
+            operation_name = "批量删除笔记"
+        else:
+            self.ui.print_error("未知的操作类型")
+            return None
         
         try:
             # 创建权限管理器
-            self.permission_manager = PermissionManager(self.scraper.driver)
-            
-            if operation == 'hide':
-                operation_text = "隐藏"
-                operation_name = "批量隐藏笔记"
-            elif operation == 'show':
-                operation_text = "显示"
-                operation_name = "批量显示笔记"
-            elif operation == 'delete':
-                operation_text = "删除"
-                operation_name = "批量删除笔记"
-            else:
-                self.ui.print_error("未知的操作类型")
-                return
+            self.permission_manager = PermissionManager(
+                self.scraper.driver,
+                self.scraper.timeout_policy,
+                self._get_watchdog()
+            )
             
             # 记录操作开始
             self.logger.log_operation_start(operation_name, len(notes))
             
             # 执行批量操作
             if operation == 'hide':
-                results = self.permission_manager.hide_notes_batch(notes)
+                results = self.permission_manager.hide_notes_batch(notes, delay, verify=verify, adaptive=adaptive, control=control)
             elif operation == 'show':
-                results = self.permission_manager.show_notes_batch(notes)
-            elif operation == 'delete':
-                results = self.permission_manager.delete_notes_batch(notes)
+                results = self.permission_manager.show_notes_batch(notes, delay, verify=verify, adaptive=adaptive, control=control)
             else:
-                results = {'success': 0, 'failed': len(notes), 'total': len(notes)}
+                results = self.permission_manager.delete_notes_batch(notes, delay, verify=verify, adaptive=adaptive, control=control)
             
-            # 记录操作结束
+            # 记录每条笔记的处理结果和操作结束
+            for detail in results.get('details', []):
+                self.logger.log_note_operation(detail['note_id'], detail['title'], detail['success'], detail['error'])
             self.logger.log_operation_end(operation_name, results)
-            
-            # 显示结果
-            self.ui.display_operation_results(results)
-            
-            # 显示日志文件位置
-            log_file = self.logger.get_log_file_path()
-            if log_file:
-                self.ui.print_info(f"详细日志已保存到: {log_file}")
+            return results
                 
         except Exception as e:
             self.ui.print_error(f"执行{operation_text}操作失败: {e}")
             self.logger.error(f"执行{operation_text}操作失败: {e}")
+            return None
+    
+    def _finish_operation(self, results: Dict, operation: str) -> None:
+        """
+        显示批量操作结果，保存逐条结果并写回笔记缓存
+        
+        Args:
+            results: 批量操作结果
+            operation: 操作类型
+        """
+        self.ui.display_operation_results(results)
+        self._save_results(results)
+        self._apply_results_to_cache(results, operation)
+        
+        # 显示日志文件位置
+        log_file = self.logger.get_log_file_path()
+        if log_file:
+            self.ui.print_info(f"详细日志已保存到: {log_file}")
+    
+    def _start_operation(self, notes: List[Dict], operation: str = 'hide', verify: bool = False) -> None:
+        """
+        在后台任务中执行操作并跟踪进度，按Ctrl+C返回菜单，任务继续运行
+        
+        Args:
+            notes: 要操作的笔记列表
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            verify: 批量结束后是否统一核对实际状态
+        """
+        if self._batch_job_active():
+            self.ui.print_warning("已有后台任务在运行，请等待完成或取消后再开始新的操作")
+            return
+        if not self.scraper or not self.scraper.driver:
+            self.ui.print_error("浏览器连接已断开，请重新提取笔记")
+            return
+        
+        self.batch_job = BatchJob(self, notes, operation, verify)
+        self.batch_job.start()
+        self.ui.print_info("任务已在后台开始，按Ctrl+C返回菜单（任务继续运行），可在“后台任务”中暂停、继续或取消")
+        self._follow_batch_job()
+    
+    def _batch_job_active(self) -> bool:
+        """是否有尚未结束的后台任务"""
+        return self.batch_job is not None and not self.batch_job.done
+    
+    def _refuse_during_batch_job(self, action: str) -> bool:
+        """
+        后台任务运行期间拒绝替换笔记缓存，任务结果要按编号写回开始时的缓存
+        
+        Args:
+            action: 被拒绝的操作名称
+            
+        Returns:
+            是否有后台任务在运行（已拒绝）
+        """
+        if not self._batch_job_active():
+            return False
+        self.ui.print_warning(f"后台任务运行期间不能{action}，请在“后台任务”中等待完成或取消后再试")
+        return True
+    
+    def _follow_batch_job(self) -> None:
+        """持续显示后台任务进度直到结束，按Ctrl+C停止跟踪"""
+        job = self.batch_job
+        try:
+            while not job.wait(1.0):
+                sys.stdout.write(f"\r{job.status_text()}   ")
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            print()
+            self.ui.print_info("已返回菜单，任务继续在后台运行")
+            return
+        print()
+        self._collect_batch_job()
+    
+    def _collect_batch_job(self) -> None:
+        """后台任务结束后，在主线程中显示结果并更新缓存"""
+        job = self.batch_job
+        if job is None or not job.done:
+            return
+        self.batch_job = None
+        
+        for line in job.release_output():
+            print(line)
+        self.ui.print_info(job.status_text())
+        if job.error:
+            self.ui.print_error(f"后台任务出错: {job.error}")
+            self.logger.error(f"后台任务出错: {job.error}")
+        if job.results is not None:
+            self._finish_operation(job.results, job.operation)
+    
+    def _batch_job_mode(self) -> None:
+        """查看和控制后台任务"""
+        while True:
+            job = self.batch_job
+            if job is None:
+                self.ui.print_info("没有正在运行的后台任务")
+                return
+            if job.done:
+                self._collect_batch_job()
+                return
+            
+            print(f"\n{job.status_text()}")
+            for line in job.output_tail(5):
+                print(f"  {line}")
+            command = self.ui.batch_job_command()
+            if command == 'back':
+                return
+            if command == 'pause':
+                job.control.pause()
+                self.ui.print_info("当前笔记处理完后暂停")
+            elif command == 'resume':
+                job.control.resume()
+                self.ui.print_info("已继续")
+            elif command == 'cancel':
+                job.control.cancel()
+                self.ui.print_info("正在取消，当前笔记处理完后停止...")
+                job.wait()
+                self._collect_batch_job()
+                return
+            elif command == 'follow':
+                self._follow_batch_job()
+                if self.batch_job is None:
+                    return
+    
+    def _get_watchdog(self) -> DriverWatchdog:
+        """
+        获取当前浏览器会话的看门狗，跨批量操作保留恢复次数和内存基线
+        
+        Returns:
+            看门狗实例
+        """
+        if self.watchdog is None or self.watchdog.scraper is not self.scraper:
+            self.watchdog = DriverWatchdog(self.scraper)
+        return self.watchdog
     
     def _cleanup(self) -> None:
         """清理资源"""
         try:
+            if self._batch_job_active():
+                self.ui.print_warning("正在取消后台任务，等待当前笔记处理完成...")
+                self.batch_job.control.cancel()
+                self.batch_job.wait(120)
+            self._collect_batch_job()
+            if self.prefetcher is not None:
+                self.prefetcher.cancel()
+                scraper = self.prefetcher.scraper
+                if scraper and scraper is not self.scraper:
+                    scraper.close()
+                self.prefetcher = None
             if self.scraper:
                 self.scraper.close()
             if self.logger:
@@ -365,13 +944,17 @@ class XiaohongshuHider:
 
 
 def main():
-    """主函数"""
+    """主函数，带命令行参数时以非交互方式运行"""
     try:
         # 检查Python版本
         if sys.version_info < (3, 7):
             print("错误: 需要Python 3.7或更高版本")
             sys.exit(1)
         
+        if len(sys.argv) > 1:
+            from cli import run_cli
+            sys.exit(run_cli(sys.argv[1:]))
+        
         # 运行主程序
         hider = XiaohongshuHider()
         hider.run()
@@ -0,0 +1,155 @@
+"""
+笔记分页模块
+只渲染当前页的笔记，翻页、跳转的开销与笔记总数无关，支持按标题搜索缩小列表
+"""
+
+from bisect import bisect_left
+from typing import List, Sequence
+from colorama import Fore
+from title_index import TitleIndex
+
+
+class NotePager:
+    """笔记列表的分页视图"""
+    
+    def __init__(self, notes: Sequence, page_size: int = 20, title_width: int = 45):
+        """
+        初始化分页视图
+        
+        Args:
+            notes: 笔记列表
+            page_size: 每页显示的笔记数
+            title_width: 标题显示的最大长度，超出部分截断
+        """
+        self.notes = notes
+        self.page_size = max(1, page_size)
+        self.title_width = title_width
+        self.keyword = None
+        self.view = range(len(notes))  # 当前显示的笔记在notes中的位置，搜索后为匹配的子集
+        self.page = 0
+    
+    @property
+    def page_count(self) -> int:
+        """当前视图的总页数（至少为1）"""
+        return max(1, (len(self.view) + self.page_size - 1) // self.page_size)
+    
+    def set_page(self, page: int) -> None:
+        """
+        切换到指定页（从0开始），超出范围时取最近的有效页
+        
+        Args:
+            page: 页码
+        """
+        self.page = min(max(0, page), self.page_count - 1)
+    
+    def next_page(self) -> bool:
+        """
+        翻到下一页
+        
+        Returns:
+            是否翻页成功（已是最后一页时返回False）
+        """
+        if self.page + 1 >= self.page_count:
+            return False
+        self.page += 1
+        return True
+    
+    def prev_page(self) -> bool:
+        """
+        翻到上一页
+        
+        Returns:
+            是否翻页成功（已是第一页时返回False）
+        """
+        if self.page == 0:
+            return False
+        self.page -= 1
+        return True
+    
+    def jump_to(self, number: int) -> bool:
+        """
+        跳转到包含指定序号笔记的页
+        
+        Args:
+            number: 笔记序号（从1开始，与列表中显示的序号一致）
+            
+        Returns:
+            该笔记是否在当前视图中
+        """
+        index = number - 1
+        if not 0 <= index < len(self.notes):
+            return False
+        position = bisect_left(self.view, index)  # 视图中的位置始终按升序排列
+        if position >= len(self.view) or self.view[position] != index:
+            return False
+        self.page = position // self.page_size
+        return True
+    
+    def search(self, keyword: str) -> int:
+        """
+        只显示标题包含关键词的笔记，关键词为空时恢复全部笔记
+        
+        Args:
+            keyword: 关键词（忽略全半角和大小写）
+            
+        Returns:
+            匹配的笔记数
+        """
+        text = TitleIndex.normalize(keyword.strip())
+        if not text:
+            self.keyword = None
+            self.view = range(len(self.notes))
+        else:
+            self.keyword = keyword.strip()
+            self.view = [
+                i for i, note in enumerate(self.notes)
+                if text in TitleIndex.normalize(note.get('title', ''))
+            ]
+        self.page = 0
+        return len(self.view)
+    
+    def visible_notes(self) -> List:
+        """
+        当前视图中的全部笔记
+        
+        Returns:
+            笔记列表
+        """
+        if isinstance(self.view, range):
+            return list(self.notes)
+        return [self.notes[i] for i in self.view]
+    
+    def render(self, heading: str, show_status: bool = True) -> str:
+        """
+        渲染当前页
+        
+        Args:
+            heading: 列表标题
+            show_status: 是否显示权限按钮状态（✓/✗）
+            
+        Returns:
+            可一次性写入终端的文本
+        """
+        start = self.page * self.page_size
+        rows = self.view[start:start + self.page_size]
+        width = len(str(len(self.notes)))
+        
+        filter_text = f"，搜索“{self.keyword}”匹配 {len(self.view)} 条" if self.keyword else ""
+        lines = [
+            f"\n{Fore.CYAN}{heading} ({len(self.notes)} 条{filter_text}):",
+            f"{Fore.CYAN}{'-'*50}"
+        ]
+        for i in rows:
+            note = self.notes[i]
+            title = note['title']
+            if len(title) > self.title_width:
+                title = title[:self.title_width] + "..."
+            date = note['date'] or "未知日期"
+            status = ("✓ " if note.get('has_permission_button') else "✗ ") if show_status else ""
+            lines.append(f"{Fore.WHITE}{i + 1:{width}d}. {status}{title} ({date})")
+        if not rows:
+            lines.append(f"{Fore.YELLOW}  没有匹配的笔记")
+        lines.append(f"{Fore.CYAN}{'-'*50}")
+        if self.page_count > 1:
+            lines.append(f"{Fore.CYAN}第 {self.page + 1}/{self.page_count} 页")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,284 @@
+"""
+笔记查询模块
+把查询语句编译为可在NoteStore上执行的筛选条件，例如：
+    year<=2021 and visibility=public and title~"旅行"
+"""
+
+import re
+from datetime import datetime
+from itertools import compress
+from typing import List, Dict, Set, Callable
+from note_store import NoteStore
+
+
+# 查询语法说明，供界面和命令行帮助显示
+QUERY_HELP = """查询语法:
+  year=2021  year<=2021  year>2019       按发布年份（= != < <= > >=）
+  date<2022-03-01  date>="2021-06-01 12:00"  按发布时间
+  visibility=public / private / unknown  按可见性（也可写 公开 / 私密 / 未知）
+  title~旅行  title!~广告  title="标题"   标题包含 / 不包含 / 等于
+  title^=旅行                           标题以指定文本开头
+  条件之间可用 and、or、not 和括号组合，含空格的值请加引号"""
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|(<=|>=|!=|!~|\^=|=|~|<|>)|"([^"]*)"|\'([^\']*)\'|([^\s()<>=!~^"\']+))')
+
+VISIBILITY_ALIASES = {
+    'public': 'public', '公开': 'public', '所有人可见': 'public',
+    'private': 'private', '私密': 'private', '仅自己可见': 'private',
+    'unknown': 'unknown', '未知': 'unknown'
+}
+
+FIELD_OPERATORS = {
+    'year': ('=', '!=', '<', '<=', '>', '>='),
+    'date': ('=', '!=', '<', '<=', '>', '>='),
+    'visibility': ('=', '!='),
+    'title': ('~', '!~', '^=', '=', '!=')
+}
+
+# 条件在NoteStore上求值，返回满足条件的行号集合
+RowFilter = Callable[[NoteStore], Set[int]]
+
+
+class NoteQuery:
+    """编译后的笔记查询"""
+    
+    def __init__(self, text: str, row_filter: RowFilter):
+        """
+        初始化查询
+        
+        Args:
+            text: 原始查询语句
+            row_filter: 编译得到的行号筛选函数
+        """
+        self.text = text
+        self._row_filter = row_filter
+    
+    def rows(self, store: NoteStore) -> List[int]:
+        """
+        在笔记存储上执行查询，返回行号
+        
+        Args:
+            store: 笔记存储
+            
+        Returns:
+            满足条件的行号（按页面顺序）
+        """
+        return sorted(self._row_filter(store))
+    
+    def select(self, store: NoteStore) -> List[Dict]:
+        """
+        在笔记存储上执行查询
+        
+        Args:
+            store: 笔记存储
+            
+        Returns:
+            满足条件的笔记列表（按页面顺序）
+        """
+        return [store.notes[row] for row in self.rows(store)]
+    
+    def __repr__(self) -> str:
+        return f"NoteQuery({self.text!r})"
+
+
+def compile_query(text: str) -> NoteQuery:
+    """
+    编译查询语句
+    
+    Args:
+        text: 查询语句
+        
+    Returns:
+        编译后的查询
+        
+    Raises:
+        ValueError: 查询语句有语法错误
+    """
+    parser = _QueryParser(_tokenize(text))
+    row_filter = parser.parse_or()
+    if parser.peek() is not None:
+        raise ValueError(f"查询语句在 '{parser.peek()[1]}' 附近有多余内容")
+    return NoteQuery(text, row_filter)
+
+
+def _tokenize(text: str) -> List[tuple]:
+    """把查询语句拆分为(类型, 值)列表"""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"无法识别的查询内容: {text[position:]}")
+        position = match.end()
+        lparen, rparen, op, double_quoted, single_quoted, word = match.groups()
+        if lparen:
+            tokens.append(('(', lparen))
+        elif rparen:
+            tokens.append((')', rparen))
+        elif op:
+            tokens.append(('op', op))
+        elif double_quoted is not None or single_quoted is not None:
+            tokens.append(('value', double_quoted if double_quoted is not None else single_quoted))
+        elif word.lower() in ('and', 'or', 'not'):
+            tokens.append((word.lower(), word))
+        else:
+            tokens.append(('word', word))
+    return tokens
+
+
+class _QueryParser:
+    """递归下降解析器，直接生成行号筛选函数"""
+    
+    def __init__(self, tokens: List[tuple]):
+        """
+        初始化解析器
+        
+        Args:
+            tokens: _tokenize生成的记号列表
+        """
+        self.tokens = tokens
+        self.position = 0
+    
+    def peek(self):
+        """查看下一个记号，没有时返回None"""
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+    
+    def take(self, *kinds: str) -> tuple:
+        """读取指定类型的下一个记号"""
+        token = self.peek()
+        if token is None or token[0] not in kinds:
+            found = f"'{token[1]}'" if token else "语句结尾"
+            raise ValueError(f"查询语句语法错误：在{found}处需要{'/'.join(kinds)}")
+        self.position += 1
+        return token
+    
+    def parse_or(self) -> RowFilter:
+        """or连接的条件，结果取并集"""
+        branches = [self.parse_and()]
+        while self.peek() and self.peek()[0] == 'or':
+            self.take('or')
+            branches.append(self.parse_and())
+        if len(branches) == 1:
+            return branches[0]
+        return lambda store: set().union(*(branch(store) for branch in branches))
+    
+    def parse_and(self) -> RowFilter:
+        """and连接的条件，结果取交集"""
+        branches = [self.parse_not()]
+        while self.peek() and self.peek()[0] == 'and':
+            self.take('and')
+            branches.append(self.parse_not())
+        if len(branches) == 1:
+            return branches[0]
+        
+        def intersect(store: NoteStore) -> Set[int]:
+            rows = branches[0](store)
+            for branch in branches[1:]:
+                if not rows:
+                    break
+                rows &= branch(store)
+            return rows
+        return intersect
+    
+    def parse_not(self) -> RowFilter:
+        """not条件、括号或单个比较条件"""
+        if self.peek() and self.peek()[0] == 'not':
+            self.take('not')
+            operand = self.parse_not()
+            return lambda store: set(range(len(store))) - operand(store)
+        if self.peek() and self.peek()[0] == '(':
+            self.take('(')
+            inner = self.parse_or()
+            self.take(')')
+            return inner
+        return self.parse_condition()
+    
+    def parse_condition(self) -> RowFilter:
+        """字段 运算符 值"""
+        field = self.take('word')[1].lower()
+        if field not in FIELD_OPERATORS:
+            raise ValueError(f"未知的查询字段: {field}（可用字段: {', '.join(FIELD_OPERATORS)}）")
+        op = self.take('op')[1]
+        if op not in FIELD_OPERATORS[field]:
+            raise ValueError(f"字段 {field} 不支持运算符 {op}")
+        value = self.take('word', 'value')[1]
+        return getattr(self, f"_compile_{field}")(op, value)
+    
+    def _compile_year(self, op: str, value: str) -> RowFilter:
+        """年份条件"""
+        try:
+            year = int(value)
+        except ValueError:
+            raise ValueError(f"年份必须是数字: {value}")
+        if not 1 <= year < 9999:
+            raise ValueError(f"年份超出范围: {value}")
+        # 年份条件转换为日期范围，使用有序时间戳索引
+        year_start, next_year = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        bounds = {
+            '=': (year_start, next_year),
+            '<': (None, year_start),
+            '<=': (None, next_year),
+            '>': (next_year, None),
+            '>=': (year_start, None),
+        }
+        if op == '!=':
+            return _dated_except(lambda store: _rows_in_range(store, year_start, next_year))
+        start, end = bounds[op]
+        return lambda store: _rows_in_range(store, start, end)
+    
+    def _compile_date(self, op: str, value: str) -> RowFilter:
+        """发布时间条件"""
+        moment = None
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                moment = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        if moment is None:
+            raise ValueError(f"日期格式错误: {value}（应为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM）")
+        
+        if op == '=':
+            return lambda store: set(store.rows_in_range(moment, moment))
+        if op == '!=':
+            return _dated_except(lambda store: set(store.rows_in_range(moment, moment)))
+        if op == '<':
+            return lambda store: set(store.rows_in_range(None, moment, include_end=False))
+        if op == '<=':
+            return lambda store: set(store.rows_in_range(None, moment))
+        if op == '>':
+            return _dated_except(lambda store: set(store.rows_in_range(None, moment)))
+        return _dated_except(lambda store: set(store.rows_in_range(None, moment, include_end=False)))
+    
+    def _compile_visibility(self, op: str, value: str) -> RowFilter:
+        """可见性条件"""
+        visibility = VISIBILITY_ALIASES.get(value.lower())
+        if visibility is None:
+            raise ValueError(f"未知的可见性: {value}（可用: public, private, unknown）")
+        matched = lambda store: set(compress(range(len(store)), store.visibility_mask(visibility)))
+        if op == '!=':
+            return lambda store: set(range(len(store))) - matched(store)
+        return matched
+    
+    def _compile_title(self, op: str, value: str) -> RowFilter:
+        """标题条件"""
+        if op in ('~', '!~'):
+            matched = lambda store: set(compress(range(len(store)), store.title_mask(value)))
+        elif op == '^=':
+            matched = lambda store: set(compress(range(len(store)), store.title_prefix_mask(value)))
+        else:
+            matched = lambda store: set(compress(range(len(store)), store.title_equals_mask(value)))
+        if op in ('!~', '!='):
+            return lambda store: set(range(len(store))) - matched(store)
+        return matched
+
+
+def _rows_in_range(store: NoteStore, start, end) -> Set[int]:
+    """查找[start, end)范围内的行号"""
+    return set(store.rows_in_range(start, end, include_end=False))
+
+
+def _dated_except(excluded: RowFilter) -> RowFilter:
+    """有日期的笔记中排除指定行，日期未知的笔记不满足任何日期条件"""
+    return lambda store: set(store.rows_in_range()) - excluded(store)
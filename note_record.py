@@ -0,0 +1,106 @@
+"""
+笔记记录模块
+紧凑、不可变的笔记数据，不持有页面元素，可直接序列化
+"""
+
+from typing import Dict, Optional, Any
+
+
+class NoteRecord:
+    """单条笔记的数据记录"""
+    
+    # 记录包含的字段，顺序即构造参数和序列化顺序
+    FIELDS = ('note_id', 'title', 'date', 'timestamp', 'visibility', 'has_permission_button', 'element_index')
+    
+    __slots__ = FIELDS
+    
+    def __init__(self, note_id: str, title: str, date: str = "", timestamp: Optional[float] = None,
+                 visibility: str = "unknown", has_permission_button: bool = False, element_index: int = 0):
+        """
+        初始化笔记记录
+        
+        Args:
+            note_id: 笔记ID
+            title: 标题
+            date: 页面上显示的发布日期
+            timestamp: 发布时间的epoch秒，无法解析时为None
+            visibility: 可见性 ('public', 'private' 或 'unknown')
+            has_permission_button: 提取时是否找到权限设置按钮
+            element_index: 笔记在列表中的位置，用于按需重新定位页面元素
+        """
+        setter = object.__setattr__
+        setter(self, 'note_id', note_id)
+        setter(self, 'title', title)
+        setter(self, 'date', date)
+        setter(self, 'timestamp', timestamp)
+        setter(self, 'visibility', visibility)
+        setter(self, 'has_permission_button', has_permission_button)
+        setter(self, 'element_index', element_index)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NoteRecord':
+        """
+        从字典创建记录，忽略多余的键（如旧版数据中的element）
+        
+        Args:
+            data: 笔记数据字典
+            
+        Returns:
+            笔记记录
+        """
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+        
+        Returns:
+            笔记数据字典
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    def replace(self, **changes) -> 'NoteRecord':
+        """
+        创建修改了部分字段的新记录
+        
+        Args:
+            changes: 要修改的字段
+            
+        Returns:
+            新的笔记记录
+        """
+        values = self.to_dict()
+        values.update(changes)
+        return NoteRecord(**values)
+    
+    # 兼容原先的字典访问方式：note['title']、note.get('date', '')
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+    
+    def keys(self):
+        return self.FIELDS
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("NoteRecord是不可变的，请使用replace()创建新记录")
+    
+    def __reduce__(self):
+        return (NoteRecord, tuple(getattr(self, field) for field in self.FIELDS))
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, NoteRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+    
+    def __hash__(self) -> int:
+        return hash(self.note_id)
+    
+    def __repr__(self) -> str:
+        return f"NoteRecord(note_id={self.note_id!r}, title={self.title!r}, date={self.date!r})"
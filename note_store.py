@@ -0,0 +1,359 @@
+"""
+笔记存储模块
+按列存储笔记的时间戳、年份、可见性和标题，筛选时对整列做单次扫描
+"""
+
+import math
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from collections import Counter
+from itertools import compress, repeat
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from date_parser import DateParser
+from title_index import TitleIndex
+from note_record import NoteRecord
+
+
+class NoteStore:
+    """列式笔记存储"""
+    
+    # 可见性状态与列中存储的编码
+    VISIBILITY_NAMES = ('unknown', 'public', 'private')
+    VISIBILITY_CODES = {name: code for code, name in enumerate(VISIBILITY_NAMES)}
+    
+    # 没有有效日期的笔记：时间戳为NaN（任何比较都不成立），年份为0
+    MISSING_TIMESTAMP = math.nan
+    MISSING_YEAR = 0
+    
+    # year_histogram支持的细分维度
+    BREAKDOWNS = ('visibility', 'month')
+    
+    # 批量操作成功后笔记的新可见性
+    OPERATION_VISIBILITY = {'hide': 'private', 'show': 'public'}
+    
+    def __init__(self, notes: Optional[Iterable[Dict]] = None, date_parser: Optional[DateParser] = None):
+        """
+        初始化笔记存储
+        
+        Args:
+            notes: 初始笔记列表
+            date_parser: 笔记缺少时间戳时用于解析日期的解析器
+        """
+        self.date_parser = date_parser or DateParser()
+        self.notes = []  # 原始笔记，按行号排列
+        self.timestamps = array('d')  # 发布时间的epoch秒
+        self.years = array('H')  # 发布年份
+        self.months = array('B')  # 发布月份，缺少日期时为0
+        self.visibility = array('B')  # 可见性编码
+        self.title_ids = array('L')  # 标题在标题池中的位置
+        self.titles = []  # 去重后的标题池
+        self._title_index = {}  # 标题 -> 标题池位置
+        self.title_search = TitleIndex()  # 标题池的二元组倒排索引，键为标题池位置
+        self._sorted_rows = None  # 按时间戳排序的行号，首次按日期范围查询时建立
+        self._sorted_timestamps = None  # 与_sorted_rows对应的有序时间戳
+        
+        if notes:
+            self.extend(notes)
+    
+    def __len__(self) -> int:
+        return len(self.notes)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.notes)
+    
+    def append(self, note: Dict) -> None:
+        """
+        添加一条笔记
+        
+        Args:
+            note: 笔记数据字典
+        """
+        timestamp, year, month = self._parse_note_time(note)
+        self.notes.append(note)
+        self.timestamps.append(timestamp)
+        self.years.append(year)
+        self.months.append(month)
+        self.visibility.append(self.VISIBILITY_CODES.get(note.get('visibility'), 0))
+        self.title_ids.append(self._intern_title(note.get('title', '')))
+        self._sorted_rows = None
+        self._sorted_timestamps = None
+    
+    def extend(self, notes: Iterable[Dict]) -> None:
+        """
+        批量添加笔记
+        
+        Args:
+            notes: 笔记列表
+        """
+        for note in notes:
+            self.append(note)
+    
+    def apply_batch_results(self, results: Dict, operation: str) -> Dict[str, int]:
+        """
+        把批量操作结果写回存储，无需重新提取
+        
+        隐藏和显示成功的笔记更新可见性；删除成功的笔记从存储中移除，
+        剩余笔记按页面上的新位置重新编号（note_id和element_index）。
+        
+        Args:
+            results: 批量操作返回的结果（包含details）
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            
+        Returns:
+            包含updated和removed数量的字典
+        """
+        succeeded = {detail['note_id'] for detail in results.get('details', []) if detail.get('success')}
+        rows = [row for row, note in enumerate(self.notes) if note['note_id'] in succeeded]
+        if not rows:
+            return {'updated': 0, 'removed': 0}
+        
+        if operation == 'delete':
+            self._remove_rows(set(rows))
+            return {'updated': 0, 'removed': len(rows)}
+        
+        visibility = self.OPERATION_VISIBILITY[operation]
+        code = self.VISIBILITY_CODES[visibility]
+        for row in rows:
+            self.notes[row] = self._with_changes(self.notes[row], visibility=visibility)
+            self.visibility[row] = code
+        return {'updated': len(rows), 'removed': 0}
+    
+    def select(self, *masks: Iterable[bool]) -> List[Dict]:
+        """
+        返回所有条件同时成立的笔记
+        
+        Args:
+            masks: 由year_mask、range_mask等方法生成的逐行条件
+            
+        Returns:
+            筛选后的笔记列表（保持原顺序）
+        """
+        if not masks:
+            return list(self.notes)
+        combined = masks[0]
+        for mask in masks[1:]:
+            combined = map(operator.and_, combined, mask)
+        return list(compress(self.notes, combined))
+    
+    def year_mask(self, year: int) -> Iterator[bool]:
+        """发布年份等于指定年份的逐行条件"""
+        return map(operator.eq, self.years, repeat(year))
+    
+    def range_mask(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[bool]:
+        """发布时间落在[start, end]闭区间内的逐行条件，缺少日期的笔记不满足"""
+        low = start.timestamp() if start else -math.inf
+        high = end.timestamp() if end else math.inf
+        return (low <= ts <= high for ts in self.timestamps)
+    
+    def visibility_mask(self, visibility: str) -> Iterator[bool]:
+        """可见性等于指定状态（'public'、'private'或'unknown'）的逐行条件"""
+        return map(operator.eq, self.visibility, repeat(self.VISIBILITY_CODES[visibility]))
+    
+    def title_mask(self, keyword: str) -> Iterator[bool]:
+        """标题包含关键词的逐行条件，通过标题索引查找匹配的标题"""
+        return self._title_id_mask(self.title_search.search(keyword))
+    
+    def title_prefix_mask(self, prefix: str) -> Iterator[bool]:
+        """标题以指定文本开头的逐行条件"""
+        return self._title_id_mask(self.title_search.search_prefix(prefix))
+    
+    def title_equals_mask(self, title: str) -> Iterator[bool]:
+        """标题与指定文本完全相同的逐行条件"""
+        return map(operator.eq, self.title_ids, repeat(self._title_index.get(title, -1)))
+    
+    def search_titles(self, keywords: Iterable[str], match_all: bool = True) -> List[str]:
+        """
+        按标题关键词查找笔记ID
+        
+        Args:
+            keywords: 关键词列表
+            match_all: True表示需包含全部关键词，False表示包含任一关键词即可
+            
+        Returns:
+            笔记ID列表（按页面顺序）
+        """
+        if match_all:
+            title_ids = self.title_search.search_all(keywords)
+        else:
+            title_ids = self.title_search.search_any(keywords)
+        return [note['note_id'] for note in compress(self.notes, self._title_id_mask(title_ids))]
+    
+    def filter_by_year(self, year: int) -> List[Dict]:
+        """
+        按年份筛选笔记
+        
+        Args:
+            year: 目标年份
+            
+        Returns:
+            筛选后的笔记列表
+        """
+        return self.select(self.year_mask(year))
+    
+    def filter_by_date_range(self, start_date: Optional[datetime], end_date: Optional[datetime],
+                             include_end: bool = True) -> List[Dict]:
+        """
+        按日期范围筛选笔记，使用有序时间戳索引二分查找
+        
+        Args:
+            start_date: 开始日期（含），None表示不限
+            end_date: 结束日期，None表示不限
+            include_end: 是否包含结束日期本身
+            
+        Returns:
+            筛选后的笔记列表（保持原顺序）
+        """
+        rows = sorted(self.rows_in_range(start_date, end_date, include_end))
+        return [self.notes[row] for row in rows]
+    
+    def rows_in_range(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                      include_end: bool = True) -> array:
+        """
+        查找发布时间落在范围内的行号，复杂度为O(log n + k)
+        
+        Args:
+            start_date: 开始日期（含），None表示不限
+            end_date: 结束日期，None表示不限
+            include_end: 是否包含结束日期本身
+            
+        Returns:
+            按发布时间升序排列的行号，缺少日期的笔记不在其中
+        """
+        rows, timestamps = self._time_index()
+        low = bisect_left(timestamps, start_date.timestamp()) if start_date else 0
+        if end_date is None:
+            high = len(timestamps)
+        elif include_end:
+            high = bisect_right(timestamps, end_date.timestamp())
+        else:
+            high = bisect_left(timestamps, end_date.timestamp())
+        return rows[low:high]
+    
+    def filter_by_visibility(self, visibility: str) -> List[Dict]:
+        """
+        按可见性筛选笔记
+        
+        Args:
+            visibility: 'public'、'private'或'unknown'
+            
+        Returns:
+            筛选后的笔记列表
+        """
+        return self.select(self.visibility_mask(visibility))
+    
+    def get_available_years(self) -> List[int]:
+        """
+        获取笔记中可用的年份列表
+        
+        Returns:
+            年份列表（已排序）
+        """
+        return list(self.year_histogram())
+    
+    def year_histogram(self, breakdown: Optional[str] = None) -> Dict[int, object]:
+        """
+        单次扫描统计每年的笔记数量
+        
+        Args:
+            breakdown: 细分维度，None只统计总数，'visibility'按可见性细分，'month'按月份细分
+            
+        Returns:
+            按年份排序的字典，不细分时值为笔记数，细分时值为维度取值到笔记数的字典
+        """
+        if breakdown is None:
+            counts = Counter(self.years)
+            counts.pop(self.MISSING_YEAR, None)
+            return {year: counts[year] for year in sorted(counts)}
+        if breakdown not in self.BREAKDOWNS:
+            raise ValueError(f"不支持的细分维度: {breakdown}")
+        
+        column = self.visibility if breakdown == 'visibility' else self.months
+        histogram = {}
+        for (year, value), count in sorted(Counter(zip(self.years, column)).items()):
+            if year == self.MISSING_YEAR:
+                continue
+            if breakdown == 'visibility':
+                value = self.VISIBILITY_NAMES[value]
+            histogram.setdefault(year, {})[value] = count
+        return histogram
+    
+    def undated_count(self) -> int:
+        """
+        统计没有有效日期的笔记数量
+        
+        Returns:
+            笔记数
+        """
+        return self.years.count(self.MISSING_YEAR)
+    
+    def _remove_rows(self, removed: set) -> None:
+        """
+        移除指定行并重新编号剩余笔记，标题池和标题索引保持不变
+        
+        新位置为原element_index减去其前面被删除的元素个数，提取时跳过的
+        元素仍占据页面位置，不能按剩余笔记的行号重新编号。
+        """
+        keep = [row for row in range(len(self.notes)) if row not in removed]
+        removed_indexes = sorted(self.notes[row].get('element_index', row) for row in removed)
+        notes = []
+        for row in keep:
+            note = self.notes[row]
+            element_index = note.get('element_index', row)
+            position = element_index - bisect_left(removed_indexes, element_index)
+            if position != element_index:
+                note = self._with_changes(note, note_id=f"note_index_{position}", element_index=position)
+            notes.append(note)
+        self.notes = notes
+        self.timestamps = array('d', map(self.timestamps.__getitem__, keep))
+        self.years = array('H', map(self.years.__getitem__, keep))
+        self.months = array('B', map(self.months.__getitem__, keep))
+        self.visibility = array('B', map(self.visibility.__getitem__, keep))
+        self.title_ids = array('L', map(self.title_ids.__getitem__, keep))
+        self._sorted_rows = None
+        self._sorted_timestamps = None
+    
+    @staticmethod
+    def _with_changes(note, **changes):
+        """返回修改了部分字段的笔记，NoteRecord不可变，字典则复制后修改"""
+        if isinstance(note, NoteRecord):
+            return note.replace(**changes)
+        return dict(note, **changes)
+    
+    def _time_index(self) -> Tuple[array, array]:
+        """获取按时间戳排序的行号和时间戳，笔记变化后重新建立"""
+        if self._sorted_rows is None:
+            # NaN不等于自身，借此排除缺少日期的笔记
+            rows = sorted((row for row, ts in enumerate(self.timestamps) if ts == ts),
+                          key=self.timestamps.__getitem__)
+            self._sorted_rows = array('L', rows)
+            self._sorted_timestamps = array('d', map(self.timestamps.__getitem__, rows))
+        return self._sorted_rows, self._sorted_timestamps
+    
+    def _parse_note_time(self, note: Dict) -> Tuple[float, int, int]:
+        """读取笔记的时间戳、年份和月份，提取时没有写入时间戳的笔记在这里解析一次"""
+        timestamp = note.get('timestamp')
+        if timestamp is None:
+            timestamp = self.date_parser.parse_timestamp(note.get('date', ''))
+        if timestamp is None:
+            return self.MISSING_TIMESTAMP, self.MISSING_YEAR, 0
+        moment = datetime.fromtimestamp(timestamp)
+        return timestamp, moment.year, moment.month
+    
+    def _title_id_mask(self, title_ids) -> Iterator[bool]:
+        """标题池位置属于指定集合的逐行条件"""
+        matched = bytearray(len(self.titles))
+        for title_id in title_ids:
+            matched[title_id] = 1
+        return map(matched.__getitem__, self.title_ids)
+    
+    def _intern_title(self, title: str) -> int:
+        """把标题放入标题池并返回其位置，新标题同时加入标题索引"""
+        title_id = self._title_index.get(title)
+        if title_id is None:
+            title_id = len(self.titles)
+            self.titles.append(title)
+            self._title_index[title] = title_id
+            self.title_search.add(title_id, title)
+        return title_id
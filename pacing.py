@@ -0,0 +1,107 @@
+"""
+自适应节奏模块
+根据平台提示和操作耗时动态调整批量操作间隔
+"""
+
+from typing import Optional, List
+
+
+class AdaptivePacer:
+    """自适应操作间隔控制器"""
+    
+    # 平台限流提示中常见的关键词
+    THROTTLE_KEYWORDS = ["频繁", "过快", "太快", "稍后再试", "稍后重试", "限制", "繁忙"]
+    
+    def __init__(self, base_delay: float = 2.0, min_delay: Optional[float] = None, max_delay: Optional[float] = None,
+                 backoff: float = 2.0, speedup: float = 0.85, success_streak: int = 5):
+        """
+        初始化节奏控制器
+        
+        Args:
+            base_delay: 初始操作间隔（秒）
+            min_delay: 最小操作间隔，默认为初始间隔的1/4
+            max_delay: 最大操作间隔，默认为初始间隔的8倍
+            backoff: 检测到限流时间隔放大的倍数
+            speedup: 连续成功后间隔缩小的倍数
+            success_streak: 连续成功多少次后加速
+        """
+        self.base_delay = base_delay
+        self.min_delay = min_delay if min_delay is not None else base_delay / 4
+        self.max_delay = max_delay if max_delay is not None else base_delay * 8
+        self.backoff = backoff
+        self.speedup = speedup
+        self.success_streak = max(1, success_streak)
+        self.delay = base_delay
+        self.throttle_events = 0
+        self._streak = 0
+        self._failure_streak = 0
+        self._latency_baseline = None
+    
+    def record(self, success: bool, latency: float, toast_text: str = "") -> List[str]:
+        """
+        记录一次操作结果并调整后续间隔
+        
+        Args:
+            success: 操作是否成功
+            latency: 操作耗时（秒）
+            toast_text: 操作后页面出现的提示文本
+            
+        Returns:
+            本次检测到的限流信号描述列表
+        """
+        signals = []
+        
+        keyword = self._match_throttle_keyword(toast_text)
+        if keyword:
+            signals.append(f"平台提示包含'{keyword}'")
+        
+        # 连续失败说明平台可能已经不再响应修改
+        if success:
+            self._failure_streak = 0
+        else:
+            self._failure_streak += 1
+            if self._failure_streak >= 2:
+                signals.append(f"连续 {self._failure_streak} 次操作失败")
+        
+        # 操作耗时明显高于基线时视为平台变慢（至少慢1秒，避免短耗时下的抖动误判）
+        if self._latency_baseline is not None and latency > max(self._latency_baseline * 2, self._latency_baseline + 1):
+            signals.append(f"操作耗时 {latency:.1f}s 明显高于平均 {self._latency_baseline:.1f}s")
+        if success and not signals:
+            self._latency_baseline = latency if self._latency_baseline is None else (
+                self._latency_baseline * 0.8 + latency * 0.2
+            )
+        
+        if signals:
+            self.throttle_events += 1
+            self._streak = 0
+            self.delay = min(self.max_delay, self.delay * self.backoff)
+        elif success:
+            self._streak += 1
+            if self._streak >= self.success_streak:
+                self._streak = 0
+                self.delay = max(self.min_delay, self.delay * self.speedup)
+        
+        return signals
+    
+    def rate_per_minute(self, average_latency: Optional[float] = None) -> float:
+        """
+        估算当前节奏下每分钟可处理的笔记数
+        
+        Args:
+            average_latency: 单条笔记操作的平均耗时，默认使用观测基线
+            
+        Returns:
+            每分钟处理的笔记数
+        """
+        latency = average_latency if average_latency is not None else (self._latency_baseline or 0)
+        cycle = self.delay + latency
+        return 60 / cycle if cycle > 0 else 0
+    
+    def _match_throttle_keyword(self, text: str) -> Optional[str]:
+        """返回提示文本中匹配到的限流关键词"""
+        if not text:
+            return None
+        for keyword in self.THROTTLE_KEYWORDS:
+            if keyword in text:
+                return keyword
+        return None
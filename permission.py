@@ -4,27 +4,46 @@
 """
 
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from locators import Locators
+from lookahead import NoteLookahead
+from scheduler import BatchScheduler
+from pacing import AdaptivePacer
+from timeouts import TimeoutPolicy, STATS_FILENAME
+from snapshot import runtime_path
+from driver_watchdog import DriverWatchdog
+
+
+# 操作类型对应的中文名称
+OPERATION_TEXTS = {
+    'hide': '隐藏',
+    'show': '显示',
+    'delete': '删除'
+}
 
 
 class PermissionManager:
     """权限管理器"""
     
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: webdriver.Chrome, timeout_policy: Optional[TimeoutPolicy] = None,
+                 watchdog: Optional[DriverWatchdog] = None):
         """
         初始化权限管理器
         
         Args:
             driver: WebDriver实例
+            timeout_policy: 自适应超时策略，默认新建并加载历史统计
+            watchdog: 浏览器卡死检测与恢复，为None时不做恢复
         """
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.timeout_policy = timeout_policy or TimeoutPolicy(runtime_path(STATS_FILENAME))
+        self.watchdog = watchdog
+        self.wait = WebDriverWait(driver, self.timeout_policy.ceiling)
     
     def hide_note(self, note_element) -> bool:
         """
@@ -38,24 +57,63 @@ class PermissionManager:
         """
         return self._set_note_visibility(note_element, "private")
     
-    def hide_notes_batch(self, notes: List[Dict], delay: float = 2.0) -> Dict[str, int]:
+    def hide_notes_batch(self, notes: List[Dict], delay: float = 2.0, lookahead: int = 3,
+                         preserve_order: bool = False, verify: bool = False, adaptive: bool = True,
+                         control=None) -> Dict:
         """
         批量隐藏笔记
         
         Args:
             notes: 笔记列表
             delay: 操作间隔时间（秒）
+            lookahead: 在操作间隔内预取的后续笔记数量，0表示不预取
+            preserve_order: 是否严格按传入顺序执行，默认按页面位置重排
+            verify: 批量结束后是否一次性核对所有笔记的实际状态
+            adaptive: 是否根据平台提示和操作耗时自动调整操作间隔
+            control: 批量控制器，支持在两条笔记之间暂停、继续和取消
             
         Returns:
-            操作结果统计
+            操作结果统计，details中包含每条笔记的处理结果
         """
+        return self._run_batch(notes, 'hide', delay, lookahead, preserve_order, verify, adaptive, control)
+    
+    def _run_batch(self, notes: List[Dict], operation: str, delay: float, lookahead: int,
+                   preserve_order: bool = False, verify: bool = False, adaptive: bool = True,
+                   control=None) -> Dict:
+        """
+        批量操作执行引擎，隐藏、显示和删除共用
+        
+        执行前按页面位置重排笔记顺序（除非要求保持原顺序）。每条笔记操作
+        完成后的间隔时间内，会预先定位并校验后续笔记，同时把下一条笔记
+        滚动到可见区域，操作间隔本身保持不变。需要核对时，在全部操作
+        结束后统一读取一次页面状态，不在每条笔记之后增加额外的往返。
+        开启自适应节奏时，操作间隔以delay为起点，遇到限流提示或耗时突增
+        时放慢，连续成功后逐步加快。
+        提供control时，每条笔记开始前检查暂停和取消：暂停时等待继续，
+        取消时在当前笔记处理完后停止，已处理笔记的结果照常返回。
+        
+        Args:
+            notes: 笔记列表
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            delay: 操作间隔时间（秒）
+            lookahead: 预取的后续笔记数量
+            preserve_order: 是否严格按传入顺序执行
+            verify: 是否在批量结束后核对实际状态
+            adaptive: 是否自动调整操作间隔
+            control: 批量控制器（BatchControl），None表示不可暂停和取消
+            
+        Returns:
+            操作结果统计，details中包含每条笔记的处理结果；被取消时cancelled为True
+        """
+        operation_text = OPERATION_TEXTS[operation]
         results = {
             'success': 0,
             'failed': 0,
-            'total': len(notes)
+            'total': len(notes),
+            'details': []
         }
         
-        print(f"开始批量隐藏 {len(notes)} 条笔记...")
+        print(f"开始批量{operation_text} {len(notes)} 条笔记...")
         
         # 首先检查WebDriver连接
         if not self._check_driver_connection():
@@ -64,46 +122,132 @@ class PermissionManager:
             results['failed'] = len(notes)
             return results
         
-        for i, note in enumerate(notes, 1):
+        notes = self._schedule_batch(notes, operation, preserve_order)
+        
+        # 删除按(标题, 日期)核对，需要批量前的计数来排除未被删除的同名同日期笔记
+        before_counts = self._count_note_keys() if verify and operation == 'delete' else None
+        if self.watchdog:
+            self.watchdog.ensure_baseline()
+        
+        control_selectors = Locators.DELETE_BUTTON_SELECTORS if operation == 'delete' else Locators.PERMISSION_BUTTON_SELECTORS
+        prefetcher = NoteLookahead(self, notes, control_selectors, depth=lookahead)
+        pacer = AdaptivePacer(delay) if adaptive else None
+        total_latency = 0.0
+        
+        position = 0
+        retried = set()  # 浏览器恢复后已重试过的笔记位置
+        while position < len(notes):
+            if control and not control.checkpoint():
+                results['cancelled'] = True
+                print(f"⏹ 批量操作已取消，剩余 {len(notes) - position} 条笔记未处理")
+                break
+            
+            note = notes[position]
+            i = position + 1
             print(f"处理第 {i}/{len(notes)} 条笔记: {note['title'][:30]}...")
             
             try:
-                # 在每次操作前检查连接
+                # 在每次操作前检查连接，浏览器卡死时先尝试恢复
                 if not self._check_driver_connection():
+                    if self._recover_driver(notes, position):
+                        prefetcher.reset()
+                        continue
                     print("❌ WebDriver连接断开，停止批量操作")
                     print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
                     break
                 
-                # 重新获取笔记元素（避免元素过期）
-                note_element = self._refresh_note_element(note['note_id'])
-                if not note_element:
-                    print(f"❌ 无法找到笔记元素: {note['note_id']}")
-                    results['failed'] += 1
-                    continue
+                # 定期采样浏览器内存，增长过多时重新加载页面并定位到当前笔记
+                if self.watchdog and position and position % self.watchdog.sample_interval == 0:
+                    reloaded = self._relieve_memory_pressure(notes, position)
+                    if reloaded is not None:
+                        prefetcher.reset()
+                    if reloaded is False:
+                        print(f"❌ 页面未能重新加载，停止批量操作，剩余 {len(notes) - position} 条笔记未处理")
+                        print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
+                        break
                 
-                # 隐藏笔记
-                if self.hide_note(note_element):
-                    results['success'] += 1
-                    print(f"✓ 成功隐藏")
+                # 预检阶段已确认没有操作按钮的笔记直接判定失败，省去滚动和查找
+                if not prefetcher.has_controls(position):
+                    print(f"❌ 预检未找到操作按钮: {note['note_id']}")
+                    self._record_outcome(results, note, False, "未找到操作按钮")
                 else:
-                    results['failed'] += 1
-                    print(f"✗ 隐藏失败")
+                    # 优先使用预取的元素，失效时重新获取（避免元素过期）
+                    note_element, scrolled = prefetcher.take(position)
+                    if not note_element:
+                        print(f"❌ 无法找到笔记元素: {note['note_id']}")
+                        self._record_outcome(results, note, False, "未找到笔记元素")
+                    else:
+                        started = time.monotonic()
+                        success = self._apply_operation(note_element, operation, scrolled)
+                        latency = time.monotonic() - started
+                        total_latency += latency
+                        
+                        # 失败可能是页面卡死导致，恢复后重试一次；删除操作可能已生效，不重试
+                        if not success and self.watchdog and position not in retried and not self.watchdog.is_responsive():
+                            retried.add(position)
+                            if self._recover_driver(notes, position):
+                                prefetcher.reset()
+                                if operation != 'delete':
+                                    continue
+                                self._record_outcome(results, note, False, "浏览器无响应，删除结果未知，请核对")
+                                position += 1
+                                continue
+                        
+                        if success:
+                            self._record_outcome(results, note, True)
+                            print(f"✓ 成功{operation_text}")
+                        else:
+                            self._record_outcome(results, note, False, f"{operation_text}失败")
+                            print(f"✗ {operation_text}失败")
+                        
+                        if pacer:
+                            self._adjust_pacing(pacer, success, latency)
                 
-                # 操作间隔
+                # 操作间隔，同时预取后续笔记
                 if i < len(notes):
-                    time.sleep(delay)
+                    prefetcher.prefetch(i, pacer.delay if pacer else delay)
                     
             except Exception as e:
+                # 命令超时说明浏览器卡死，恢复后重试当前笔记（删除操作除外）
+                if self.watchdog and self.watchdog.is_hang_error(e) and position not in retried:
+                    retried.add(position)
+                    print(f"⚠ 浏览器命令超时: {e}")
+                    if self._recover_driver(notes, position) and operation != 'delete':
+                        prefetcher.reset()
+                        continue
+                    prefetcher.reset()
+                
                 print(f"❌ 处理笔记时发生错误: {e}")
-                results['failed'] += 1
+                self._record_outcome(results, note, False, str(e))
                 
                 # 如果是连接错误，停止批量操作
                 if "Connection refused" in str(e) or "Max retries exceeded" in str(e):
                     print("❌ 检测到连接问题，停止批量操作")
                     print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
                     break
+            
+            position += 1
+            if control:
+                control.report(position, len(notes), results)
+        
+        if verify:
+            self._verify_batch_results(results, operation, before_counts)
+        
+        self.timeout_policy.save()
         
         print(f"批量操作完成: 成功 {results['success']} 条，失败 {results['failed']} 条")
+        if pacer:
+            attempted = len(results['details'])
+            average_latency = total_latency / attempted if attempted else None
+            results['final_delay'] = round(pacer.delay, 2)
+            results['rate_per_minute'] = round(pacer.rate_per_minute(average_latency), 1)
+            results['throttle_events'] = pacer.throttle_events
+            print(f"操作节奏稳定在间隔 {pacer.delay:.2f} 秒，约 {results['rate_per_minute']} 条/分钟，"
+                  f"期间检测到 {pacer.throttle_events} 次限流信号")
+        if self.watchdog and self.watchdog.status():
+            print(self.watchdog.status())
+        if lookahead > 0:
+            print(f"预取命中 {prefetcher.hits} 次，重新定位 {prefetcher.misses} 次")
         
         # 如果有失败的操作，提供建议
         if results['failed'] > 0:
@@ -115,6 +259,375 @@ class PermissionManager:
         
         return results
     
+    def _recover_driver(self, notes: List[Dict], position: int) -> bool:
+        """
+        浏览器无响应时通过看门狗恢复，并重新加载足够的笔记以便从当前位置继续
+        
+        Args:
+            notes: 批量操作的笔记列表
+            position: 当前处理到的位置
+            
+        Returns:
+            是否恢复成功
+        """
+        if not self.watchdog:
+            return False
+        
+        pending = notes[position:]
+        min_count = max((note.get('element_index', 0) for note in pending), default=0) + 1
+        if not self.watchdog.recover(min_count):
+            return False
+        
+        self.driver = self.watchdog.driver
+        print(f"✓ 浏览器已恢复，从第 {position + 1} 条笔记继续")
+        return True
+    
+    def _relieve_memory_pressure(self, notes: List[Dict], position: int) -> Optional[bool]:
+        """
+        浏览器内存或DOM规模超过阈值时重新加载页面
+        
+        重新加载失败时，浏览器无响应则通过看门狗恢复；浏览器正常但页面
+        没有加载出足够的笔记时，后续笔记无法定位，返回False由调用方停止。
+        
+        Args:
+            notes: 批量操作的笔记列表
+            position: 下一条待处理笔记的位置
+            
+        Returns:
+            未超过阈值时为None，页面已重新加载（或已恢复）时为True，重新加载失败时为False
+        """
+        reason = self.watchdog.memory_pressure()
+        if not reason:
+            return None
+        
+        pending = notes[position:]
+        min_count = max((note.get('element_index', 0) for note in pending), default=0) + 1
+        print(f"⚠ 浏览器内存增长（{reason}），重新加载页面...")
+        if self.watchdog.soft_reload(min_count):
+            print(f"✓ 页面已重新加载，从第 {position + 1} 条笔记继续")
+            return True
+        
+        print("⚠ 重新加载页面失败")
+        if not self.watchdog.is_responsive():
+            return self._recover_driver(notes, position)
+        return False
+    
+    def _adjust_pacing(self, pacer: AdaptivePacer, success: bool, latency: float) -> None:
+        """
+        读取操作后的平台提示，交给节奏控制器调整后续间隔
+        
+        Args:
+            pacer: 节奏控制器
+            success: 本次操作是否成功
+            latency: 本次操作耗时（秒）
+        """
+        previous_delay = pacer.delay
+        signals = pacer.record(success, latency, self._read_toast_text())
+        if signals:
+            print(f"⚠ 检测到限流信号（{'；'.join(signals)}），操作间隔 {previous_delay:.2f}s -> {pacer.delay:.2f}s")
+        elif pacer.delay < previous_delay:
+            print(f"操作持续成功，操作间隔 {previous_delay:.2f}s -> {pacer.delay:.2f}s")
+    
+    def _read_toast_text(self) -> str:
+        """
+        读取页面上新出现的提示消息
+        
+        读取过的提示元素会打上标记，停留在页面上跨越多条笔记的同一条提示
+        只计一次，避免一次限流信号被重复放大间隔；再次出现的新提示照常读取。
+        
+        Returns:
+            新提示消息的文本，读取失败时为空字符串
+        """
+        try:
+            return self.driver.execute_script(
+                "var fresh = Array.prototype.filter.call(document.querySelectorAll(arguments[0]),"
+                " function(el) { return !el.hasAttribute('data-pacer-seen'); });"
+                "fresh.forEach(function(el) { el.setAttribute('data-pacer-seen', '1'); });"
+                "return fresh.map(function(el) { return el.innerText.trim(); }).join(' ');",
+                Locators.TOAST_MESSAGE
+            ) or ""
+        except Exception:
+            return ""
+    
+    def _record_outcome(self, results: Dict, note: Dict, success: bool, error: Optional[str] = None) -> None:
+        """
+        记录单条笔记的处理结果
+        
+        Args:
+            results: 批量操作结果
+            note: 笔记数据
+            success: 是否成功
+            error: 失败原因
+        """
+        results['success' if success else 'failed'] += 1
+        results['details'].append({
+            'note_id': note['note_id'],
+            'title': note['title'],
+            'date': note.get('date', ''),
+            'success': success,
+            'error': error
+        })
+    
+    def _verify_batch_results(self, results: Dict, operation: str,
+                              before_counts: Optional[Dict[Tuple[str, str], int]] = None) -> None:
+        """
+        批量结束后一次性读取页面状态，把实际未生效的笔记改记为失败
+        
+        隐藏和显示按笔记索引核对权限状态；删除按(标题, 日期)比较批量前后
+        页面上的笔记数量：每个键剩余的数量超过“批量前数量 - 成功删除数”
+        的部分才是未生效的删除，未被选中的同名同日期笔记不会被误判。
+        没有批量前的计数时，仍在页面上的同键笔记只计入无法核对。
+        页面上无法确认状态的笔记保持原结果，只计入无法核对。
+        
+        Args:
+            results: 批量操作结果
+            operation: 操作类型
+            before_counts: 删除前页面上每个(标题, 日期)的笔记数量
+        """
+        print("正在核对批量操作结果...")
+        try:
+            items = self._snapshot_note_items()
+        except Exception as e:
+            print(f"⚠ 读取页面状态失败，跳过核对: {e}")
+            return
+        
+        mismatched = 0
+        unverified = 0
+        expected = {'hide': 'private', 'show': 'public'}.get(operation)
+        
+        if operation == 'delete':
+            after_counts = self._key_counts(items)
+            deleted = {}
+            for detail in results['details']:
+                if detail['success']:
+                    key = (detail['title'], detail['date'])
+                    deleted.setdefault(key, []).append(detail)
+        
+            for key, details in deleted.items():
+                remaining = after_counts.get(key, 0)
+                if before_counts is None:
+                    # 无法区分未生效的删除和未被选中的同键笔记
+                    unverified += min(remaining, len(details))
+                    continue
+                not_deleted = min(len(details), max(0, remaining - (before_counts.get(key, 0) - len(details))))
+                for detail in details[len(details) - not_deleted:]:
+                    self._mark_unconfirmed(results, detail)
+                    mismatched += 1
+        else:
+            for detail in results['details']:
+                if not detail['success']:
+                    continue
+                item = self._item_for_note(items, detail['note_id'])
+                if item is None or item['title'] != detail['title']:
+                    unverified += 1
+                    continue
+                visibility = self._visibility_from_text(item['perm'])
+                if visibility == "unknown":
+                    unverified += 1
+                    continue
+                if visibility != expected:
+                    self._mark_unconfirmed(results, detail)
+                    mismatched += 1
+        
+        results['verified'] = True
+        if mismatched:
+            print(f"⚠ 核对发现 {mismatched} 条笔记实际未生效，已改记为失败")
+        else:
+            print("✓ 核对完成，所有成功的操作均已生效")
+        if unverified:
+            print(f"⚠ 有 {unverified} 条笔记无法从页面确认状态")
+    
+    @staticmethod
+    def _mark_unconfirmed(results: Dict, detail: Dict) -> None:
+        """把核对发现未生效的成功结果改记为失败"""
+        detail['success'] = False
+        detail['error'] = "核对发现操作未生效"
+        results['success'] -= 1
+        results['failed'] += 1
+    
+    @staticmethod
+    def _key_counts(items: List[Dict[str, str]]) -> Dict[Tuple[str, str], int]:
+        """统计页面快照中每个(标题, 日期)的笔记数量"""
+        counts = {}
+        for item in items:
+            key = (item['title'], item['date'])
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    def _count_note_keys(self) -> Optional[Dict[Tuple[str, str], int]]:
+        """
+        读取批量删除前页面上每个(标题, 日期)的笔记数量
+        
+        Returns:
+            计数字典，读取失败时为None
+        """
+        try:
+            return self._key_counts(self._snapshot_note_items())
+        except Exception as e:
+            print(f"⚠ 读取删除前的页面状态失败，同名同日期的笔记将无法核对: {e}")
+            return None
+    
+    def _snapshot_note_items(self) -> List[Dict[str, str]]:
+        """
+        一次脚本调用读取页面上所有笔记的标题、日期和权限文本
+        
+        Returns:
+            按页面顺序排列的笔记信息列表
+        """
+        items = self.driver.execute_script(
+            "var itemSelectors = arguments[0], titleSelectors = arguments[1],"
+            "    dateSelectors = arguments[2], permSelector = arguments[3];"
+            "function firstText(item, selectors) {"
+            "  for (var k = 0; k < selectors.length; k++) {"
+            "    var el = item.querySelector(selectors[k]);"
+            "    if (el && el.innerText.trim()) return el.innerText.trim();"
+            "  }"
+            "  return '';"
+            "}"
+            "for (var i = 0; i < itemSelectors.length; i++) {"
+            "  var items = document.querySelectorAll(itemSelectors[i]);"
+            "  if (!items.length) continue;"
+            "  return Array.prototype.map.call(items, function(item) {"
+            "    var perm = item.querySelector(permSelector);"
+            "    return {title: firstText(item, titleSelectors), text: item.innerText.trim(),"
+            "            date: firstText(item, dateSelectors), perm: perm ? perm.innerText.trim() : ''};"
+            "  });"
+            "}"
+            "return [];",
+            Locators.NOTE_ITEM_SELECTORS, Locators.NOTE_TITLE_SELECTORS,
+            Locators.NOTE_DATE_SELECTORS, ", ".join(Locators.PERMISSION_BUTTON_SELECTORS)
+        ) or []
+        
+        for item in items:
+            # 与提取时一致：没有标题元素时使用元素文本作为标题
+            if not item['title']:
+                text = item.pop('text', '')
+                item['title'] = (text[:50] + "..." if len(text) > 50 else text) or "无标题"
+            else:
+                item.pop('text', None)
+        return items
+    
+    def _item_for_note(self, items: List[Dict[str, str]], note_id: str) -> Optional[Dict[str, str]]:
+        """根据索引ID从页面快照中取出对应笔记"""
+        if not note_id.startswith("note_index_"):
+            return None
+        try:
+            index = int(note_id.split("_")[-1])
+        except ValueError:
+            return None
+        return items[index] if index < len(items) else None
+    
+    @staticmethod
+    def _visibility_from_text(text: str) -> str:
+        """
+        根据权限按钮文本判断可见性
+        
+        Args:
+            text: 权限按钮文本
+            
+        Returns:
+            可见性状态 ('private', 'public' 或 'unknown')
+        """
+        if "仅自己可见" in text or "私密" in text:
+            return "private"
+        elif "公开" in text or "所有人可见" in text:
+            return "public"
+        return "unknown"
+    
+    def _schedule_batch(self, notes: List[Dict], operation: str, preserve_order: bool) -> List[Dict]:
+        """
+        按页面位置重排批量操作顺序并输出预计节省的滚动距离
+        
+        Args:
+            notes: 笔记列表
+            operation: 操作类型
+            preserve_order: 是否保持传入顺序
+            
+        Returns:
+            排序后的笔记列表
+        """
+        offsets, viewport_height = self._measure_note_offsets(notes)
+        scheduler = BatchScheduler(viewport_height)
+        ordered, report = scheduler.plan(
+            notes, operation, offsets,
+            current_offset=viewport_height / 2,
+            preserve_order=preserve_order
+        )
+        
+        source = "实测" if offsets else "估算"
+        if preserve_order:
+            print(f"保持指定顺序执行，预计滚动距离 {report['original_distance']:.0f}px（{source}）")
+        else:
+            direction = "自下而上" if operation == 'delete' else "单向扫描"
+            print(f"已按页面位置重排执行顺序（{direction}），共 {report['viewport_groups']} 个视口分组")
+            print(f"预计滚动距离 {report['original_distance']:.0f}px -> {report['planned_distance']:.0f}px，"
+                  f"节省 {report['saved_distance']:.0f}px（{source}）")
+        return ordered
+    
+    def _measure_note_offsets(self, notes: List[Dict]) -> Tuple[Optional[Dict[str, float]], int]:
+        """
+        一次脚本调用测量所有笔记相对视口的纵向位置
+        
+        Args:
+            notes: 笔记列表
+            
+        Returns:
+            (笔记ID到位置的映射，有笔记无法测量时为None, 视口高度)
+        """
+        try:
+            measured = self.driver.execute_script(
+                "var selectors = arguments[0];"
+                "for (var i = 0; i < selectors.length; i++) {"
+                "  var items = document.querySelectorAll(selectors[i]);"
+                "  if (!items.length) continue;"
+                "  var offsets = [];"
+                "  for (var j = 0; j < items.length; j++) {"
+                "    var rect = items[j].getBoundingClientRect();"
+                "    offsets.push(rect.top + rect.height / 2);"
+                "  }"
+                "  return {offsets: offsets, viewport: window.innerHeight};"
+                "}"
+                "return null;",
+                Locators.NOTE_ITEM_SELECTORS
+            )
+        except Exception as e:
+            print(f"测量笔记位置失败，按索引估算: {e}")
+            measured = None
+        
+        if not measured:
+            return None, 1080
+        
+        page_offsets = measured.get('offsets') or []
+        viewport_height = int(measured.get('viewport') or 1080)
+        offsets = {}
+        for note in notes:
+            index = note.get('element_index')
+            if index is None or index >= len(page_offsets):
+                # 虚拟列表中未渲染的笔记无法测量，整体改用估算值以免单位混用
+                return None, viewport_height
+            offsets[note['note_id']] = page_offsets[index]
+        return offsets, viewport_height
+    
+    def _apply_operation(self, note_element, operation: str, scrolled: bool = False) -> bool:
+        """
+        对单个笔记执行指定操作
+        
+        Args:
+            note_element: 笔记元素
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            scrolled: 笔记是否已预先滚动到可见区域
+            
+        Returns:
+            是否操作成功
+        """
+        if operation == 'hide':
+            return self._set_note_visibility(note_element, "private", scrolled)
+        elif operation == 'show':
+            return self._set_note_visibility(note_element, "public", scrolled)
+        elif operation == 'delete':
+            return self._delete_note_operation(note_element, scrolled)
+        return False
+    
     def _check_driver_connection(self) -> bool:
         """
         检查WebDriver连接是否正常
@@ -219,12 +732,60 @@ class PermissionManager:
             print(f"刷新笔记元素时发生错误: {e}")
             return None
     
+    def _resolve_note_elements(self, note_ids: List[str]) -> Dict[str, webdriver.remote.webelement.WebElement]:
+        """
+        通过一次元素查询批量解析多个笔记元素
+        
+        Args:
+            note_ids: 笔记ID列表（仅支持note_index_格式）
+            
+        Returns:
+            笔记ID到元素的映射，未找到的笔记不包含在内
+        """
+        indices = {}
+        for note_id in note_ids:
+            if note_id.startswith("note_index_"):
+                try:
+                    indices[note_id] = int(note_id.split("_")[-1])
+                except ValueError:
+                    continue
+        
+        if not indices:
+            return {}
+        
+        # 与提取时一致，使用第一个能找到元素的选择器
+        for selector in Locators.NOTE_ITEM_SELECTORS:
+            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return {note_id: elements[index] for note_id, index in indices.items() if index < len(elements)}
+        
+        return {}
+    
+    def _wait_until(self, wait_type: str, condition, until_not: bool = False):
+        """
+        使用自适应超时等待条件成立，并记录实际耗时
+        
+        Args:
+            wait_type: 等待类型，用于分别统计耗时
+            condition: expected_conditions条件
+            until_not: 是否等待条件不成立
+            
+        Returns:
+            条件返回值
+            
+        Raises:
+            TimeoutException: 超过当前超时时间
+        """
+        return self.timeout_policy.wait_until(self.driver, wait_type, condition, until_not)
+    
     def _wait_for_operation_complete(self) -> None:
         """等待操作完成"""
         try:
             # 等待加载提示消失
-            self.wait.until_not(
-                EC.presence_of_element_located((By.CSS_SELECTOR, Locators.LOADING_SPINNER))
+            self._wait_until(
+                'loading_spinner',
+                EC.presence_of_element_located((By.CSS_SELECTOR, Locators.LOADING_SPINNER)),
+                until_not=True
             )
         except TimeoutException:
             pass
@@ -324,15 +885,10 @@ class PermissionManager:
         try:
             # 这里需要根据实际页面结构来判断笔记的可见性
             # 可能需要检查权限按钮的文本、图标或其他指示器
-            permission_btn = note_element.find_element(By.CSS_SELECTOR, Locators.PERMISSION_BUTTON)
+            permission_btn = note_element.find_element(By.CSS_SELECTOR, ", ".join(Locators.PERMISSION_BUTTON_SELECTORS))
             btn_text = permission_btn.text.strip()
             
-            if "仅自己可见" in btn_text or "私密" in btn_text:
-                return "private"
-            elif "公开" in btn_text or "所有人可见" in btn_text:
-                return "public"
-            else:
-                return "unknown"
+            return self._visibility_from_text(btn_text)
                 
         except Exception as e:
             print(f"检查笔记可见性时发生错误: {e}")
@@ -350,90 +906,34 @@ class PermissionManager:
         """
         return self._set_note_visibility(note_element, "public")
     
-    def show_notes_batch(self, notes: List[Dict], delay: float = 2.0) -> Dict[str, int]:
+    def show_notes_batch(self, notes: List[Dict], delay: float = 2.0, lookahead: int = 3,
+                         preserve_order: bool = False, verify: bool = False, adaptive: bool = True,
+                         control=None) -> Dict:
         """
         批量显示笔记
         
         Args:
             notes: 笔记列表
             delay: 操作间隔时间（秒）
+            lookahead: 在操作间隔内预取的后续笔记数量，0表示不预取
+            preserve_order: 是否严格按传入顺序执行，默认按页面位置重排
+            verify: 批量结束后是否一次性核对所有笔记的实际状态
+            adaptive: 是否根据平台提示和操作耗时自动调整操作间隔
+            control: 批量控制器，支持在两条笔记之间暂停、继续和取消
             
         Returns:
-            操作结果统计
+            操作结果统计，details中包含每条笔记的处理结果
         """
-        results = {
-            'success': 0,
-            'failed': 0,
-            'total': len(notes)
-        }
-        
-        print(f"开始批量显示 {len(notes)} 条笔记...")
+        return self._run_batch(notes, 'show', delay, lookahead, preserve_order, verify, adaptive, control)
         
-        # 首先检查WebDriver连接
-        if not self._check_driver_connection():
-            print("❌ WebDriver连接已断开，无法执行批量操作")
-            print("请重新启动程序并确保浏览器没有被关闭")
-            results['failed'] = len(notes)
-            return results
-        
-        for i, note in enumerate(notes, 1):
-            print(f"处理第 {i}/{len(notes)} 条笔记: {note['title'][:30]}...")
-            
-            try:
-                # 在每次操作前检查连接
-                if not self._check_driver_connection():
-                    print("❌ WebDriver连接断开，停止批量操作")
-                    print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
-                    break
-                
-                # 重新获取笔记元素（避免元素过期）
-                note_element = self._refresh_note_element(note['note_id'])
-                if not note_element:
-                    print(f"❌ 无法找到笔记元素: {note['note_id']}")
-                    results['failed'] += 1
-                    continue
-                
-                # 显示笔记
-                if self.show_note(note_element):
-                    results['success'] += 1
-                    print(f"✓ 成功显示")
-                else:
-                    results['failed'] += 1
-                    print(f"✗ 显示失败")
-                
-                # 操作间隔
-                if i < len(notes):
-                    time.sleep(delay)
-                    
-            except Exception as e:
-                print(f"❌ 处理笔记时发生错误: {e}")
-                results['failed'] += 1
-                
-                # 如果是连接错误，停止批量操作
-                if "Connection refused" in str(e) or "Max retries exceeded" in str(e):
-                    print("❌ 检测到连接问题，停止批量操作")
-                    print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
-                    break
-        
-        print(f"批量操作完成: 成功 {results['success']} 条，失败 {results['failed']} 条")
-        
-        # 如果有失败的操作，提供建议
-        if results['failed'] > 0:
-            print("\n⚠️ 部分操作失败，可能的原因：")
-            print("1. 浏览器连接断开 - 请重新启动程序")
-            print("2. 页面结构变化 - 请更新选择器")
-            print("3. 网络问题 - 请检查网络连接")
-            print("4. 权限问题 - 请确保有足够的权限")
-        
-        return results
-    
-    def _set_note_visibility(self, note_element, visibility: str) -> bool:
+    def _set_note_visibility(self, note_element, visibility: str, scrolled: bool = False) -> bool:
         """
         设置笔记可见性
         
         Args:
             note_element: 笔记元素
             visibility: 可见性类型 ("private" 或 "public")
+            scrolled: 笔记是否已预先滚动到可见区域
             
         Returns:
             是否成功设置
@@ -444,9 +944,10 @@ class PermissionManager:
                 print("WebDriver连接已断开")
                 return False
             
-            # 滚动到笔记位置
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", note_element)
-            time.sleep(1)
+            # 滚动到笔记位置（已在操作间隔内预滚动的笔记跳过）
+            if not scrolled:
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", note_element)
+                time.sleep(1)
             
             # 查找权限设置按钮 - 尝试多种选择器
             permission_btn = None
@@ -536,7 +1037,8 @@ class PermissionManager:
             
             # 点击确认按钮
             try:
-                confirm_btn = self.wait.until(
+                confirm_btn = self._wait_until(
+                    'permission_confirm',
                     EC.element_to_be_clickable((By.XPATH, Locators.PERMISSION_CONFIRM_BUTTON))
                 )
                 confirm_btn.click()
@@ -574,89 +1076,33 @@ class PermissionManager:
         """
         return self._delete_note_operation(note_element)
     
-    def delete_notes_batch(self, notes: List[Dict], delay: float = 2.0) -> Dict[str, int]:
+    def delete_notes_batch(self, notes: List[Dict], delay: float = 2.0, lookahead: int = 3,
+                           preserve_order: bool = False, verify: bool = False, adaptive: bool = True,
+                           control=None) -> Dict:
         """
         批量删除笔记
         
         Args:
             notes: 笔记列表
             delay: 操作间隔时间（秒）
+            lookahead: 在操作间隔内预取的后续笔记数量，0表示不预取
+            preserve_order: 是否严格按传入顺序执行，默认按页面位置重排
+            verify: 批量结束后是否一次性核对所有笔记的实际状态
+            adaptive: 是否根据平台提示和操作耗时自动调整操作间隔
+            control: 批量控制器，支持在两条笔记之间暂停、继续和取消
             
         Returns:
-            操作结果统计
+            操作结果统计，details中包含每条笔记的处理结果
         """
-        results = {
-            'success': 0,
-            'failed': 0,
-            'total': len(notes)
-        }
-        
-        print(f"开始批量删除 {len(notes)} 条笔记...")
-        
-        # 首先检查WebDriver连接
-        if not self._check_driver_connection():
-            print("❌ WebDriver连接已断开，无法执行批量操作")
-            print("请重新启动程序并确保浏览器没有被关闭")
-            results['failed'] = len(notes)
-            return results
+        return self._run_batch(notes, 'delete', delay, lookahead, preserve_order, verify, adaptive, control)
         
-        for i, note in enumerate(notes, 1):
-            print(f"处理第 {i}/{len(notes)} 条笔记: {note['title'][:30]}...")
-            
-            try:
-                # 在每次操作前检查连接
-                if not self._check_driver_connection():
-                    print("❌ WebDriver连接断开，停止批量操作")
-                    print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
-                    break
-                
-                # 重新获取笔记元素（避免元素过期）
-                note_element = self._refresh_note_element(note['note_id'])
-                if not note_element:
-                    print(f"❌ 无法找到笔记元素: {note['note_id']}")
-                    results['failed'] += 1
-                    continue
-                
-                # 删除笔记
-                if self.delete_note(note_element):
-                    results['success'] += 1
-                    print(f"✓ 成功删除")
-                else:
-                    results['failed'] += 1
-                    print(f"✗ 删除失败")
-                
-                # 操作间隔
-                if i < len(notes):
-                    time.sleep(delay)
-                    
-            except Exception as e:
-                print(f"❌ 处理笔记时发生错误: {e}")
-                results['failed'] += 1
-                
-                # 如果是连接错误，停止批量操作
-                if "Connection refused" in str(e) or "Max retries exceeded" in str(e):
-                    print("❌ 检测到连接问题，停止批量操作")
-                    print(f"已处理 {i-1} 条笔记，成功 {results['success']} 条，失败 {results['failed']} 条")
-                    break
-        
-        print(f"批量操作完成: 成功 {results['success']} 条，失败 {results['failed']} 条")
-        
-        # 如果有失败的操作，提供建议
-        if results['failed'] > 0:
-            print("\n⚠️ 部分操作失败，可能的原因：")
-            print("1. 浏览器连接断开 - 请重新启动程序")
-            print("2. 页面结构变化 - 请更新选择器")
-            print("3. 网络问题 - 请检查网络连接")
-            print("4. 权限问题 - 请确保有足够的权限")
-        
-        return results
-    
-    def _delete_note_operation(self, note_element) -> bool:
+    def _delete_note_operation(self, note_element, scrolled: bool = False) -> bool:
         """
         执行删除笔记操作
         
         Args:
             note_element: 笔记元素
+            scrolled: 笔记是否已预先滚动到可见区域
             
         Returns:
             是否成功删除
@@ -667,9 +1113,10 @@ class PermissionManager:
                 print("WebDriver连接已断开")
                 return False
             
-            # 滚动到笔记位置
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", note_element)
-            time.sleep(1)
+            # 滚动到笔记位置（已在操作间隔内预滚动的笔记跳过）
+            if not scrolled:
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", note_element)
+                time.sleep(1)
             
             # 查找删除按钮 - 尝试多种选择器
             delete_btn = None
@@ -696,7 +1143,8 @@ class PermissionManager:
             
             # 点击确认删除按钮
             try:
-                confirm_btn = self.wait.until(
+                confirm_btn = self._wait_until(
+                    'delete_confirm',
                     EC.element_to_be_clickable((By.XPATH, Locators.DELETE_CONFIRM_BUTTON))
                 )
                 confirm_btn.click()
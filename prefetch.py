@@ -0,0 +1,157 @@
+"""
+后台预取模块
+程序启动后在后台线程中启动浏览器、检查登录并提取笔记，用户选择菜单时直接使用或等待预取结果
+"""
+
+import io
+import sys
+import threading
+from typing import List, Optional
+from scraper import XiaohongshuScraper
+
+
+class ThreadOutputBuffer:
+    """替换sys.stdout，把指定线程的输出暂存起来，其他线程照常输出，避免打乱菜单"""
+    
+    def __init__(self, stream, thread: threading.Thread):
+        """
+        初始化输出缓冲
+        
+        Args:
+            stream: 原来的sys.stdout
+            thread: 需要暂存输出的线程
+        """
+        self.stream = stream
+        self.thread = thread
+        self.buffer = io.StringIO()
+        self._lock = threading.Lock()
+    
+    def write(self, text: str) -> int:
+        if threading.current_thread() is self.thread:
+            with self._lock:
+                return self.buffer.write(text)
+        return self.stream.write(text)
+    
+    def flush(self) -> None:
+        if threading.current_thread() is not self.thread:
+            self.stream.flush()
+    
+    def tail(self, lines: int = 5) -> List[str]:
+        """
+        查看最近暂存的几行输出（不取出）
+        
+        Args:
+            lines: 行数
+            
+        Returns:
+            最近的非空输出行
+        """
+        with self._lock:
+            text = self.buffer.getvalue()[-4096:]
+        return [line for line in text.replace('\r', '\n').split('\n') if line.strip()][-lines:]
+    
+    def drain(self) -> str:
+        """
+        取出已暂存的输出
+        
+        Returns:
+            暂存的文本
+        """
+        with self._lock:
+            text = self.buffer.getvalue()
+            self.buffer = io.StringIO()
+        return text
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class NotePrefetcher:
+    """在后台线程中预先启动浏览器并提取笔记"""
+    
+    def __init__(self, hider):
+        """
+        初始化预取器
+        
+        Args:
+            hider: 主程序实例，提取结果由主线程在使用时写入其缓存
+        """
+        self.hider = hider
+        self.scraper = None  # 预取线程创建的浏览器会话
+        self.notes = None  # 预取到的笔记，失败或取消时为None
+        self.diff = None  # 与上一次快照的差异，由主线程在使用结果时记录
+        self.error = None  # 预取线程中的异常
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._work, name="note-prefetch", daemon=True)
+        self._output = None
+    
+    def start(self) -> None:
+        """启动预取线程，线程的输出暂存到使用结果时再显示"""
+        self._output = ThreadOutputBuffer(sys.stdout, self._thread)
+        sys.stdout = self._output
+        self._thread.start()
+    
+    @property
+    def done(self) -> bool:
+        """预取是否已结束（完成、失败或取消）"""
+        return not self._thread.is_alive()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待预取结束
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            预取是否已结束
+        """
+        self._thread.join(timeout)
+        return self.done
+    
+    def cancel(self, timeout: float = 15.0) -> bool:
+        """
+        取消预取：滚动和提取在下一条笔记前停止，然后等待线程退出
+        
+        Args:
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            线程是否已退出
+        """
+        self._cancel.set()
+        finished = self.wait(timeout)
+        self.release_output()
+        return finished
+    
+    def release_output(self) -> str:
+        """
+        恢复sys.stdout并取出预取线程暂存的输出
+        
+        Returns:
+            暂存的输出文本
+        """
+        if self._output is None:
+            return ""
+        if sys.stdout is self._output:
+            sys.stdout = self._output.stream
+        text = self._output.drain()
+        self._output = None
+        return text
+    
+    def _work(self) -> None:
+        """预取线程：启动浏览器，不等待手动登录，提取并保存笔记快照"""
+        try:
+            scraper = XiaohongshuScraper(headless=self.hider.headless, interactive=False)
+            scraper.cancel_event = self._cancel
+            self.scraper = scraper
+            scraper.setup_driver()
+            if self._cancel.is_set():
+                return
+            self.hider.logger.log_extraction_start()
+            notes, diff = self.hider._harvest_notes(scraper)
+            if notes and not self._cancel.is_set():
+                self.diff = diff
+                self.notes = notes
+        except Exception as e:
+            self.error = e
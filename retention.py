@@ -0,0 +1,463 @@
+"""
+保留策略模块
+按发布时间持续应用保留规则（如超过18个月隐藏、超过4年删除），每轮同步后只处理新跨过阈值或发生变化的笔记，例如：
+    {"interval": "6h", "rules": [
+        {"older_than": "18mo", "op": "hide"},
+        {"older_than": "4y", "op": "delete"}]}
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from dateutil.relativedelta import relativedelta
+from note_store import NoteStore
+from snapshot import append_records, prune_snapshots, runtime_path, RESULT_FIELDS
+from cli import OPERATION_TEXTS, parse_rate
+from job_file import BATCH_ORDER, load_job
+
+
+AGE_PATTERN = re.compile(r'^\s*(\d+)\s*([a-z一-鿿]+)\s*$', re.IGNORECASE)
+
+AGE_UNITS = {
+    'd': 'days', 'day': 'days', 'days': 'days', '天': 'days',
+    'w': 'weeks', 'week': 'weeks', 'weeks': 'weeks', '周': 'weeks',
+    'mo': 'months', 'month': 'months', 'months': 'months', '月': 'months', '个月': 'months',
+    'y': 'years', 'year': 'years', 'years': 'years', '年': 'years'
+}
+
+INTERVAL_UNITS = {
+    's': 1, 'sec': 1, '秒': 1,
+    'm': 60, 'min': 60, '分钟': 60,
+    'h': 3600, 'hour': 3600, '小时': 3600,
+    'd': 86400, 'day': 86400, '天': 86400
+}
+
+# 规则生效后笔记应处于的可见性，已经是该状态的笔记不再处理
+TARGET_VISIBILITY = {'hide': 'private', 'show': 'public'}
+
+POLICY_KEYS = {'name', 'interval', 'rate', 'verify', 'keep_snapshots', 'rules'}
+
+RULE_KEYS = {'older_than', 'op'}
+
+JOURNAL_FIELDS = ('cycle', 'time', 'rule', 'operation') + RESULT_FIELDS
+
+DEFAULT_JOURNAL = runtime_path("retention_journal.jsonl")
+
+DEFAULT_METRICS = runtime_path("retention_metrics.json")
+
+# 每轮同步都会写入笔记和结果快照，常驻运行时每种只保留最近的这么多个
+DEFAULT_KEEP_SNAPSHOTS = 20
+
+
+def parse_age(text: str) -> relativedelta:
+    """
+    把“18mo”“4y”“30天”等时长转换为时间间隔（按日历月、年计算）
+    
+    Args:
+        text: 时长文本
+        
+    Returns:
+        时间间隔
+        
+    Raises:
+        ValueError: 格式无效
+    """
+    match = AGE_PATTERN.match(str(text))
+    if not match or match.group(2).lower() not in AGE_UNITS:
+        raise ValueError(f"无效的时长: {text}（示例: 30d、2w、18mo、4y）")
+    return relativedelta(**{AGE_UNITS[match.group(2).lower()]: int(match.group(1))})
+
+
+def parse_interval(text: str) -> float:
+    """
+    把“6h”“30min”等同步间隔转换为秒数
+    
+    Args:
+        text: 间隔文本
+        
+    Returns:
+        秒数
+        
+    Raises:
+        ValueError: 格式无效
+    """
+    match = AGE_PATTERN.match(str(text))
+    if not match or match.group(2).lower() not in INTERVAL_UNITS or int(match.group(1)) <= 0:
+        raise ValueError(f"无效的同步间隔: {text}（示例: 30min、6h、1d）")
+    return int(match.group(1)) * INTERVAL_UNITS[match.group(2).lower()]
+
+
+class RetentionRule:
+    """一条保留规则：发布时间早于 now - age 的笔记执行operation"""
+    
+    def __init__(self, age_text: str, operation: str):
+        """
+        初始化规则
+        
+        Args:
+            age_text: 时长文本，如“18mo”
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+        """
+        self.age_text = str(age_text)
+        self.age = parse_age(age_text)
+        self.operation = operation
+        self.name = f"超过{self.age_text}{OPERATION_TEXTS[operation]}"
+    
+    def threshold(self, now: datetime) -> datetime:
+        """
+        计算规则在指定时间的阈值
+        
+        Args:
+            now: 当前时间
+            
+        Returns:
+            发布时间不晚于该时间的笔记满足规则
+        """
+        return now - self.age
+    
+    def needs_action(self, note) -> bool:
+        """
+        笔记是否还需要执行本规则的操作（已是目标可见性的笔记跳过）
+        
+        Args:
+            note: 笔记
+            
+        Returns:
+            是否需要处理
+        """
+        target = TARGET_VISIBILITY.get(self.operation)
+        return target is None or note.get('visibility', 'unknown') != target
+
+
+class RetentionPolicy:
+    """保留策略：一组规则和同步、执行选项"""
+    
+    def __init__(self, rules: List[RetentionRule], interval: float = 21600, delay: Optional[float] = None,
+                 verify: bool = False, name: str = "", keep_snapshots: int = DEFAULT_KEEP_SNAPSHOTS):
+        """
+        初始化策略，规则按时长从长到短排列，笔记同时满足多条规则时执行时长最长的那条
+        
+        Args:
+            rules: 规则列表
+            interval: 同步间隔（秒）
+            delay: 固定操作间隔（秒），None表示自动调整节奏
+            verify: 每轮批量操作后是否核对实际状态
+            name: 策略名称
+            keep_snapshots: 每种快照（笔记、结果）保留的最近文件数
+        """
+        reference = datetime(2000, 1, 1)
+        self.rules = sorted(rules, key=lambda rule: rule.threshold(reference))
+        self.interval = interval
+        self.delay = delay
+        self.verify = verify
+        self.name = name
+        self.keep_snapshots = keep_snapshots
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RetentionPolicy':
+        """
+        从策略文件内容创建策略
+        
+        Args:
+            data: 策略内容
+            
+        Returns:
+            保留策略
+            
+        Raises:
+            ValueError: 策略内容无效
+        """
+        unknown = set(data) - POLICY_KEYS
+        if unknown:
+            raise ValueError(f"未知的策略字段: {', '.join(sorted(unknown))}")
+        raw_rules = data.get('rules')
+        if not isinstance(raw_rules, list) or not raw_rules:
+            raise ValueError("策略文件需要非空的rules列表")
+        
+        rules = []
+        for number, raw in enumerate(raw_rules, 1):
+            if not isinstance(raw, dict) or set(raw) - RULE_KEYS:
+                raise ValueError(f"第 {number} 条规则只能包含 older_than 和 op")
+            if raw.get('op') not in OPERATION_TEXTS:
+                raise ValueError(f"第 {number} 条规则的op必须是 {' / '.join(BATCH_ORDER)} 之一")
+            if raw.get('older_than') is None:
+                raise ValueError(f"第 {number} 条规则缺少older_than")
+            rules.append(RetentionRule(raw['older_than'], raw['op']))
+        
+        interval = parse_interval(data.get('interval', '6h'))
+        delay = None
+        if data.get('rate') is not None:
+            try:
+                delay = parse_rate(str(data['rate']))
+            except argparse.ArgumentTypeError as e:
+                raise ValueError(str(e))
+        keep_snapshots = data.get('keep_snapshots', DEFAULT_KEEP_SNAPSHOTS)
+        if not isinstance(keep_snapshots, int) or isinstance(keep_snapshots, bool) or keep_snapshots < 1:
+            raise ValueError("keep_snapshots必须是正整数")
+        return cls(rules, interval, delay, bool(data.get('verify', False)), str(data.get('name', '')), keep_snapshots)
+    
+    @classmethod
+    def load(cls, path: str) -> 'RetentionPolicy':
+        """
+        读取策略文件（JSON或YAML）
+        
+        Args:
+            path: 策略文件路径
+            
+        Returns:
+            保留策略
+            
+        Raises:
+            OSError: 无法读取文件
+            ValueError: 文件内容无效
+        """
+        return cls.from_dict(load_job(path))
+    
+    def rule_for(self, note, now: datetime) -> Optional[RetentionRule]:
+        """
+        找出笔记当前满足的规则
+        
+        Args:
+            note: 笔记
+            now: 当前时间
+            
+        Returns:
+            时长最长的满足规则，不满足任何规则或日期未知时返回None
+        """
+        timestamp = note.get('timestamp')
+        if timestamp is None:
+            return None
+        for rule in self.rules:
+            if timestamp <= rule.threshold(now).timestamp():
+                return rule
+        return None
+
+
+class RetentionDaemon:
+    """按间隔同步笔记并应用保留策略的常驻任务"""
+    
+    def __init__(self, hider, policy: RetentionPolicy, execute: bool = True,
+                 journal_path: str = DEFAULT_JOURNAL, metrics_path: str = DEFAULT_METRICS):
+        """
+        初始化常驻任务
+        
+        Args:
+            hider: 主程序实例，跨轮次复用浏览器会话和笔记缓存
+            policy: 保留策略
+            execute: 是否实际执行操作，False时每轮只预览
+            journal_path: 逐条结果日志，跨轮次追加
+            metrics_path: 运行统计文件，每轮结束后更新
+        """
+        self.hider = hider
+        self.policy = policy
+        self.execute = execute
+        self.journal_path = journal_path
+        self.metrics_path = metrics_path
+        self.cycle = 0
+        self.totals = {'cycles': 0, 'candidates': 0, 'success': 0, 'failed': 0, 'sync_failures': 0}
+        self.last_cycle = None
+        self._thresholds = None  # 上一轮各规则的阈值，None表示下一轮需要全量评估
+        self._stopped = False
+    
+    def plan(self, store: NoteStore, now: datetime,
+             changed_notes: Optional[List] = None) -> Tuple[List[Tuple[str, List]], Dict[str, RetentionRule]]:
+        """
+        生成本轮需要处理的笔记
+        
+        有上一轮阈值时，每条规则只在有序时间索引中查找 (上一轮阈值, 本轮阈值]
+        之间新跨过阈值的笔记，再加上本次同步发现的新增或变化的笔记；
+        否则全量评估。已经处于目标可见性的笔记跳过。
+        
+        Args:
+            store: 本轮同步得到的笔记存储
+            now: 本轮的参考时间
+            changed_notes: 与上一次快照相比变化的笔记，None表示全量评估
+            
+        Returns:
+            ([(操作类型, 笔记列表)，按执行顺序排列], note_id -> 规则)
+        """
+        incremental = self._thresholds is not None and changed_notes is not None
+        selected = {}
+        rule_of = {}
+        
+        def consider(note, rule):
+            if note['note_id'] not in rule_of and rule.needs_action(note):
+                rule_of[note['note_id']] = rule
+                selected.setdefault(rule.operation, []).append(note)
+        
+        for rule in self.policy.rules:
+            threshold = rule.threshold(now)
+            start = self._thresholds.get(rule.name) if incremental else None
+            start_timestamp = start.timestamp() if start else None
+            for row in store.rows_in_range(start, threshold, include_end=True):
+                # 恰好在上一轮阈值上的笔记已由上一轮处理（上一轮区间含结束端）
+                if start_timestamp is not None and store.timestamps[row] <= start_timestamp:
+                    continue
+                note = store.notes[row]
+                # 范围重叠处的笔记可能同时满足更长的规则，以实际满足的规则为准
+                if self.policy.rule_for(note, now) is rule:
+                    consider(note, rule)
+        if incremental:
+            for note in changed_notes:
+                rule = self.policy.rule_for(note, now)
+                if rule:
+                    consider(note, rule)
+        
+        batches = [
+            (operation, sorted(selected[operation], key=lambda note: note.get('element_index', 0)))
+            for operation in BATCH_ORDER if selected.get(operation)
+        ]
+        return batches, rule_of
+    
+    def run_cycle(self, now: Optional[datetime] = None) -> Dict:
+        """
+        执行一轮：同步笔记、评估规则、执行增量批次并记录结果
+        
+        Args:
+            now: 参考时间，默认为当前时间
+            
+        Returns:
+            本轮统计
+        """
+        hider = self.hider
+        self.cycle += 1
+        started = time.monotonic()
+        now = now or datetime.now()
+        metrics = {'cycle': self.cycle, 'time': now.strftime('%Y-%m-%d %H:%M:%S'), 'notes': 0,
+                   'incremental': False, 'candidates': 0, 'success': 0, 'failed': 0}
+        hider.ui.print_info(f"第 {self.cycle} 轮保留策略：同步笔记...")
+        
+        # 恢复次数限制针对单轮内的反复卡死，常驻运行时每轮重新计数
+        if hider.watchdog is not None:
+            hider.watchdog.recoveries = 0
+        
+        # 清除缓存后重新提取，复用已打开的浏览器会话
+        hider._cache_notes(None)
+        notes = hider._extract_notes()
+        if not notes:
+            metrics['error'] = "同步笔记失败"
+            self.totals['sync_failures'] += 1
+            return self._finish_cycle(metrics, started)
+        metrics['notes'] = len(notes)
+        
+        changed_notes = hider.last_diff.changed_notes() if hider.last_diff is not None else None
+        metrics['incremental'] = self._thresholds is not None and changed_notes is not None
+        batches, rule_of = self.plan(hider.note_store, now, changed_notes)
+        metrics['candidates'] = sum(len(batch) for _, batch in batches)
+        for operation, batch in batches:
+            hider.ui.print_info(f"{OPERATION_TEXTS[operation]}: {len(batch)} 条笔记")
+        
+        if not self.execute:
+            if batches:
+                hider.ui.print_info("预览模式，不执行操作")
+            return self._finish_cycle(metrics, started)
+        
+        complete = True
+        for operation, batch in batches:
+            results = hider._execute_operation(batch, operation, self.policy.verify,
+                                               delay=self.policy.delay or 2.0, adaptive=self.policy.delay is None)
+            if results is None:
+                complete = False
+                break
+            metrics['success'] += results['success']
+            metrics['failed'] += results['failed']
+            self._write_journal(results, operation, rule_of, metrics['time'])
+        
+        # 全部成功时记住本轮阈值，下一轮只处理新跨过阈值的笔记；否则下一轮全量评估以便重试
+        if complete and metrics['failed'] == 0:
+            self._thresholds = {rule.name: rule.threshold(now) for rule in self.policy.rules}
+        else:
+            self._thresholds = None
+        return self._finish_cycle(metrics, started)
+    
+    def run(self, once: bool = False) -> None:
+        """
+        按间隔循环执行，直到被中断或调用stop()
+        
+        Args:
+            once: 是否只执行一轮
+        """
+        interval_text = f"{self.policy.interval / 3600:g} 小时" if self.policy.interval >= 3600 else f"{self.policy.interval / 60:g} 分钟"
+        if not once:
+            self.hider.ui.print_info(f"保留策略已启动，每 {interval_text} 同步一次，按Ctrl+C停止")
+        while not self._stopped:
+            self.run_cycle()
+            if once:
+                break
+            deadline = time.monotonic() + self.policy.interval
+            while not self._stopped and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+    
+    def stop(self) -> None:
+        """在当前轮结束后停止"""
+        self._stopped = True
+    
+    def _write_journal(self, results: Dict, operation: str, rule_of: Dict[str, RetentionRule], cycle_time: str) -> None:
+        """
+        把本批结果追加到结果日志
+        
+        Args:
+            results: 批量操作结果
+            operation: 操作类型
+            rule_of: note_id -> 规则
+            cycle_time: 本轮参考时间
+        """
+        records = (
+            dict(detail, cycle=self.cycle, time=cycle_time, operation=operation,
+                 rule=rule_of[detail['note_id']].name if detail['note_id'] in rule_of else None)
+            for detail in results.get('details', [])
+        )
+        try:
+            append_records(records, self.journal_path, JOURNAL_FIELDS)
+        except OSError as e:
+            self.hider.ui.print_warning(f"写入结果日志失败: {e}")
+    
+    def _prune_snapshots(self) -> int:
+        """
+        删除较旧的笔记和结果快照，最新的笔记快照仍作为下一轮对比的基准
+        
+        Returns:
+            删除的文件数
+        """
+        return sum(prune_snapshots(kind, self.policy.keep_snapshots) for kind in ("notes", "results"))
+    
+    def _finish_cycle(self, metrics: Dict, started: float) -> Dict:
+        """
+        汇总本轮统计并写入统计文件
+        
+        Args:
+            metrics: 本轮统计
+            started: 本轮开始的monotonic时间
+            
+        Returns:
+            本轮统计
+        """
+        metrics['duration'] = round(time.monotonic() - started, 2)
+        metrics['pruned'] = self._prune_snapshots()
+        self.last_cycle = metrics
+        self.totals['cycles'] += 1
+        for key in ('candidates', 'success', 'failed'):
+            self.totals[key] += metrics[key]
+        
+        mode = "增量" if metrics['incremental'] else "全量"
+        message = (f"第 {metrics['cycle']} 轮完成（{mode}评估）：{metrics['notes']} 条笔记，待处理 {metrics['candidates']} 条，"
+                   f"成功 {metrics['success']} 条，失败 {metrics['failed']} 条，用时 {metrics['duration']} 秒")
+        self.hider.ui.print_info(message)
+        self.hider.logger.info(message)
+        
+        try:
+            directory = os.path.dirname(self.metrics_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.metrics_path + ".part"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'policy': self.policy.name, 'totals': self.totals, 'last_cycle': metrics},
+                          f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.metrics_path)
+        except OSError as e:
+            self.hider.ui.print_warning(f"写入运行统计失败: {e}")
+        return metrics
@@ -0,0 +1,98 @@
+"""
+批量操作调度模块
+按页面位置重排批量操作的笔记顺序，减少滚动距离和列表重排
+"""
+
+from typing import List, Dict, Optional, Tuple
+
+
+class BatchScheduler:
+    """批量操作调度器"""
+    
+    # 无法测量页面位置时使用的估计行高（像素）
+    DEFAULT_ROW_HEIGHT = 120
+    
+    def __init__(self, viewport_height: int = 1080):
+        """
+        初始化调度器
+        
+        Args:
+            viewport_height: 视口高度（像素），用于把笔记按可见区域分组
+        """
+        self.viewport_height = max(1, viewport_height)
+    
+    def plan(self, notes: List[Dict], operation: str, offsets: Optional[Dict[str, float]] = None,
+             current_offset: float = 0, preserve_order: bool = False) -> Tuple[List[Dict], Dict[str, float]]:
+        """
+        生成批量操作的执行顺序
+        
+        删除操作始终自下而上执行，删除的笔记不会让尚未处理的笔记发生位移，
+        基于索引的笔记ID在整个批量过程中保持有效。隐藏和显示操作从离当前
+        滚动位置较近的一端开始单向扫过列表，同一视口内的笔记连续处理。
+        
+        Args:
+            notes: 笔记列表
+            operation: 操作类型 ('hide', 'show', 或 'delete')
+            offsets: 笔记ID到页面纵向位置（像素）的映射，缺失时按索引估算
+            current_offset: 当前滚动位置（像素）
+            preserve_order: 是否保持用户指定的顺序
+            
+        Returns:
+            (排序后的笔记列表, 调度报告)
+        """
+        positions = [self._position_of(note, offsets) for note in notes]
+        original_distance = self._scroll_distance(positions, current_offset)
+        
+        if preserve_order or len(notes) < 2:
+            report = {
+                'original_distance': original_distance,
+                'planned_distance': original_distance,
+                'saved_distance': 0,
+                'viewport_groups': self._count_viewport_groups(positions)
+            }
+            return list(notes), report
+        
+        ranked = sorted(range(len(notes)), key=lambda k: positions[k])
+        if operation == 'delete':
+            ranked.reverse()
+        elif abs(current_offset - positions[ranked[-1]]) < abs(current_offset - positions[ranked[0]]):
+            # 当前位置更靠近列表底部时自下而上扫描
+            ranked.reverse()
+        
+        ordered = [notes[k] for k in ranked]
+        planned_positions = [positions[k] for k in ranked]
+        planned_distance = self._scroll_distance(planned_positions, current_offset)
+        
+        report = {
+            'original_distance': original_distance,
+            'planned_distance': planned_distance,
+            'saved_distance': max(0, original_distance - planned_distance),
+            'viewport_groups': self._count_viewport_groups(planned_positions)
+        }
+        return ordered, report
+    
+    def _position_of(self, note: Dict, offsets: Optional[Dict[str, float]]) -> float:
+        """获取笔记的页面纵向位置，未测量时按元素索引估算"""
+        if offsets and note['note_id'] in offsets:
+            return offsets[note['note_id']]
+        return note.get('element_index', 0) * self.DEFAULT_ROW_HEIGHT
+    
+    def _scroll_distance(self, positions: List[float], start: float) -> float:
+        """计算按给定顺序依次滚动到每个位置的总距离"""
+        distance = 0
+        current = start
+        for position in positions:
+            distance += abs(position - current)
+            current = position
+        return distance
+    
+    def _count_viewport_groups(self, positions: List[float]) -> int:
+        """统计按执行顺序需要切换视口的次数（连续落在同一视口内的笔记算一组）"""
+        groups = 0
+        last_group = None
+        for position in positions:
+            group = int(position // self.viewport_height)
+            if group != last_group:
+                groups += 1
+                last_group = group
+        return groups
@@ -5,43 +5,72 @@
 
 import time
 import platform
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Optional, Callable
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.remote_connection import RemoteConnection
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from locators import Locators
+from timeouts import TimeoutPolicy, STATS_FILENAME
+from date_parser import DateParser
+from permission import PermissionManager
+from note_record import NoteRecord
+from snapshot import runtime_path
 
 
 class XiaohongshuScraper:
     """小红书数据提取器"""
     
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, command_timeout: float = 30.0, interactive: bool = True):
         """
         初始化爬虫
         
         Args:
             headless: 是否使用无头模式
+            command_timeout: 单个WebDriver命令的最长等待时间（秒），避免页面卡死时无限等待
+            interactive: 是否允许等待用户输入（如手动登录），无人值守运行时为False
         """
         self.driver = None
         self.wait = None
+        self.timeout_policy = TimeoutPolicy(runtime_path(STATS_FILENAME))  # 与PermissionManager共享的自适应超时策略
+        self.date_parser = DateParser()  # 提取时解析一次日期，后续筛选直接使用时间戳
+        self.extraction_time = None  # 本次提取的参考时间，用于解析“3小时前”等相对日期
         self.headless = headless
+        self.command_timeout = command_timeout
+        self.interactive = interactive
+        self.cancel_event = None  # 设置后（threading.Event）可从其他线程取消滚动和提取
         self.base_url = "https://creator.xiaohongshu.com/new/note-manager"
     
     def setup_driver(self) -> None:
         """设置WebDriver，支持复用现有Chrome会话"""
+        # 限制与ChromeDriver之间每个HTTP请求的等待时间，需在创建WebDriver前设置
+        RemoteConnection.set_timeout(self.command_timeout)
+        
         # 首先尝试连接到现有的Chrome会话
         if self._try_connect_existing_chrome():
+            self._apply_command_timeouts()
             return
         
         # 如果没有找到现有会话，启动新的Chrome
         print("未找到现有Chrome会话，启动新的Chrome浏览器...")
         self._launch_new_chrome()
+        self._apply_command_timeouts()
+    
+    def _apply_command_timeouts(self) -> None:
+        """设置脚本执行和页面加载超时，均略小于HTTP命令超时，让浏览器端先报告超时"""
+        try:
+            browser_timeout = max(1, self.command_timeout - 5)
+            self.driver.set_script_timeout(browser_timeout)
+            self.driver.set_page_load_timeout(browser_timeout)
+        except Exception as e:
+            print(f"设置命令超时失败: {e}")
     
     def _try_connect_existing_chrome(self) -> bool:
         """
@@ -75,7 +104,7 @@ class XiaohongshuScraper:
             
             try:
                 self.driver = webdriver.Chrome(options=chrome_options)
-                self.wait = WebDriverWait(self.driver, 10)
+                self.wait = WebDriverWait(self.driver, self.timeout_policy.ceiling)
                 print("✓ 成功连接到现有Chrome会话")
                 
                 # 测试连接是否有效
@@ -133,7 +162,7 @@ class XiaohongshuScraper:
             print("下载地址: https://chromedriver.chromium.org/")
             raise e
         
-        self.wait = WebDriverWait(self.driver, 10)
+        self.wait = WebDriverWait(self.driver, self.timeout_policy.ceiling)
     
     def login_if_needed(self) -> bool:
         """
@@ -150,6 +179,9 @@ class XiaohongshuScraper:
             # 检查是否跳转到登录页面
             current_url = self.driver.current_url
             if "login" in current_url.lower() or "auth" in current_url.lower():
+                if not self.interactive:
+                    print("检测到需要登录，无人值守运行时无法等待手动登录，请先在浏览器中登录")
+                    return False
                 print("检测到需要登录，请在浏览器中手动完成登录...")
                 print("登录完成后，按回车键继续...")
                 input("按回车键继续...")
@@ -175,10 +207,13 @@ class XiaohongshuScraper:
             print(f"登录检查失败: {e}")
             return False
     
-    def extract_notes(self) -> List[Dict]:
+    def extract_notes(self, on_note: Optional[Callable[[NoteRecord], None]] = None) -> List[NoteRecord]:
         """
         提取所有笔记数据
         
+        Args:
+            on_note: 每提取一条笔记就调用一次，用于边提取边写入快照
+        
         Returns:
             笔记列表
         """
@@ -190,6 +225,7 @@ class XiaohongshuScraper:
         
         try:
             print("开始提取笔记数据...")
+            self.extraction_time = datetime.now()
             
             # 尝试找到笔记元素
             note_elements = self._find_note_elements()
@@ -201,10 +237,15 @@ class XiaohongshuScraper:
             print(f"找到 {len(note_elements)} 个笔记元素")
             
             for i, element in enumerate(note_elements):
+                if self.cancelled():
+                    print("提取已取消")
+                    return []
                 try:
                     note_data = self._extract_note_data(element, i)
                     if note_data:
                         notes.append(note_data)
+                        if on_note:
+                            on_note(note_data)
                         print(f"成功提取笔记 {i+1}: {note_data['title'][:30]}...")
                 except Exception as e:
                     print(f"提取笔记数据失败: {e}")
@@ -248,16 +289,19 @@ class XiaohongshuScraper:
         
         return []
     
-    def _extract_note_data(self, element, index: int) -> Optional[Dict]:
+    def _extract_note_data(self, element, index: int) -> Optional[NoteRecord]:
         """
         提取单个笔记的数据
         
+        记录中不保存页面元素（元素很快会失效，且会一直占用驱动端的引用），
+        后续操作时按element_index重新定位。
+        
         Args:
             element: 笔记元素
             index: 元素索引
             
         Returns:
-            笔记数据字典
+            笔记记录
         """
         try:
             # 使用索引作为ID，这样可以在后续操作中通过索引找到元素
@@ -291,25 +335,28 @@ class XiaohongshuScraper:
                 except NoSuchElementException:
                     continue
             
-            # 检查权限设置按钮是否存在
+            # 检查权限设置按钮是否存在，并根据按钮文本记录当前可见性
             has_permission_button = False
+            visibility = "unknown"
             for selector in Locators.PERMISSION_BUTTON_SELECTORS:
                 try:
                     permission_btn = element.find_element(By.CSS_SELECTOR, selector)
                     if permission_btn.is_displayed() and permission_btn.is_enabled():
                         has_permission_button = True
+                        visibility = PermissionManager._visibility_from_text(permission_btn.text)
                         break
                 except NoSuchElementException:
                     continue
             
-            return {
-                'note_id': note_id,
-                'title': title,
-                'date': date,
-                'has_permission_button': has_permission_button,
-                'element_index': index,  # 保存元素索引
-                'element': element  # 保存元素引用，后续操作时使用
-            }
+            return NoteRecord(
+                note_id=note_id,
+                title=title,
+                date=date,
+                timestamp=self.date_parser.parse_timestamp(date, self.extraction_time),  # 发布时间的epoch秒
+                visibility=visibility,
+                has_permission_button=has_permission_button,
+                element_index=index  # 保存元素索引，操作时据此重新定位元素
+            )
             
         except Exception as e:
             print(f"提取笔记数据时发生错误: {e}")
@@ -354,6 +401,7 @@ class XiaohongshuScraper:
     
     def close(self) -> None:
         """关闭浏览器"""
+        self.timeout_policy.save()
         if self.driver:
             self.driver.quit()
     
@@ -366,6 +414,15 @@ class XiaohongshuScraper:
         """上下文管理器出口"""
         self.close()
     
+    def cancelled(self) -> bool:
+        """
+        是否已被其他线程取消
+        
+        Returns:
+            是否已取消
+        """
+        return self.cancel_event is not None and self.cancel_event.is_set()
+    
     def _find_scroll_container(self) -> Optional:
         """
         查找可滚动的容器元素
@@ -513,6 +570,10 @@ class XiaohongshuScraper:
                     break
             
             while True:  # 无限制滚动，直到真正没有新内容
+                if self.cancelled():
+                    print("滚动已取消")
+                    return
+                
                 # 记录滚动前的笔记数量
                 current_notes = self._find_note_elements()
                 current_note_count = len(current_notes)
@@ -524,6 +585,10 @@ class XiaohongshuScraper:
                 
                 scroll_count += 1
                 
+                # 定期输出浏览器内存和DOM规模，便于排查长时间滚动后变慢的问题
+                if scroll_count % 20 == 0:
+                    self._log_page_metrics(current_note_count)
+                
                 # 检查是否有新内容加载
                 if current_note_count == last_note_count:
                     no_new_content_count += 1
@@ -596,6 +661,24 @@ class XiaohongshuScraper:
         except Exception as e:
             print(f"自动滚动时发生错误: {e}")
     
+    def _log_page_metrics(self, note_count: int) -> None:
+        """
+        采样并输出页面的JS堆大小和DOM节点数
+        
+        Args:
+            note_count: 当前已加载的笔记数量
+        """
+        try:
+            metrics = self.driver.execute_script(
+                "return {heap: (performance.memory ? performance.memory.usedJSHeapSize : 0),"
+                " nodes: document.getElementsByTagName('*').length};"
+            )
+            heap_mb = metrics['heap'] / 1024 / 1024
+            per_note = metrics['nodes'] / note_count if note_count else 0
+            print(f"页面状态: JS堆 {heap_mb:.0f}MB，DOM节点 {metrics['nodes']}（每条笔记约 {per_note:.0f} 个）")
+        except Exception as e:
+            print(f"采样页面状态失败: {e}")
+    
     def _find_load_more_button(self) -> Optional:
         """查找加载更多按钮"""
         try:
@@ -624,10 +707,47 @@ class XiaohongshuScraper:
         except Exception:
             return False
     
-    def extract_notes_with_auto_scroll(self) -> List[Dict]:
+    def reload_note_list(self, min_count: int = 0, navigate: bool = True) -> bool:
+        """
+        重新打开笔记管理页，并滚动到至少加载指定数量的笔记
+        
+        Args:
+            min_count: 至少需要加载的笔记数量
+            navigate: 是否重新打开页面（刚登录检查过时可跳过）
+            
+        Returns:
+            是否加载到了足够的笔记
+        """
+        try:
+            if navigate:
+                self.driver.get(self.base_url)
+                time.sleep(3)
+            
+            container = self._find_scroll_container()
+            last_count = -1
+            stable_count = 0
+            while True:
+                count = len(self._find_note_elements())
+                if count >= min_count:
+                    print(f"✓ 已重新加载 {count} 条笔记")
+                    return True
+                
+                stable_count = stable_count + 1 if count == last_count else 0
+                if not container or stable_count >= 3 or not self._scroll_container(container):
+                    print(f"❌ 只加载到 {count} 条笔记，需要 {min_count} 条")
+                    return False
+                last_count = count
+        except Exception as e:
+            print(f"重新加载笔记列表失败: {e}")
+            return False
+    
+    def extract_notes_with_auto_scroll(self, on_note: Optional[Callable[[NoteRecord], None]] = None) -> List[NoteRecord]:
         """
         提取笔记数据，包含自动滚动功能
         
+        Args:
+            on_note: 每提取一条笔记就调用一次，用于边提取边写入快照
+        
         Returns:
             笔记列表
         """
@@ -640,8 +760,11 @@ class XiaohongshuScraper:
         try:
             print("开始自动滚动加载笔记...")
             self._auto_scroll_content_area()
+            if self.cancelled():
+                return notes
             
             print("开始提取笔记数据...")
+            self.extraction_time = datetime.now()
             
             # 提取笔记
             note_elements = self._find_note_elements()
@@ -652,10 +775,15 @@ class XiaohongshuScraper:
             print(f"找到 {len(note_elements)} 个笔记元素")
             
             for i, element in enumerate(note_elements):
+                if self.cancelled():
+                    print("提取已取消")
+                    return []
                 try:
                     note_data = self._extract_note_data(element, i)
                     if note_data:
                         notes.append(note_data)
+                        if on_note:
+                            on_note(note_data)
                         print(f"成功提取笔记 {i+1}: {note_data['title'][:30]}...")
                 except Exception as e:
                     print(f"提取笔记数据失败: {e}")
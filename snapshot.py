@@ -0,0 +1,309 @@
+"""
+快照模块
+以JSONL或CSV（可选gzip压缩）流式导出、导入笔记快照和批量操作结果
+"""
+
+import os
+import csv
+import gzip
+import json
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Iterator, Sequence
+from note_record import NoteRecord
+
+
+# 默认快照目录
+SNAPSHOT_DIR = "snapshots"
+
+# 批量操作结果中每条笔记的字段（与PermissionManager记录的details一致）
+RESULT_FIELDS = ('note_id', 'title', 'date', 'success', 'error')
+
+# CSV中需要转换类型的字段，未列出的字段保持字符串
+FIELD_TYPES = {
+    'timestamp': float,
+    'element_index': int,
+    'has_permission_button': lambda value: value == 'True',
+    'success': lambda value: value == 'True',
+}
+
+
+def _is_csv(path: str) -> bool:
+    """根据扩展名判断是否为CSV格式（忽略.gz后缀）"""
+    base = path[:-3] if path.endswith('.gz') else path
+    return base.endswith('.csv')
+
+
+def _open_text(path: str, mode: str, compressed: Optional[bool] = None):
+    """打开文本文件，.gz结尾（或compressed为True）时透明地进行gzip压缩或解压"""
+    if compressed is None:
+        compressed = path.endswith('.gz')
+    if compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+class SnapshotWriter:
+    """逐条写入快照的写入器，内存占用与记录数无关"""
+    
+    def __init__(self, path: str, fields: Sequence[str] = NoteRecord.FIELDS):
+        """
+        初始化写入器，先写入临时文件，close()时再替换为目标文件
+        
+        Args:
+            path: 快照文件路径，.jsonl或.csv，可加.gz后缀
+            fields: 要写入的字段
+        """
+        self.path = path
+        self.fields = tuple(fields)
+        self.count = 0
+        self._temp_path = path + ".part"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = _open_text(self._temp_path, 'w', path.endswith('.gz'))
+        self._csv = None
+        if _is_csv(path):
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.fields)
+    
+    def write(self, item) -> None:
+        """
+        写入一条记录
+        
+        Args:
+            item: NoteRecord或包含所需字段的字典
+        """
+        values = [item.get(field) for field in self.fields]
+        if self._csv:
+            self._csv.writerow(['' if value is None else value for value in values])
+        else:
+            self._file.write(json.dumps(dict(zip(self.fields, values)), ensure_ascii=False))
+            self._file.write('\n')
+        self.count += 1
+    
+    def write_all(self, items: Iterable) -> int:
+        """
+        写入多条记录
+        
+        Args:
+            items: 记录序列
+            
+        Returns:
+            本次写入的记录数
+        """
+        before = self.count
+        for item in items:
+            self.write(item)
+        return self.count - before
+    
+    def close(self) -> None:
+        """完成写入并把临时文件替换为目标文件"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.replace(self._temp_path, self.path)
+    
+    def abort(self) -> None:
+        """放弃写入并删除临时文件，已有的同名快照保持不变"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _convert_csv_value(key: str, value: str):
+    """把CSV中的字符串还原为原始类型，空的数值和错误信息还原为None"""
+    if key in FIELD_TYPES:
+        return FIELD_TYPES[key](value) if value != '' else None
+    if key == 'error' and value == '':
+        return None
+    return value
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """
+    逐条读取快照中的记录
+    
+    Args:
+        path: 快照文件路径
+        
+    Returns:
+        记录字典的迭代器
+    """
+    with _open_text(path, 'r') as f:
+        if _is_csv(path):
+            for row in csv.DictReader(f):
+                yield {key: _convert_csv_value(key, value) for key, value in row.items()}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def load_notes(path: str) -> List[NoteRecord]:
+    """
+    从快照加载笔记，无需启动浏览器
+    
+    Args:
+        path: 快照文件路径
+        
+    Returns:
+        笔记记录列表
+    """
+    return [NoteRecord.from_dict(record) for record in read_records(path)]
+
+
+def export_notes(notes: Iterable, path: str) -> int:
+    """
+    导出笔记快照
+    
+    Args:
+        notes: 笔记记录（或字典）序列
+        path: 快照文件路径
+        
+    Returns:
+        写入的笔记数
+    """
+    with SnapshotWriter(path) as writer:
+        return writer.write_all(notes)
+
+
+def export_results(results: Dict, path: str) -> int:
+    """
+    导出批量操作中每条笔记的处理结果
+    
+    Args:
+        results: 批量操作返回的结果（包含details）
+        path: 文件路径
+        
+    Returns:
+        写入的记录数
+    """
+    with SnapshotWriter(path, RESULT_FIELDS) as writer:
+        return writer.write_all(results.get('details', []))
+
+
+def append_records(items: Iterable, path: str, fields: Sequence[str]) -> int:
+    """
+    把记录追加到已有文件末尾（如跨多轮运行的结果日志），文件不存在时新建
+    
+    Args:
+        items: 记录序列
+        path: 文件路径，.jsonl或.csv，可加.gz后缀
+        fields: 要写入的字段
+        
+    Returns:
+        写入的记录数
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+    count = 0
+    with _open_text(path, 'a') as f:
+        writer = csv.writer(f) if _is_csv(path) else None
+        if writer and is_new:
+            writer.writerow(fields)
+        for item in items:
+            values = [item.get(field) for field in fields]
+            if writer:
+                writer.writerow(['' if value is None else value for value in values])
+            else:
+                f.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False))
+                f.write('\n')
+            count += 1
+    return count
+
+
+def runtime_path(name: str, directory: str = SNAPSHOT_DIR) -> str:
+    """
+    运行数据文件的路径，快照、结果日志、运行统计和超时统计都放在同一目录
+    
+    Args:
+        name: 文件名
+        directory: 运行数据目录，相对于启动程序时的当前目录
+        
+    Returns:
+        文件路径
+    """
+    return os.path.join(directory, name)
+
+
+def snapshot_path(kind: str = "notes", directory: str = SNAPSHOT_DIR, extension: str = ".jsonl.gz") -> str:
+    """
+    生成带时间戳的快照文件路径
+    
+    Args:
+        kind: 快照类型，作为文件名前缀（如notes、results）
+        directory: 快照目录
+        extension: 扩展名，决定文件格式
+        
+    Returns:
+        快照文件路径
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return runtime_path(f"{kind}_{timestamp}{extension}", directory)
+
+
+def latest_snapshot(kind: str = "notes", directory: str = SNAPSHOT_DIR) -> Optional[str]:
+    """
+    查找最近的快照文件
+    
+    Args:
+        kind: 快照类型
+        directory: 快照目录
+        
+    Returns:
+        最近修改的快照路径，没有时返回None
+    """
+    if not os.path.isdir(directory):
+        return None
+    candidates = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith(kind + "_") and not name.endswith(".part")
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def prune_snapshots(kind: str = "notes", keep: int = 10, directory: str = SNAPSHOT_DIR) -> int:
+    """
+    删除较旧的快照文件，只保留最近的几个
+    
+    Args:
+        kind: 快照类型
+        keep: 保留的快照数量
+        directory: 快照目录
+        
+    Returns:
+        删除的文件数
+    """
+    if not os.path.isdir(directory):
+        return 0
+    candidates = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory)
+         if name.startswith(kind + "_") and not name.endswith(".part")),
+        key=os.path.getmtime, reverse=True
+    )
+    removed = 0
+    for path in candidates[max(keep, 1):]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
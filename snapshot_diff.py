@@ -0,0 +1,147 @@
+"""
+快照对比模块
+按稳定键对比两次提取的笔记，找出新增、消失、改标题和可见性变化的笔记
+"""
+
+import hashlib
+from typing import List, Dict, Tuple, Iterable, Optional
+from note_record import NoteRecord
+from snapshot import read_records
+from date_parser import DateParser
+
+
+def stable_keys(notes: Iterable) -> Iterable[Tuple[tuple, object]]:
+    """
+    为笔记生成跨提取稳定的键
+    
+    页面上的note_id按列表位置编号，新发布或删除一条笔记就会整体错位，
+    不能用来对比。发布时间不会因改标题或改可见性而变化，因此以发布时间
+    （精确到分钟）加同一分钟内的出现序号作为键。“3天前”“昨天”等相对日期
+    按提取时间解析，每次同步结果都不同，这类笔记和没有发布时间的笔记
+    一样使用标题加出现序号；这类笔记改标题，或相对日期变为完整日期时，
+    会被报告为一次消失加新增。
+    
+    Args:
+        notes: 笔记记录或字典序列
+        
+    Yields:
+        (稳定键, 笔记)
+    """
+    occurrences = {}
+    for note in notes:
+        timestamp = note.get('timestamp')
+        if timestamp is not None and not DateParser.is_relative(note.get('date', '')):
+            base = ('time', int(timestamp // 60))
+        else:
+            base = ('title', note.get('title', ''))
+        occurrence = occurrences.get(base, 0)
+        occurrences[base] = occurrence + 1
+        yield base + (occurrence,), note
+
+
+def content_hash(note) -> str:
+    """
+    计算笔记中可能被修改的内容的哈希
+    
+    Args:
+        note: 笔记记录或字典
+        
+    Returns:
+        标题和可见性的摘要
+    """
+    text = f"{note.get('title', '')}\x00{note.get('visibility', 'unknown')}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class SnapshotDiff:
+    """两次快照之间的差异"""
+    
+    def __init__(self):
+        """初始化空差异"""
+        self.added = []  # 新快照中新出现的笔记
+        self.removed = []  # 旧快照中有、新快照中消失的笔记
+        self.retitled = []  # (旧笔记, 新笔记)，标题发生变化
+        self.visibility_changed = []  # (旧笔记, 新笔记)，可见性发生变化
+        self.unchanged = 0
+    
+    @property
+    def has_changes(self) -> bool:
+        """是否存在任何变化"""
+        return bool(self.added or self.removed or self.retitled or self.visibility_changed)
+    
+    def changed_notes(self) -> List:
+        """
+        新快照中需要重新应用策略的笔记（新增、改标题或可见性变化），按页面顺序排列
+        
+        Returns:
+            笔记列表
+        """
+        notes = {id(note): note for note in self.added}
+        notes.update((id(new), new) for _, new in self.retitled)
+        notes.update((id(new), new) for _, new in self.visibility_changed)
+        return sorted(notes.values(), key=lambda note: note.get('element_index', 0))
+    
+    def summary(self) -> Dict[str, int]:
+        """
+        差异统计
+        
+        Returns:
+            各类变化的数量
+        """
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'retitled': len(self.retitled),
+            'visibility_changed': len(self.visibility_changed),
+            'unchanged': self.unchanged
+        }
+
+
+def diff_notes(old_notes: Iterable, new_notes: Iterable) -> SnapshotDiff:
+    """
+    对比两组笔记，时间复杂度与笔记总数成线性关系
+    
+    Args:
+        old_notes: 旧快照的笔记（可以是流式读取的迭代器）
+        new_notes: 新快照的笔记
+        
+    Returns:
+        差异结果
+    """
+    previous = {key: (content_hash(note), note) for key, note in stable_keys(old_notes)}
+    diff = SnapshotDiff()
+    
+    for key, note in stable_keys(new_notes):
+        entry = previous.pop(key, None)
+        if entry is None:
+            diff.added.append(note)
+            continue
+        old_hash, old_note = entry
+        if old_hash == content_hash(note):
+            diff.unchanged += 1
+            continue
+        if old_note.get('title') != note.get('title'):
+            diff.retitled.append((old_note, note))
+        if old_note.get('visibility', 'unknown') != note.get('visibility', 'unknown'):
+            diff.visibility_changed.append((old_note, note))
+    
+    diff.removed = [note for _, note in previous.values()]
+    return diff
+
+
+def diff_snapshot_files(old_path: str, new_path: Optional[str] = None, new_notes: Optional[Iterable] = None) -> SnapshotDiff:
+    """
+    对比快照文件，旧快照流式读取
+    
+    Args:
+        old_path: 旧快照路径
+        new_path: 新快照路径，与new_notes二选一
+        new_notes: 已在内存中的新笔记
+        
+    Returns:
+        差异结果
+    """
+    old_notes = (NoteRecord.from_dict(record) for record in read_records(old_path))
+    if new_notes is None:
+        new_notes = (NoteRecord.from_dict(record) for record in read_records(new_path))
+    return diff_notes(old_notes, new_notes)
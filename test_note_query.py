@@ -0,0 +1,82 @@
+"""
+测试笔记查询语言的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from note_store import NoteStore
+from note_query import compile_query
+
+
+def make_store() -> NoteStore:
+    """构造包含无日期笔记的存储"""
+    notes = [
+        ("旅行日记", "2020-05-01 10:00", 'public'),
+        ("美食探店", "2021-03-01 09:30", 'private'),
+        ("旅行攻略", "2021-12-31 23:59", 'public'),
+        ("无日期", "", 'unknown'),
+        ("日常", "2022-01-01 00:00", 'public')
+    ]
+    return NoteStore([
+        {'note_id': f"note_index_{index}", 'title': title, 'date': date,
+         'visibility': visibility, 'element_index': index}
+        for index, (title, date, visibility) in enumerate(notes)
+    ])
+
+
+def titles(text: str) -> list:
+    """执行查询并返回标题"""
+    return [note['title'] for note in compile_query(text).select(make_store())]
+
+
+def test_and_binds_tighter_than_or():
+    """and优先于or，括号可以改变优先级"""
+    assert titles('year=2020 or year=2021 and visibility=public') == ["旅行日记", "旅行攻略"]
+    assert titles('(year=2020 or year=2021) and visibility=public') == ["旅行日记", "旅行攻略"]
+    assert titles('(year=2020 or year=2021) and visibility=private') == ["美食探店"]
+    assert titles('year=2020 or (year=2021 and visibility=private)') == ["旅行日记", "美食探店"]
+
+
+def test_not_includes_undated_but_not_equal_does_not():
+    """not对全部笔记取反，!=只在有日期的笔记中排除"""
+    assert "无日期" in titles('not year=2021')
+    assert "无日期" not in titles('year!=2021')
+    assert titles('year!=2021') == ["旅行日记", "日常"]
+
+
+def test_year_and_date_boundaries():
+    """年份按自然年划分，日期比较区分开闭区间"""
+    assert titles('year<=2021') == ["旅行日记", "美食探店", "旅行攻略"]
+    assert titles('year>2021') == ["日常"]
+    assert titles('date<2022-01-01') == ["旅行日记", "美食探店", "旅行攻略"]
+    assert titles('date>="2022-01-01 00:00"') == ["日常"]
+
+
+def test_title_operators():
+    """标题包含、不包含和前缀"""
+    assert titles('title~旅行') == ["旅行日记", "旅行攻略"]
+    assert titles('title^=旅行 and title!~攻略') == ["旅行日记"]
+    assert titles('visibility=私密') == ["美食探店"]
+
+
+def test_syntax_errors():
+    """未知字段、不支持的运算符和多余内容都报错"""
+    for text in ('color=red', 'visibility<public', 'year=2021 year=2022', 'year=abc', '(year=2021'):
+        try:
+            compile_query(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"应当报错: {text}")
+
+
+if __name__ == "__main__":
+    test_and_binds_tighter_than_or()
+    test_not_includes_undated_but_not_equal_does_not()
+    test_year_and_date_boundaries()
+    test_title_operators()
+    test_syntax_errors()
+    print("✓ 测试通过")
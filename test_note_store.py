@@ -0,0 +1,53 @@
+"""
+测试笔记存储在删除后重新编号的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from note_store import NoteStore
+
+
+def make_note(index: int) -> dict:
+    """构造页面上第index个元素对应的笔记"""
+    return {
+        'note_id': f"note_index_{index}",
+        'title': f"t{index}",
+        'date': "2021-05-01",
+        'visibility': 'public',
+        'element_index': index
+    }
+
+
+def test_delete_renumbers_with_extraction_gap():
+    """提取时跳过了元素3，删除元素0后其余笔记按页面位置前移"""
+    store = NoteStore([make_note(index) for index in (0, 1, 2, 4, 5)])
+    results = {'details': [{'note_id': "note_index_0", 'success': True}]}
+    
+    assert store.apply_batch_results(results, 'delete') == {'updated': 0, 'removed': 1}
+    renumbered = {note['title']: (note['note_id'], note['element_index']) for note in store.notes}
+    assert renumbered == {
+        't1': ("note_index_0", 0),
+        't2': ("note_index_1", 1),
+        't4': ("note_index_3", 3),
+        't5': ("note_index_4", 4)
+    }
+
+
+def test_delete_inside_gap_keeps_earlier_notes():
+    """删除跳过位置之后的笔记，前面的笔记编号不变"""
+    store = NoteStore([make_note(index) for index in (0, 2, 3, 6)])
+    results = {'details': [{'note_id': "note_index_2", 'success': True},
+                           {'note_id': "note_index_6", 'success': True}]}
+    
+    store.apply_batch_results(results, 'delete')
+    assert [(note['title'], note['element_index']) for note in store.notes] == [('t0', 0), ('t3', 2)]
+
+
+if __name__ == "__main__":
+    test_delete_renumbers_with_extraction_gap()
+    test_delete_inside_gap_keeps_earlier_notes()
+    print("✓ 测试通过")
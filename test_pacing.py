@@ -0,0 +1,65 @@
+"""
+测试自适应操作节奏的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pacing import AdaptivePacer
+
+
+def test_throttle_toast_backs_off_up_to_max():
+    """限流提示使间隔加倍，不超过上限"""
+    pacer = AdaptivePacer(2.0)
+    
+    signals = pacer.record(True, 0.5, "操作过于频繁，请稍后再试")
+    assert signals and "频繁" in signals[0]
+    assert pacer.delay == 4.0
+    for _ in range(5):
+        pacer.record(True, 0.5, "操作太快了")
+    assert pacer.delay == pacer.max_delay == 16.0
+    assert pacer.throttle_events == 6
+
+
+def test_success_streak_speeds_up_down_to_min():
+    """连续成功后逐步加快，不低于下限"""
+    pacer = AdaptivePacer(2.0, success_streak=5)
+    
+    for _ in range(4):
+        pacer.record(True, 0.5)
+    assert pacer.delay == 2.0
+    pacer.record(True, 0.5)
+    assert pacer.delay == 2.0 * 0.85
+    for _ in range(200):
+        pacer.record(True, 0.5)
+    assert pacer.delay == pacer.min_delay == 0.5
+
+
+def test_consecutive_failures_are_a_signal():
+    """一次失败不调整，连续两次失败视为限流"""
+    pacer = AdaptivePacer(2.0)
+    
+    assert pacer.record(False, 0.5) == []
+    assert pacer.record(False, 0.5)
+    assert pacer.delay == 4.0
+
+
+def test_latency_spike_is_a_signal():
+    """耗时明显高于基线时放慢，小幅波动不放慢"""
+    pacer = AdaptivePacer(2.0)
+    
+    pacer.record(True, 0.5)
+    assert pacer.record(True, 1.2) == []
+    assert pacer.record(True, 3.0)
+    assert pacer.delay == 4.0
+
+
+if __name__ == "__main__":
+    test_throttle_toast_backs_off_up_to_max()
+    test_success_streak_speeds_up_down_to_min()
+    test_consecutive_failures_are_a_signal()
+    test_latency_spike_is_a_signal()
+    print("✓ 测试通过")
@@ -0,0 +1,118 @@
+"""
+测试保留策略的脚本
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dateutil.relativedelta import relativedelta
+from note_store import NoteStore
+from cli import parse_rate
+from retention import parse_age, parse_interval, RetentionPolicy, RetentionDaemon
+
+
+def expect_error(func, text, error=ValueError):
+    """调用应当报错"""
+    try:
+        func(text)
+    except error:
+        return
+    raise AssertionError(f"应当报错: {text}")
+
+
+def test_parse_age():
+    """时长按日历单位解析，单位支持中英文"""
+    assert parse_age("18mo") == relativedelta(months=18)
+    assert parse_age("4y") == relativedelta(years=4)
+    assert parse_age(" 30 天 ") == relativedelta(days=30)
+    assert parse_age("2W") == relativedelta(weeks=2)
+    for text in ("", "18", "mo", "1.5y", "3 fortnights"):
+        expect_error(parse_age, text)
+
+
+def test_parse_interval():
+    """同步间隔转换为秒数，必须为正"""
+    assert parse_interval("6h") == 21600
+    assert parse_interval("30min") == 1800
+    assert parse_interval("1d") == 86400
+    for text in ("0h", "6", "6y", "-1h"):
+        expect_error(parse_interval, text)
+
+
+def test_parse_rate():
+    """速率转换为操作间隔，必须为正"""
+    assert parse_rate("1/s") == 1.0
+    assert parse_rate("30/min") == 2.0
+    for text in ("0/s", "1", "1/week"):
+        expect_error(parse_rate, text, argparse.ArgumentTypeError)
+
+
+def make_store(dates) -> NoteStore:
+    """按发布时间构造笔记存储"""
+    return NoteStore([
+        {'note_id': f"note_index_{index}", 'title': f"t{index}", 'date': date.strftime("%Y-%m-%d %H:%M"),
+         'timestamp': date.timestamp(), 'visibility': 'public', 'element_index': index}
+        for index, date in enumerate(dates)
+    ])
+
+
+def planned(batches) -> dict:
+    """操作类型 -> 笔记标题"""
+    return {operation: [note['title'] for note in notes] for operation, notes in batches}
+
+
+def test_plan_longest_rule_wins():
+    """同时满足两条规则的笔记按时长最长的规则处理，已是目标可见性的笔记跳过"""
+    now = datetime(2026, 1, 1, 12, 0)
+    policy = RetentionPolicy.from_dict({'rules': [{'older_than': '1y', 'op': 'hide'},
+                                                  {'older_than': '4y', 'op': 'delete'}]})
+    store = make_store([datetime(2020, 1, 1), datetime(2024, 6, 1), datetime(2025, 12, 1)])
+    batches, rule_of = RetentionDaemon(None, policy).plan(store, now)
+    assert planned(batches) == {'hide': ["t1"], 'delete': ["t0"]}
+    assert rule_of["note_index_0"].operation == 'delete'
+    
+    store.notes[1] = dict(store.notes[1], visibility='private')
+    batches, _ = RetentionDaemon(None, policy).plan(store, now)
+    assert planned(batches) == {'delete': ["t0"]}
+
+
+def test_plan_incremental_only_new_crossings():
+    """有上一轮阈值时只处理 (上一轮阈值, 本轮阈值] 之间的笔记和变化的笔记"""
+    policy = RetentionPolicy.from_dict({'rules': [{'older_than': '1y', 'op': 'hide'}]})
+    daemon = RetentionDaemon(None, policy)
+    first = datetime(2026, 1, 1, 12, 0)
+    second = datetime(2026, 1, 8, 12, 0)
+    store = make_store([
+        datetime(2024, 1, 1),  # 上一轮已经超过阈值（仍为public，例如上一轮失败后被改回）
+        datetime(2025, 1, 1, 12, 0),  # 恰好在上一轮阈值上
+        datetime(2025, 1, 5),  # 本轮新跨过阈值
+        datetime(2025, 1, 8, 12, 0),  # 恰好在本轮阈值上
+        datetime(2025, 6, 1)  # 尚未满足
+    ])
+    daemon._thresholds = {rule.name: rule.threshold(first) for rule in policy.rules}
+    
+    # 恰好在上一轮阈值上的笔记已由上一轮处理，本轮不重复
+    batches, _ = daemon.plan(store, second, changed_notes=[])
+    assert planned(batches) == {'hide': ["t2", "t3"]}
+    
+    # 变化的笔记即使早已跨过阈值也重新评估
+    batches, _ = daemon.plan(store, second, changed_notes=[store.notes[0]])
+    assert planned(batches) == {'hide': ["t0", "t2", "t3"]}
+    
+    # 没有对比结果时全量评估
+    batches, _ = daemon.plan(store, second, changed_notes=None)
+    assert planned(batches) == {'hide': ["t0", "t1", "t2", "t3"]}
+
+
+if __name__ == "__main__":
+    test_parse_age()
+    test_parse_interval()
+    test_parse_rate()
+    test_plan_longest_rule_wins()
+    test_plan_incremental_only_new_crossings()
+    print("✓ 测试通过")
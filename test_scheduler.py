@@ -0,0 +1,66 @@
+"""
+测试批量操作调度的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import BatchScheduler
+
+
+def make_notes(*indexes) -> list:
+    """按给定顺序构造笔记"""
+    return [{'note_id': f"note_index_{index}", 'element_index': index} for index in indexes]
+
+
+def order(notes: list) -> list:
+    """笔记的元素位置"""
+    return [note['element_index'] for note in notes]
+
+
+def test_delete_runs_bottom_up():
+    """删除自下而上执行，未处理笔记的位置不受影响"""
+    scheduler = BatchScheduler(1080)
+    ordered, _ = scheduler.plan(make_notes(3, 10, 0, 7), 'delete', current_offset=0)
+    assert order(ordered) == [10, 7, 3, 0]
+
+
+def test_hide_sweeps_from_nearer_end():
+    """隐藏从离当前位置较近的一端单向扫描"""
+    scheduler = BatchScheduler(1080)
+    notes = make_notes(3, 10, 0, 7)
+    
+    top_down, report = scheduler.plan(notes, 'hide', current_offset=0)
+    assert order(top_down) == [0, 3, 7, 10]
+    assert report['planned_distance'] <= report['original_distance']
+    
+    bottom_up, _ = scheduler.plan(notes, 'hide', current_offset=20 * BatchScheduler.DEFAULT_ROW_HEIGHT)
+    assert order(bottom_up) == [10, 7, 3, 0]
+
+
+def test_measured_offsets_override_index_estimate():
+    """实测位置优先于按索引估算"""
+    scheduler = BatchScheduler(1080)
+    notes = make_notes(0, 1)
+    offsets = {"note_index_0": 900.0, "note_index_1": 100.0}
+    ordered, _ = scheduler.plan(notes, 'show', offsets, current_offset=0)
+    assert order(ordered) == [1, 0]
+
+
+def test_preserve_order():
+    """要求保持顺序时不重排，报告节省距离为0"""
+    scheduler = BatchScheduler(1080)
+    ordered, report = scheduler.plan(make_notes(3, 0, 7), 'delete', preserve_order=True)
+    assert order(ordered) == [3, 0, 7]
+    assert report['saved_distance'] == 0
+
+
+if __name__ == "__main__":
+    test_delete_runs_bottom_up()
+    test_hide_sweeps_from_nearer_end()
+    test_measured_offsets_override_index_estimate()
+    test_preserve_order()
+    print("✓ 测试通过")
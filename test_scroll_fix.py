@@ -84,14 +84,15 @@ def test_scroll_functionality():
             print("\n--- 测试权限管理器 ---")
             permission_manager = PermissionManager(scraper.driver)
             
-            # 测试获取笔记ID
+            # 测试获取笔记ID（笔记记录不保存元素，按ID重新定位）
             first_note = notes[0]
-            note_id = permission_manager.get_note_id(first_note['element'])
+            first_element = permission_manager._refresh_note_element(first_note['note_id'])
+            note_id = permission_manager.get_note_id(first_element) if first_element else None
             print(f"第一条笔记ID: {note_id}")
             
             # 测试检查可见性
-            if first_note['element']:
-                visibility = permission_manager.check_note_visibility(first_note['element'])
+            if first_element:
+                visibility = permission_manager.check_note_visibility(first_element)
                 print(f"第一条笔记可见性: {visibility}")
         
         print("\n=== 测试完成 ===")
@@ -0,0 +1,65 @@
+"""
+测试快照对比的脚本
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from snapshot_diff import diff_notes
+
+
+def make_note(index: int, title: str, date: str, visibility: str = 'public', timestamp: float = None) -> dict:
+    """构造页面上第index个位置的笔记"""
+    if timestamp is None:
+        timestamp = datetime.strptime(date, "%Y-%m-%d %H:%M").timestamp()
+    return {
+        'note_id': f"note_index_{index}",
+        'title': title,
+        'date': date,
+        'timestamp': timestamp,
+        'visibility': visibility,
+        'element_index': index
+    }
+
+
+def test_retitle_visibility_change_and_insertion():
+    """新发布一条笔记使其余笔记错位，仍能识别改标题和可见性变化"""
+    old = [
+        make_note(0, "旅行", "2021-05-01 10:00"),
+        make_note(1, "美食", "2020-03-01 09:30"),
+        make_note(2, "日常", "2019-01-01 08:00")
+    ]
+    new = [
+        make_note(0, "新笔记", "2024-06-20 23:46"),
+        make_note(1, "旅行（改）", "2021-05-01 10:00"),
+        make_note(2, "美食", "2020-03-01 09:30", visibility='private'),
+        make_note(3, "日常", "2019-01-01 08:00")
+    ]
+    
+    diff = diff_notes(old, new)
+    assert [note['title'] for note in diff.added] == ["新笔记"]
+    assert diff.removed == []
+    assert [(a['title'], b['title']) for a, b in diff.retitled] == [("旅行", "旅行（改）")]
+    assert [(a['visibility'], b['visibility']) for a, b in diff.visibility_changed] == [('public', 'private')]
+    assert diff.unchanged == 1
+    assert [note['title'] for note in diff.changed_notes()] == ["新笔记", "旅行（改）", "美食"]
+
+
+def test_relative_dates_are_stable_across_syncs():
+    """“3天前”每次同步解析出的时间不同，不应报告为消失加新增"""
+    old = [make_note(0, "最近", "3天前", timestamp=1_700_000_000.0)]
+    new = [make_note(0, "最近", "3天前", timestamp=1_700_003_600.0)]
+    
+    diff = diff_notes(old, new)
+    assert not diff.has_changes
+    assert diff.unchanged == 1
+
+
+if __name__ == "__main__":
+    test_retitle_visibility_change_and_insertion()
+    test_relative_dates_are_stable_across_syncs()
+    print("✓ 测试通过")
@@ -0,0 +1,60 @@
+"""
+测试自适应超时策略的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from timeouts import TimeoutPolicy
+
+
+def make_policy() -> TimeoutPolicy:
+    """构造已有足够样本（耗时0.5秒）的策略，不持久化"""
+    policy = TimeoutPolicy(min_samples=5)
+    for _ in range(10):
+        policy.record('confirm', 0.5)
+    return policy
+
+
+def test_timeout_uses_p99_after_enough_samples():
+    """样本足够后超时时间为p99乘以倍数"""
+    policy = make_policy()
+    
+    assert policy.timeout_for('confirm') == 1.5
+    assert TimeoutPolicy(min_samples=5).timeout_for('confirm') == 10.0
+
+
+def test_single_timeout_grants_one_ceiling_wait():
+    """一次超时后下一次使用上限，成功后恢复统计值"""
+    policy = make_policy()
+    
+    policy.record_timeout('confirm')
+    assert policy.timeout_for('confirm') == 10.0
+    policy.record('confirm', 0.5)
+    assert policy.timeout_for('confirm') < 10.0
+
+
+def test_repeated_timeouts_do_not_stay_at_ceiling():
+    """元素持续缺失时，上限等待只尝试一次，之后恢复快速失败"""
+    policy = make_policy()
+    
+    waits = []
+    for _ in range(6):
+        waits.append(policy.timeout_for('confirm'))
+        policy.record_timeout('confirm')
+    assert waits == [1.5, 10.0, 1.5, 1.5, 1.5, 1.5]
+    
+    # 再次成功后恢复一次上限宽限
+    policy.record('confirm', 0.5)
+    policy.record_timeout('confirm')
+    assert policy.timeout_for('confirm') == 10.0
+
+
+if __name__ == "__main__":
+    test_timeout_uses_p99_after_enough_samples()
+    test_single_timeout_grants_one_ceiling_wait()
+    test_repeated_timeouts_do_not_stay_at_ceiling()
+    print("✓ 测试通过")
@@ -0,0 +1,71 @@
+"""
+测试标题二元组索引的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from title_index import TitleIndex
+
+
+def make_index() -> TitleIndex:
+    """构造测试用索引"""
+    index = TitleIndex()
+    for key, title in enumerate(["旅行日记", "日记旅行", "ABC旅行", "abxbc", "旅"]):
+        index.add(key, title)
+    return index
+
+
+def test_search_substring():
+    """单字、二元组和更长关键词的子串查询"""
+    index = make_index()
+    assert index.search("旅") == {0, 1, 2, 4}
+    assert index.search("旅行") == {0, 1, 2}
+    assert index.search("旅行日记") == {0}
+    assert index.search("行日") == {0}
+    assert index.search("不存在") == set()
+    assert index.search("") == {0, 1, 2, 3, 4}
+
+
+def test_search_rejects_bigram_false_positive():
+    """二元组都存在但不连续时不算匹配"""
+    index = make_index()
+    assert index.search("abc") == {2}
+
+
+def test_search_normalizes_width_and_case():
+    """全角和大小写不影响匹配"""
+    index = make_index()
+    assert index.search("ａｂｃ") == {2}
+    assert index.search("ABC") == {2}
+
+
+def test_search_prefix():
+    """前缀查询，包括索引更新后"""
+    index = make_index()
+    assert index.search_prefix("旅行") == {0}
+    assert index.search_prefix("旅") == {0, 4}
+    index.add(5, "旅途")
+    assert index.search_prefix("旅") == {0, 4, 5}
+    index.remove(0)
+    assert index.search_prefix("旅") == {4, 5}
+    assert index.search("日记") == {1}
+
+
+def test_search_all_and_any():
+    """多关键词的交集和并集"""
+    index = make_index()
+    assert index.search_all(["旅行", "日记"]) == {0, 1}
+    assert index.search_any(["日记", "abc"]) == {0, 1, 2}
+
+
+if __name__ == "__main__":
+    test_search_substring()
+    test_search_rejects_bigram_false_positive()
+    test_search_normalizes_width_and_case()
+    test_search_prefix()
+    test_search_all_and_any()
+    print("✓ 测试通过")
@@ -0,0 +1,67 @@
+"""
+测试批量删除后按页面状态核对结果的脚本
+"""
+
+import sys
+import os
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from timeouts import TimeoutPolicy
+from permission import PermissionManager
+
+
+class PageStub(PermissionManager):
+    """用固定的页面快照代替浏览器"""
+    
+    def __init__(self, items):
+        super().__init__(None, TimeoutPolicy())
+        self.items = items
+    
+    def _snapshot_note_items(self):
+        return [dict(item) for item in self.items]
+
+
+def make_results(*keys):
+    """构造全部成功的删除结果"""
+    details = [{'note_id': f"note_index_{i}", 'title': title, 'date': date, 'success': True, 'error': None}
+               for i, (title, date) in enumerate(keys)]
+    return {'success': len(details), 'failed': 0, 'total': len(details), 'details': details}
+
+
+def test_untargeted_duplicate_is_not_counted_as_failure():
+    """同名同日期但未被选中的笔记仍在页面上，删除结果保持成功"""
+    repost = {'title': "转发", 'date': "3天前"}
+    before = PageStub([repost, repost, {'title': "其他", 'date': "2021-01-01"}])
+    before_counts = before._count_note_keys()
+    
+    manager = PageStub([repost, {'title': "其他", 'date': "2021-01-01"}])
+    results = make_results(("转发", "3天前"))
+    manager._verify_batch_results(results, 'delete', before_counts)
+    assert (results['success'], results['failed']) == (1, 0)
+
+
+def test_delete_still_on_page_is_marked_failed():
+    """批量前后数量没有减少，删除改记为失败"""
+    repost = {'title': "转发", 'date': "3天前"}
+    manager = PageStub([repost, repost])
+    results = make_results(("转发", "3天前"))
+    manager._verify_batch_results(results, 'delete', manager._count_note_keys())
+    assert (results['success'], results['failed']) == (0, 1)
+    assert results['details'][0]['error'] == "核对发现操作未生效"
+
+
+def test_without_before_counts_remaining_key_is_unverified():
+    """没有批量前的计数时，仍在页面上的同键笔记只计入无法核对"""
+    manager = PageStub([{'title': "转发", 'date': "3天前"}])
+    results = make_results(("转发", "3天前"))
+    manager._verify_batch_results(results, 'delete')
+    assert (results['success'], results['failed']) == (1, 0)
+
+
+if __name__ == "__main__":
+    test_untargeted_duplicate_is_not_counted_as_failure()
+    test_delete_still_on_page_is_marked_failed()
+    test_without_before_counts_remaining_key_is_unverified()
+    print("✓ 测试通过")
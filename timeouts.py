@@ -0,0 +1,180 @@
+"""
+自适应超时模块
+按等待类型统计实际耗时，根据p99动态设置WebDriverWait的超时时间
+"""
+
+import os
+import json
+import math
+import time
+from typing import Dict, Optional
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+
+# 统计数据文件名，由调用方放到运行数据目录下（见snapshot.runtime_path）
+STATS_FILENAME = "timeout_stats.json"
+
+
+class TimeoutPolicy:
+    """基于历史耗时分位数的超时策略"""
+    
+    def __init__(self, stats_file: str = "", multiplier: float = 3.0, floor: float = 1.0,
+                 ceiling: float = 10.0, min_samples: int = 20, window: int = 500):
+        """
+        初始化超时策略
+        
+        Args:
+            stats_file: 统计数据文件路径，为空时不持久化
+            multiplier: 超时时间相对p99耗时的倍数
+            floor: 超时时间下限（秒）
+            ceiling: 超时时间上限（秒），样本不足时使用该值
+            min_samples: 开始使用统计值前需要的最少样本数
+            window: 每种等待类型保留的最近样本数
+        """
+        self.stats_file = stats_file
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.window = window
+        self.samples = {}  # 等待类型 -> 最近的耗时样本
+        self._grace = set()  # 刚发生超时、下次使用上限的等待类型
+        self._missing = set()  # 使用上限仍然超时、在下次成功前不再放宽的等待类型
+        self._dirty = False
+        self.load()
+    
+    def timeout_for(self, wait_type: str) -> float:
+        """
+        获取指定等待类型的超时时间
+        
+        Args:
+            wait_type: 等待类型
+            
+        Returns:
+            超时时间（秒）
+        """
+        samples = self.samples.get(wait_type, [])
+        if wait_type in self._grace or len(samples) < self.min_samples:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, self.percentile(wait_type, 99) * self.multiplier))
+    
+    def wait_until(self, driver, wait_type: str, condition, until_not: bool = False):
+        """
+        使用当前超时时间等待条件成立，并记录实际耗时
+        
+        Args:
+            driver: WebDriver实例
+            wait_type: 等待类型，用于分别统计耗时
+            condition: expected_conditions条件
+            until_not: 是否等待条件不成立
+            
+        Returns:
+            条件返回值
+            
+        Raises:
+            TimeoutException: 超过当前超时时间
+        """
+        wait = WebDriverWait(driver, self.timeout_for(wait_type), poll_frequency=0.1)
+        started = time.monotonic()
+        try:
+            result = wait.until_not(condition) if until_not else wait.until(condition)
+        except TimeoutException:
+            self.record_timeout(wait_type)
+            raise
+        self.record(wait_type, time.monotonic() - started)
+        return result
+    
+    def record(self, wait_type: str, latency: float) -> None:
+        """
+        记录一次成功等待的耗时
+        
+        Args:
+            wait_type: 等待类型
+            latency: 实际耗时（秒）
+        """
+        samples = self.samples.setdefault(wait_type, [])
+        samples.append(round(latency, 3))
+        if len(samples) > self.window:
+            del samples[:len(samples) - self.window]
+        self._grace.discard(wait_type)
+        self._missing.discard(wait_type)
+        self._dirty = True
+    
+    def record_timeout(self, wait_type: str) -> None:
+        """
+        记录一次超时
+        
+        超时后下一次同类等待使用上限，平台确实变慢时这次等待会成功，
+        记录的实际耗时随之提高统计值。使用上限仍然超时说明元素不存在
+        而不是平台变慢，此后不再放宽，按统计值快速失败，直到再次成功。
+        超时本身不记为样本，避免元素持续缺失时统计值被逐次推高到上限。
+        
+        Args:
+            wait_type: 等待类型
+        """
+        if wait_type in self._grace:
+            self._grace.discard(wait_type)
+            self._missing.add(wait_type)
+        elif wait_type not in self._missing and self.timeout_for(wait_type) < self.ceiling:
+            self._grace.add(wait_type)
+    
+    def percentile(self, wait_type: str, q: float) -> float:
+        """
+        计算指定等待类型耗时的分位数
+        
+        Args:
+            wait_type: 等待类型
+            q: 分位数（0-100）
+            
+        Returns:
+            分位数耗时（秒），没有样本时返回上限
+        """
+        samples = sorted(self.samples.get(wait_type, []))
+        if not samples:
+            return self.ceiling
+        rank = max(0, math.ceil(q / 100 * len(samples)) - 1)
+        return samples[rank]
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        汇总各等待类型的统计信息
+        
+        Returns:
+            等待类型到样本数、p50、p99和当前超时的映射
+        """
+        return {
+            wait_type: {
+                'samples': len(samples),
+                'p50': self.percentile(wait_type, 50),
+                'p99': self.percentile(wait_type, 99),
+                'timeout': self.timeout_for(wait_type)
+            }
+            for wait_type, samples in self.samples.items()
+        }
+    
+    def load(self) -> None:
+        """从文件加载历史统计数据"""
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for wait_type, samples in data.get('samples', {}).items():
+                self.samples[wait_type] = [float(x) for x in samples][-self.window:]
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"加载超时统计数据失败，将重新统计: {e}")
+    
+    def save(self) -> None:
+        """把统计数据保存到文件"""
+        if not self.stats_file or not self._dirty:
+            return
+        try:
+            directory = os.path.dirname(self.stats_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.stats_file, "w", encoding="utf-8") as f:
+                json.dump({'version': 1, 'samples': self.samples}, f, ensure_ascii=False)
+            self._dirty = False
+        except OSError as e:
+            print(f"保存超时统计数据失败: {e}")
@@ -0,0 +1,177 @@
+"""
+标题索引模块
+基于字符二元组（bigram）的倒排索引，中文标题无需分词即可做子串、多关键词和前缀查询
+"""
+
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Set, Iterable, Hashable
+
+
+class TitleIndex:
+    """标题倒排索引"""
+    
+    def __init__(self):
+        """初始化空索引"""
+        self._titles = {}  # 键 -> 规范化后的标题
+        self._postings = {}  # 单字或二元组 -> 包含它的键集合
+        self._sorted_titles = None  # 按标题排序的(规范化标题, 键)，首次前缀查询时建立
+    
+    def __len__(self) -> int:
+        return len(self._titles)
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        规范化文本：全角转半角、英文转小写
+        
+        Args:
+            text: 原始文本
+            
+        Returns:
+            规范化后的文本
+        """
+        return unicodedata.normalize('NFKC', text or '').lower()
+    
+    @staticmethod
+    def grams(text: str) -> Set[str]:
+        """
+        拆分出文本中的全部单字和相邻二元组
+        
+        Args:
+            text: 规范化后的文本
+            
+        Returns:
+            单字和二元组集合
+        """
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+    
+    def add(self, key: Hashable, title: str) -> None:
+        """
+        添加或更新一个标题
+        
+        Args:
+            key: 标题对应的键（如笔记ID或标题池位置）
+            title: 标题文本
+        """
+        if key in self._titles:
+            self.remove(key)
+        text = self.normalize(title)
+        self._titles[key] = text
+        for gram in self.grams(text):
+            self._postings.setdefault(gram, set()).add(key)
+        self._sorted_titles = None
+    
+    def remove(self, key: Hashable) -> None:
+        """
+        移除一个标题，键不存在时忽略
+        
+        Args:
+            key: 标题对应的键
+        """
+        text = self._titles.pop(key, None)
+        if text is None:
+            return
+        for gram in self.grams(text):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        self._sorted_titles = None
+    
+    def search(self, keyword: str) -> Set[Hashable]:
+        """
+        查找标题包含关键词的键
+        
+        先求关键词所有二元组倒排表的交集得到候选，再逐个确认子串确实存在。
+        
+        Args:
+            keyword: 关键词
+            
+        Returns:
+            键集合
+        """
+        text = self.normalize(keyword)
+        if not text:
+            return set(self._titles)
+        grams = [text] if len(text) == 1 else [text[i:i + 2] for i in range(len(text) - 1)]
+        postings = []
+        for gram in set(grams):
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                return candidates
+        if len(text) <= 2:
+            return candidates
+        return {key for key in candidates if text in self._titles[key]}
+    
+    def search_all(self, keywords: Iterable[str]) -> Set[Hashable]:
+        """
+        查找标题同时包含所有关键词的键
+        
+        Args:
+            keywords: 关键词列表
+            
+        Returns:
+            键集合
+        """
+        result = None
+        for keyword in keywords:
+            keys = self.search(keyword)
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return result if result is not None else set(self._titles)
+    
+    def search_any(self, keywords: Iterable[str]) -> Set[Hashable]:
+        """
+        查找标题包含任一关键词的键
+        
+        Args:
+            keywords: 关键词列表
+            
+        Returns:
+            键集合
+        """
+        result = set()
+        for keyword in keywords:
+            result |= self.search(keyword)
+        return result
+    
+    def search_prefix(self, prefix: str) -> Set[Hashable]:
+        """
+        查找标题以指定文本开头的键
+        
+        Args:
+            prefix: 前缀
+            
+        Returns:
+            键集合
+        """
+        if self._sorted_titles is None:
+            self._sorted_titles = sorted((text, key) for key, text in self._titles.items())
+        text = self.normalize(prefix)
+        result = set()
+        position = bisect_left(self._sorted_titles, (text,))
+        while position < len(self._sorted_titles) and self._sorted_titles[position][0].startswith(text):
+            result.add(self._sorted_titles[position][1])
+            position += 1
+        return result
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        索引规模统计
+        
+        Returns:
+            包含标题数和索引项数的字典
+        """
+        return {'titles': len(self._titles), 'grams': len(self._postings)}
@@ -5,14 +5,23 @@
 
 import os
 import sys
-from typing import List, Dict, Optional
+import shutil
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from colorama import init, Fore, Style, Back
 from date_parser import DateParser
+from note_query import NoteQuery, compile_query, QUERY_HELP
+from note_pager import NotePager
 
 # 初始化colorama
 init(autoreset=True)
 
+# 分页列表的操作说明
+PAGER_HELP = "回车/n 下一页  p 上一页  g 页码 跳到指定页  j 序号 跳到指定笔记  /关键词 搜索标题  / 清除搜索"
+
+# 手动选择时回车用于翻页，到最后一页后需要用none/q退出
+SELECT_EXIT_HELP = "none/q 取消选择并返回"
+
 
 class UserInterface:
     """用户界面管理器"""
@@ -67,12 +76,13 @@ class UserInterface:
         
         return response in ['y', 'yes', '是', '确认']
     
-    def select_year(self, available_years: List[int]) -> Optional[int]:
+    def select_year(self, available_years: List[int], year_counts: Optional[Dict[int, int]] = None) -> Optional[int]:
         """
         选择年份
         
         Args:
             available_years: 可用年份列表
+            year_counts: 每年的笔记数量，提供时显示在年份后面
             
         Returns:
             选择的年份或None
@@ -83,7 +93,8 @@ class UserInterface:
         
         print(f"\n{Fore.CYAN}可用年份:")
         for i, year in enumerate(available_years, 1):
-            print(f"{Fore.WHITE}  {i}. {year}年")
+            count_text = f" ({year_counts.get(year, 0)} 条)" if year_counts is not None else ""
+            print(f"{Fore.WHITE}  {i}. {year}年{count_text}")
         
         while True:
             try:
@@ -99,9 +110,116 @@ class UserInterface:
             except ValueError:
                 self.print_error("请输入有效的数字")
     
+    def select_date_range(self) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        输入日期范围，开始日期包含在内，结束日期不包含在内
+        
+        Returns:
+            (开始日期, 结束日期)，留空的一端为None；两端都留空时返回None
+        """
+        print(f"\n{Fore.CYAN}请输入日期范围（格式 YYYY-MM-DD 或 YYYY-MM-DD HH:MM，留空表示不限）")
+        print(f"{Fore.WHITE}  例如只填结束日期 2022-03-01，表示 2022年3月1日之前的所有笔记")
+        
+        start_date = self._input_date("开始日期（含）: ")
+        end_date = self._input_date("结束日期（不含）: ")
+        if start_date is None and end_date is None:
+            self.print_info("未输入日期范围")
+            return None
+        if start_date and end_date and start_date >= end_date:
+            self.print_error("开始日期必须早于结束日期")
+            return None
+        return start_date, end_date
+    
+    def format_date_range(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> str:
+        """
+        格式化日期范围显示
+        
+        Args:
+            start_date: 开始日期（含）
+            end_date: 结束日期（不含）
+            
+        Returns:
+            日期范围描述
+        """
+        if start_date is None:
+            return f"{self.date_parser.format_date(end_date)}之前"
+        if end_date is None:
+            return f"{self.date_parser.format_date(start_date)}及之后"
+        return f"{self.date_parser.format_date(start_date)} 至 {self.date_parser.format_date(end_date)}（不含）"
+    
+    def _input_date(self, prompt: str) -> Optional[datetime]:
+        """读取一个日期，留空返回None，格式错误时重新输入"""
+        while True:
+            text = input(f"{Fore.YELLOW}{prompt}").strip()
+            if not text:
+                return None
+            for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+                try:
+                    return datetime.strptime(text, fmt)
+                except ValueError:
+                    continue
+            self.print_error("日期格式错误，请输入 YYYY-MM-DD 或 YYYY-MM-DD HH:MM")
+    
+    def input_query(self, show_help: bool = True) -> Optional[NoteQuery]:
+        """
+        输入并编译笔记查询语句
+        
+        Args:
+            show_help: 是否先显示查询语法说明
+        
+        Returns:
+            编译后的查询，留空时返回None
+        """
+        if show_help:
+            print(f"\n{Fore.CYAN}{QUERY_HELP}")
+        while True:
+            text = input(f"\n{Fore.YELLOW}请输入查询条件 (留空返回): ").strip()
+            if not text:
+                return None
+            try:
+                return compile_query(text)
+            except ValueError as e:
+                self.print_error(str(e))
+    
+    def select_operation(self) -> Optional[str]:
+        """
+        选择要对笔记执行的操作
+        
+        Returns:
+            'hide'、'show'、'delete'，取消时返回None
+        """
+        print(f"\n{Fore.CYAN}请选择操作:")
+        print(f"{Fore.WHITE}  1. 隐藏")
+        print(f"{Fore.WHITE}  2. 显示")
+        print(f"{Fore.RED}  3. 删除 ⚠️")
+        
+        operations = {'1': 'hide', '2': 'show', '3': 'delete'}
+        while True:
+            choice = input(f"\n{Fore.YELLOW}请选择 (1-3，留空取消): ").strip()
+            if not choice:
+                return None
+            if choice in operations:
+                return operations[choice]
+            self.print_error("无效的选择，请重新输入")
+    
+    def input_path(self, message: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        输入文件路径
+        
+        Args:
+            message: 提示信息
+            default: 直接回车时使用的默认路径
+            
+        Returns:
+            文件路径，没有输入且没有默认值时返回None
+        """
+        hint = f" [默认: {default}]" if default else ""
+        path = input(f"\n{Fore.YELLOW}{message}{hint}: ").strip()
+        return path or default
+    
     def select_notes_manually(self, notes: List[Dict]) -> List[Dict]:
         """
-        手动选择笔记
+        手动选择笔记，笔记较多时分页显示
         
         Args:
             notes: 笔记列表
@@ -112,25 +230,27 @@ class UserInterface:
         if not notes:
             return []
         
-        print(f"\n{Fore.CYAN}笔记列表:")
-        for i, note in enumerate(notes, 1):
-            title = note['title'][:40] + "..." if len(note['title']) > 40 else note['title']
-            date = note['date'] or "未知日期"
-            print(f"{Fore.WHITE}  {i:2d}. {title} ({date})")
+        pager = NotePager(notes, self._page_size(), title_width=40)
+        self._write(pager.render("笔记列表", show_status=False))
         
         print(f"\n{Fore.YELLOW}选择方式:")
         print(f"{Fore.WHITE}  1. 输入序号 (如: 2 或 1,3,5)")
         print(f"{Fore.WHITE}  2. 输入范围 (如: 1-5)")
-        print(f"{Fore.WHITE}  3. 输入 'all' 选择全部")
-        print(f"{Fore.WHITE}  4. 输入 'none' 取消选择")
+        print(f"{Fore.WHITE}  3. 输入 'all' 选择全部（搜索时为全部匹配的笔记）")
+        print(f"{Fore.WHITE}  4. 输入 'none' 或 'q' 取消选择")
+        print(f"{Fore.WHITE}  {PAGER_HELP}  {SELECT_EXIT_HELP}")
         
         while True:
             choice = input(f"\n{Fore.YELLOW}请选择: ").strip()
             
             if choice.lower() == 'all':
-                return notes
-            elif choice.lower() == 'none':
+                return pager.visible_notes()
+            elif choice.lower() in ('none', 'q'):
                 return []
+            elif choice.lower() in ('', 'n') and pager.page + 1 >= pager.page_count:
+                self.print_info(f"已经是最后一页，输入序号选择笔记，或输入 {SELECT_EXIT_HELP}")
+            elif self._handle_pager_command(pager, choice):
+                self._write(pager.render("笔记列表", show_status=False))
             elif choice.isdigit():
                 # 处理单个序号
                 try:
@@ -172,22 +292,152 @@ class UserInterface:
     
     def display_notes_summary(self, notes: List[Dict], title: str = "笔记列表") -> None:
         """
-        显示笔记摘要
+        显示笔记摘要，超过一页时进入分页浏览，看完最后一页或输入q结束
         
         Args:
             notes: 笔记列表
             title: 标题
         """
-        print(f"\n{Fore.CYAN}{title} ({len(notes)} 条):")
-        print(f"{Fore.CYAN}{'-'*50}")
+        pager = NotePager(notes, self._page_size())
+        self._write(pager.render(title))
+        if pager.page_count == 1:
+            return
+        
+        print(f"{Fore.WHITE}{PAGER_HELP}  q 结束浏览")
+        while True:
+            command = input(f"{Fore.YELLOW}浏览: ").strip()
+            if command.lower() == 'q':
+                return
+            if command.lower() in ('', 'n') and pager.page + 1 >= pager.page_count:
+                return
+            if self._handle_pager_command(pager, command):
+                self._write(pager.render(title))
+            else:
+                self.print_error("无法识别的命令")
+        
+    def _handle_pager_command(self, pager: NotePager, command: str) -> bool:
+        """
+        处理翻页、跳转和搜索命令
+        
+        Args:
+            pager: 分页视图
+            command: 用户输入
+            
+        Returns:
+            是否为分页命令（已处理）
+        """
+        action = command[:1].lower()
+        argument = command[1:].strip()
+        if command.lower() in ('', 'n'):
+            if not pager.next_page():
+                self.print_info("已经是最后一页")
+            return True
+        if command.lower() == 'p':
+            if not pager.prev_page():
+                self.print_info("已经是第一页")
+            return True
+        if action == 'g' and argument.isdigit():
+            pager.set_page(int(argument) - 1)
+            return True
+        if action == 'j' and argument.isdigit():
+            if not pager.jump_to(int(argument)):
+                self.print_error(f"序号 {argument} 不在当前列表中")
+            return True
+        if action == '/':
+            count = pager.search(argument)
+            if pager.keyword:
+                self.print_info(f"标题包含“{pager.keyword}”的笔记: {count} 条")
+            return True
+        return False
+    
+    def _page_size(self) -> int:
+        """根据终端高度计算每页显示的笔记数"""
+        return max(10, shutil.get_terminal_size((80, 30)).lines - 10)
+    
+    def _write(self, text: str) -> None:
+        """一次性写入终端"""
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    
+    def display_year_statistics(self, histogram: Dict[int, Dict[str, int]], undated: int = 0) -> None:
+        """
+        显示按年份和可见性统计的笔记数量
+        
+        Args:
+            histogram: 年份到可见性计数的映射（NoteStore.year_histogram('visibility')的结果）
+            undated: 没有有效日期的笔记数量
+        """
+        if not histogram and not undated:
+            return
+        
+        print(f"\n{Fore.CYAN}年份统计:")
+        for year, counts in histogram.items():
+            parts = []
+            if counts.get('public'):
+                parts.append(f"公开 {counts['public']}")
+            if counts.get('private'):
+                parts.append(f"仅自己可见 {counts['private']}")
+            if counts.get('unknown'):
+                parts.append(f"未知 {counts['unknown']}")
+            print(f"{Fore.WHITE}  {year}年: {sum(counts.values())} 条 ({'，'.join(parts)})")
+        if undated:
+            print(f"{Fore.YELLOW}  日期未知: {undated} 条")
+    
+    def display_catalog_status(self, source: Optional[str], synced_at: Optional[datetime], count: int) -> None:
+        """
+        显示笔记数据的来源和同步时间
         
-        for i, note in enumerate(notes, 1):
-            title = note['title'][:45] + "..." if len(note['title']) > 45 else note['title']
-            date = note['date'] or "未知日期"
-            status = "✓" if note.get('has_permission_button') else "✗"
-            print(f"{Fore.WHITE}{i:2d}. {status} {title} ({date})")
+        Args:
+            source: 'live'（浏览器提取）或'snapshot'（本地快照）
+            synced_at: 同步时间
+            count: 笔记数量
+        """
+        source_text = "本地快照" if source == 'snapshot' else "浏览器提取"
+        if synced_at is None:
+            print(f"\n{Fore.CYAN}数据来源: {source_text}，共 {count} 条笔记")
+            return
+        print(f"\n{Fore.CYAN}数据来源: {source_text}，共 {count} 条笔记，"
+              f"同步于 {synced_at.strftime('%Y-%m-%d %H:%M')}（{self.format_age(datetime.now() - synced_at)}）")
+    
+    @staticmethod
+    def format_age(age) -> str:
+        """
+        把时间间隔格式化为“x分钟前”等描述
         
-        print(f"{Fore.CYAN}{'-'*50}")
+        Args:
+            age: timedelta时间间隔
+            
+        Returns:
+            描述文本
+        """
+        seconds = max(0, int(age.total_seconds()))
+        if seconds < 60:
+            return "刚刚"
+        if seconds < 3600:
+            return f"{seconds // 60}分钟前"
+        if seconds < 86400:
+            return f"{seconds // 3600}小时前"
+        return f"{seconds // 86400}天前"
+    
+    def display_snapshot_diff(self, diff) -> None:
+        """
+        显示与上一次快照的差异
+        
+        Args:
+            diff: SnapshotDiff对象
+        """
+        summary = diff.summary()
+        print(f"\n{Fore.CYAN}与上一次同步相比:")
+        if not diff.has_changes:
+            print(f"{Fore.WHITE}  没有变化（{summary['unchanged']} 条笔记）")
+            return
+        print(f"{Fore.GREEN}  新增: {summary['added']} 条")
+        print(f"{Fore.RED}  消失: {summary['removed']} 条")
+        print(f"{Fore.YELLOW}  标题变化: {summary['retitled']} 条")
+        print(f"{Fore.YELLOW}  可见性变化: {summary['visibility_changed']} 条")
+        print(f"{Fore.WHITE}  未变化: {summary['unchanged']} 条")
+        for old_note, new_note in diff.visibility_changed[:10]:
+            print(f"{Fore.WHITE}    {new_note['title'][:30]}: {old_note.get('visibility')} -> {new_note.get('visibility')}")
     
     def confirm_batch_operation(self, notes: List[Dict], operation: str = "hide") -> bool:
         """
@@ -233,7 +483,10 @@ class UserInterface:
         print(f"{Fore.GREEN}成功: {results['success']} 条")
         print(f"{Fore.RED}失败: {results['failed']} 条")
         
-        if results['failed'] > 0:
+        if results.get('cancelled'):
+            remaining = results['total'] - results['success'] - results['failed']
+            self.print_warning(f"任务已取消，{remaining} 条笔记未处理")
+        elif results['failed'] > 0:
             self.print_warning("部分操作失败，请检查网络连接和页面状态")
         else:
             self.print_success("所有操作已完成")
@@ -255,30 +508,57 @@ class UserInterface:
         print(f"{Fore.WHITE}  7. 仅查看笔记列表")
         print(f"{Fore.CYAN}  8. 刷新笔记数据")
         print(f"{Fore.WHITE}  9. 退出程序")
+        print(f"{Fore.WHITE} 10. 按日期范围隐藏")
+        print(f"{Fore.WHITE} 11. 按日期范围显示")
+        print(f"{Fore.RED} 12. 按日期范围删除 ⚠️")
+        print(f"{Fore.WHITE} 13. 按查询条件选择笔记")
+        print(f"{Fore.WHITE} 14. 导入笔记快照（无需浏览器）")
+        print(f"{Fore.WHITE} 15. 导出笔记数据")
+        print(f"{Fore.WHITE} 16. 仅处理上次同步以来变化的笔记")
+        print(f"{Fore.CYAN} 17. 后台任务（进度、暂停、继续、取消）")
+        
+        # 原有编号保持不变（9仍为退出），新增模式依次排在后面
+        modes = {
+            '1': 'year_hide',
+            '2': 'manual_hide',
+            '3': 'year_show',
+            '4': 'manual_show',
+            '5': 'year_delete',
+            '6': 'manual_delete',
+            '7': 'view',
+            '8': 'refresh',
+            '9': 'exit',
+            '10': 'range_hide',
+            '11': 'range_show',
+            '12': 'range_delete',
+            '13': 'query',
+            '14': 'import',
+            '15': 'export',
+            '16': 'changed',
+            '17': 'jobs'
+        }
         
         while True:
-            choice = input(f"\n{Fore.YELLOW}请选择 (1-9): ").strip()
+            choice = input(f"\n{Fore.YELLOW}请选择 (1-17): ").strip()
             
-            if choice == '1':
-                return 'year_hide'
-            elif choice == '2':
-                return 'manual_hide'
-            elif choice == '3':
-                return 'year_show'
-            elif choice == '4':
-                return 'manual_show'
-            elif choice == '5':
-                return 'year_delete'
-            elif choice == '6':
-                return 'manual_delete'
-            elif choice == '7':
-                return 'view'
-            elif choice == '8':
-                return 'refresh'
-            elif choice == '9':
-                return 'exit'
-            else:
-                self.print_error("无效的选择，请重新输入")
+            if choice in modes:
+                return modes[choice]
+            self.print_error("无效的选择，请重新输入")
+    
+    def batch_job_command(self) -> str:
+        """
+        输入后台任务的控制命令
+        
+        Returns:
+            'pause'、'resume'、'cancel'、'follow'，回车返回菜单时为'back'
+        """
+        print(f"{Fore.WHITE}  p 暂停  r 继续  c 取消  f 跟踪进度  回车 返回菜单")
+        commands = {'p': 'pause', 'r': 'resume', 'c': 'cancel', 'f': 'follow', '': 'back'}
+        while True:
+            choice = input(f"{Fore.YELLOW}请选择: ").strip().lower()
+            if choice in commands:
+                return commands[choice]
+            self.print_error("无效的选择，请重新输入")
     
     def show_progress(self, current: int, total: int, message: str = "") -> None:
         """